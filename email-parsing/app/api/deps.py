@@ -1,4 +1,53 @@
+from functools import lru_cache
+from fastapi import Request
 from app.core.config import settings
+from app.core.database import sqlite_path
+from app.services.research_cache import ResearchCache
+from app.services.report_store import ReportStore
+from app.services.mail_sync_state import MailSyncState
+from app.services.imap_pool import ImapSessionPool
+from app.services.research_engine import ResearchEngine
+from app.services.job_queue import JobQueue
+from app.services.sender_index import SenderDomainIndex
 
 def get_settings():
     return settings
+
+@lru_cache
+def get_research_cache() -> ResearchCache:
+    return ResearchCache(
+        ttl=settings.research_cache_ttl,
+        maxsize=settings.research_cache_size,
+        # The mail watcher runs in one worker; its pre-research only helps the others through SQLite
+        db_path=sqlite_path(settings.database_url) if settings.research_cache_persist or settings.watch_inbox else None,
+    )
+
+@lru_cache
+def get_report_store() -> ReportStore:
+    return ReportStore(sqlite_path(settings.database_url), cache_size=settings.report_cache_size)
+
+@lru_cache
+def get_mail_sync_state() -> MailSyncState:
+    return MailSyncState(sqlite_path(settings.database_url))
+
+def get_imap_pool(request: Request) -> ImapSessionPool:
+    return request.app.state.imap_pool
+
+def get_research_engine(request: Request) -> ResearchEngine:
+    return request.app.state.research_engine
+
+@lru_cache
+def get_job_queue() -> JobQueue:
+    return JobQueue(
+        sqlite_path(settings.database_url),
+        lease_seconds=settings.job_lease_seconds,
+        max_attempts=settings.job_max_attempts,
+    )
+
+@lru_cache
+def get_sender_index() -> SenderDomainIndex:
+    return SenderDomainIndex(
+        sqlite_path(settings.database_url),
+        min_agreement=settings.sender_learn_min_emails,
+        reload_interval=settings.sender_index_reload_interval,
+    )
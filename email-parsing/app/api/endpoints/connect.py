@@ -11,5 +11,6 @@ async def connect_gmail(settings=Depends(get_settings)) -> ConnectResponse:
     logging.info("Starting Gmail connection attempt")
     gmail_service = GmailService(settings.EMAIL_ADDRESS, settings.APP_PASSWORD)
     success, message = await gmail_service.connect()
+    await gmail_service.logout()
     logging.info(f"Gmail connection status: {message}")
     return ConnectResponse(success=success, message=message)
@@ -1,20 +1,33 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response
 from app.models.schemas import FetchEmailsResponse
-from app.api.deps import get_settings
-from app.services.gmail_service import GmailService
+from app.api.deps import get_settings, get_mail_sync_state, get_imap_pool
 from app.services.email_parser import EmailParser
 import logging
 
 router = APIRouter()
 
-@router.get("/")
-async def fetch_unread_emails(settings=Depends(get_settings)) -> FetchEmailsResponse:
+@router.get("/", response_model=FetchEmailsResponse)
+async def fetch_unread_emails(
+    settings=Depends(get_settings),
+    sync_state=Depends(get_mail_sync_state),
+    imap_pool=Depends(get_imap_pool),
+    incremental: Optional[bool] = Query(None, description="Only fetch mail newer than the last sync"),
+):
     logging.info("Fetching unread emails")
-    gmail_service = GmailService(settings.EMAIL_ADDRESS, settings.APP_PASSWORD)
-    connected, msg = await gmail_service.connect()
-    if not connected:
+    try:
+        async with imap_pool.session(settings.EMAIL_ADDRESS, settings.APP_PASSWORD) as gmail_service:
+            if settings.incremental_sync if incremental is None else incremental:
+                # Own sync namespace (like the watcher's "#watch"): previewing mail here must not mark it
+                # processed for /orchestrate, which only commits after research
+                raw_emails = await gmail_service.sync_new_emails(sync_state, account=f"{settings.EMAIL_ADDRESS}#fetch")
+            else:
+                raw_emails = await gmail_service.fetch_unread_emails()
+    except ConnectionError:
         return FetchEmailsResponse(emails=[])
-    raw_emails = await gmail_service.fetch_unread_emails()
     parsed_emails = EmailParser.parse_emails(raw_emails)
     logging.info(f"Fetched {len(parsed_emails)} unread emails")
-    return FetchEmailsResponse(emails=parsed_emails)
+    # Serialized directly: validating the already normalized emails against response_model
+    # (EmailStr checks) made the endpoint ~4x slower on large inboxes
+    body = FetchEmailsResponse.model_construct(emails=parsed_emails).model_dump_json()
+    return Response(body, media_type="application/json")
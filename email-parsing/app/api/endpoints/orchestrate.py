@@ -1,35 +1,139 @@
-from fastapi import APIRouter, Depends
-from app.api.deps import get_settings
-from app.services.email_reader import EmailReader
-from app.services.research_engine import ResearchEngine
-from app.models.schemas import ResearchReport
-from app.utils.extract import extract_company_names
-from typing import List
+import json
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from app.api.deps import (
+    get_settings, get_report_store, get_mail_sync_state, get_imap_pool, get_job_queue, get_sender_index,
+    get_research_engine,
+)
+from app.core.metrics import stage_timer, start_trace
+from app.services.orchestrator import (
+    fetch_emails, extract_companies, confirm_sender_domains, commit_sync, run_orchestration
+)
+from app.models.schemas import ResearchReport, OrchestrationJob
+from typing import AsyncIterator, List, Optional
 from app.core.config import Settings
 
 router = APIRouter()
 
+
 @router.post("/orchestrate/", response_model=List[ResearchReport])
-async def orchestrate(settings: Settings = Depends(get_settings)):
-    reader = EmailReader(settings.EMAIL_ADDRESS, settings.APP_PASSWORD)
+async def orchestrate(
+    response: Response,
+    settings: Settings = Depends(get_settings),
+    concurrency: Optional[int] = Query(None, ge=1, description="Companies researched at once; 1 runs sequentially"),
+    timeout: Optional[float] = Query(None, gt=0, description="Per-company research timeout in seconds"),
+    force_refresh: bool = Query(False, description="Bypass the research cache"),
+    engine=Depends(get_research_engine),
+    sync_state=Depends(get_mail_sync_state),
+    imap_pool=Depends(get_imap_pool),
+    sender_index=Depends(get_sender_index),
+    incremental: Optional[bool] = Query(None, description="Only research mail newer than the last sync"),
+):
+    if settings.tracing:
+        response.headers["X-Trace-Id"] = start_trace()
+    return await run_orchestration(
+        settings, imap_pool, sync_state, engine, concurrency, timeout, force_refresh, incremental, sender_index
+    )
+
+
+@router.post("/orchestrate/stream")
+async def orchestrate_stream(
+    settings: Settings = Depends(get_settings),
+    concurrency: Optional[int] = Query(None, ge=1, description="Companies researched at once; 1 runs sequentially"),
+    timeout: Optional[float] = Query(None, gt=0, description="Per-company research timeout in seconds"),
+    force_refresh: bool = Query(False, description="Bypass the research cache"),
+    engine=Depends(get_research_engine),
+    sync_state=Depends(get_mail_sync_state),
+    imap_pool=Depends(get_imap_pool),
+    sender_index=Depends(get_sender_index),
+    incremental: Optional[bool] = Query(None, description="Only research mail newer than the last sync"),
+):
+    """
+    Streams the orchestration as NDJSON: `progress` events for the fetch/extract/research stages,
+    one `report` event per company as soon as its research finishes, `error` events for companies
+    that failed, and a final `done` event.
+    """
 
-    
-    # Ensure fetch_unread_emails is synchronous or wrap it in asyncio if needed
-    emails = reader.fetch_unread_emails()
-    print("Fetched Emails:\n", emails)
+    def event(kind: str, **payload) -> str:
+        return json.dumps({"event": kind, **payload}, default=str) + "\n"
 
+    trace_id = uuid.uuid4().hex if settings.tracing else None
 
-    company_names = extract_company_names(emails)
-    
-    engine = ResearchEngine(settings.openai_api_key, settings.serper_api_key, settings.model)
+    async def events() -> AsyncIterator[str]:
+        if trace_id:
+            start_trace(trace_id)
+        with stage_timer("orchestration"):
+            async for line in stages():
+                yield line
 
-    results = []
-    for name in company_names:
-        try:
-            report = await engine.research_company(name)
+    async def stages() -> AsyncIterator[str]:
+        yield event("progress", stage="fetch", status="started")
+        emails, checkpoint = await fetch_emails(settings, imap_pool, sync_state, incremental)
+        yield event("progress", stage="fetch", status="completed", count=len(emails))
+
+        yield event("progress", stage="extract", status="started")
+        company_names, candidates_per_email = await extract_companies(
+            emails, sender_index, settings.company_similarity_threshold
+        )
+        yield event("progress", stage="extract", status="completed", count=len(company_names), companies=company_names)
+
+        yield event("progress", stage="research", status="started", count=len(company_names))
+        completed = 0
+        reports, researched = [], []
+        async for name, report in engine.research_companies_as_completed(
+            company_names,
+            concurrency=concurrency or settings.research_concurrency,
+            timeout=timeout or settings.research_timeout,
+            force_refresh=force_refresh,
+        ):
+            completed += 1
             if report:
-                results.append(report)
-        except Exception as e:
-            print(f"Failed to research {name}: {e}")
+                reports.append(report)
+                researched.append(name)
+                yield event("report", completed=completed, total=len(company_names), report=report.model_dump(mode="json"))
+            else:
+                yield event("error", completed=completed, total=len(company_names), company_name=name)
+        await confirm_sender_domains(emails, candidates_per_email, reports, sender_index)
+        await commit_sync(sync_state, checkpoint, emails, candidates_per_email, researched)
+        yield event("done", completed=completed, total=len(company_names))
+
+    headers = {"X-Trace-Id": trace_id} if trace_id else None
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers=headers)
+
+
+@router.post("/jobs", response_model=OrchestrationJob, status_code=202)
+async def enqueue_orchestration(
+    concurrency: Optional[int] = Query(None, ge=1, description="Companies researched at once; 1 runs sequentially"),
+    timeout: Optional[float] = Query(None, gt=0, description="Per-company research timeout in seconds"),
+    force_refresh: bool = Query(False, description="Bypass the research cache"),
+    incremental: Optional[bool] = Query(None, description="Only research mail newer than the last sync"),
+    queue=Depends(get_job_queue),
+):
+    """
+    Queues an orchestration run for the background workers and returns immediately.
+    An identical run that is already queued or running is returned instead of a duplicate.
+    """
+    params = {"concurrency": concurrency, "timeout": timeout, "force_refresh": force_refresh, "incremental": incremental}
+    job_id, created = await queue.enqueue("orchestrate", params)
+    job = await queue.get(job_id)
+    return OrchestrationJob(**job, deduplicated=not created)
+
+
+@router.get("/jobs/{job_id}", response_model=OrchestrationJob)
+async def get_orchestration_job(job_id: str, queue=Depends(get_job_queue)):
+    job = await queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return OrchestrationJob(**job)
+
 
-    return results
+@router.get("/jobs/{job_id}/result", response_model=List[ResearchReport])
+async def get_orchestration_result(job_id: str, queue=Depends(get_job_queue), store=Depends(get_report_store)):
+    job = await queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    reports = [await store.get(report_id) for report_id in job["result"]["report_ids"]]
+    return [report for report in reports if report]
@@ -1,19 +1,122 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from app.models.schemas import ResearchReport
-from app.services.research_engine import ResearchEngine
-from app.api.deps import get_settings
+from app.api.deps import get_report_store, get_research_cache
+from app.services.report_export import EXPORT_FORMATS, FILE_EXTENSIONS, MEDIA_TYPES, export_reports
+from app.services.report_store import ReportStore
+from app.services.research_cache import ResearchCache
+from app.utils.credibility import SCORING_PROFILES, get_profile, score_batch
 from app.utils.report_generator import generate_markdown_report
 
 router = APIRouter()
 
+class RescoreRequest(BaseModel):
+    profile: str = "default"
+    weights: Optional[Dict[str, float]] = None  # per-factor overrides on top of the profile
+    caps: Optional[Dict[str, float]] = None
+    persist: bool = False  # write the new scores back to the stored reports
+    include_scores: bool = False  # return {report_id: score} as well as the summary
+
+@router.get("/", response_model=List[ResearchReport])
+async def list_reports(
+    company_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    store: ReportStore = Depends(get_report_store),
+):
+    return await store.search(company_name, since, until, min_score, max_score, limit)
+
+@router.get("/scoring-profiles")
+async def list_scoring_profiles() -> dict:
+    return {
+        name: {"description": p.description, "units": p.units, "points": p.points, "caps": p.caps, "weights": p.weights}
+        for name, p in SCORING_PROFILES.items()
+    }
+
+@router.post("/rescore")
+async def rescore_reports(
+    request: RescoreRequest,
+    store: ReportStore = Depends(get_report_store),
+    cache: ResearchCache = Depends(get_research_cache),
+) -> dict:
+    """Rescores every stored report's raw_metrics under a scoring profile, without any external calls."""
+    try:
+        profile = get_profile(request.profile)
+        if request.weights or request.caps:
+            profile = profile.with_overrides(request.weights, request.caps)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    started = time.perf_counter()
+    report_ids, current, columns = await store.load_score_inputs()
+    scores, factors = await asyncio.to_thread(score_batch, columns, profile)
+    new_scores = scores.tolist()
+
+    if request.persist and report_ids:
+        def rows():
+            names = list(factors)
+            breakdowns = zip(*(factors[name].tolist() for name in names))
+            for report_id, score, values in zip(report_ids, new_scores, breakdowns):
+                yield report_id, score, json.dumps(dict(zip(names, values)))
+        updates = await asyncio.to_thread(lambda: list(rows()))
+        await store.update_scores(updates)
+        await cache.update_scores(updates)
+
+    result = {
+        "profile": profile.name,
+        "reports": len(report_ids),
+        "changed": int((current != scores).sum()),
+        "persisted": request.persist,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "summary": {
+            "mean": round(float(scores.mean()), 2),
+            "min": float(scores.min()),
+            "max": float(scores.max()),
+        } if len(scores) else None,
+    }
+    if request.include_scores:
+        result["scores"] = dict(zip(report_ids, new_scores))
+    return result
+
+@router.get("/export")
+async def export_report_stream(
+    export_format: str = Query(
+        "jsonl", alias="format",
+        description=" | ".join(EXPORT_FORMATS) + " (parquet needs the optional pyarrow package, else 501)",
+    ),
+    company_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    store: ReportStore = Depends(get_report_store),
+):
+    """
+    Streams every report in the date/score range as JSON Lines, CSV, Parquet or concatenated markdown.
+    Parquet is an optional extra: pyarrow is not in requirements.txt, and without it the request
+    is answered with 501 before anything is read.
+    """
+    try:
+        stream = export_reports(store, export_format, company_name, since, until, min_score, max_score)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    headers = {"Content-Disposition": f'attachment; filename="reports.{FILE_EXTENSIONS[export_format]}"'}
+    return StreamingResponse(stream, media_type=MEDIA_TYPES[export_format], headers=headers)
+
 @router.get("/{report_id}")
-async def get_report(report_id: str, settings=Depends(get_settings)):
-    engine = ResearchEngine(
-        openai_api_key=settings.OPENAI_API_KEY,
-        serper_api_key=settings.SERPER_API_KEY,
-        model=settings.MODEL
-    )
-    report: ResearchReport = await engine.get_report(report_id)
+async def get_report(report_id: str, store: ReportStore = Depends(get_report_store)):
+    report: ResearchReport = await store.get(report_id)
     if not report:
         return {"error": "Report not found"}
     md_report = generate_markdown_report(report)
@@ -1,22 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException
-from app.api.deps import get_settings
+from app.api.deps import get_research_cache, get_research_engine
 from app.services.research_engine import ResearchEngine
 from app.models.schemas import ResearchReport
+from app.utils.rate_limit import UpstreamError
 from pydantic import BaseModel
 
 router = APIRouter()
 
 class ResearchRequest(BaseModel):
     company_name: str
+    force_refresh: bool = False
 
 @router.post("/")
-async def perform_research(request: ResearchRequest, settings=Depends(get_settings)) -> ResearchReport:
-    engine = ResearchEngine(
-        openai_api_key=settings.OPENAI_API_KEY,
-        serper_api_key=settings.SERPER_API_KEY,
-        model=settings.MODEL
-    )
-    report = await engine.research_company(request.company_name)
+async def perform_research(
+    request: ResearchRequest,
+    engine: ResearchEngine = Depends(get_research_engine),
+) -> ResearchReport:
+    try:
+        report = await engine.research_company(request.company_name, force_refresh=request.force_refresh)
+    except UpstreamError as e:
+        raise HTTPException(status_code=503, detail=f"Research failed: {e}")
     if not report:
         raise HTTPException(status_code=404, detail="Research failed")
     return report
+
+@router.get("/cache/stats")
+async def research_cache_stats(cache=Depends(get_research_cache)) -> dict:
+    return cache.stats()
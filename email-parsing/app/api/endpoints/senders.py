@@ -0,0 +1,26 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from app.api.deps import get_sender_index
+from app.models.schemas import SenderDomainMapping
+
+router = APIRouter()
+
+class SenderOverride(BaseModel):
+    company_name: str
+
+@router.get("/", response_model=List[SenderDomainMapping])
+async def list_sender_domains(sender_index=Depends(get_sender_index)):
+    await sender_index.refresh()
+    return sender_index.entries()
+
+@router.put("/{domain}", response_model=SenderDomainMapping)
+async def override_sender_domain(domain: str, override: SenderOverride, sender_index=Depends(get_sender_index)):
+    await sender_index.set_override(domain, override.company_name)
+    return SenderDomainMapping(domain=domain.lower(), company_name=override.company_name, source="manual")
+
+@router.delete("/{domain}")
+async def delete_sender_domain(domain: str, sender_index=Depends(get_sender_index)):
+    if not await sender_index.remove(domain):
+        raise HTTPException(status_code=404, detail="Domain not indexed")
+    return {"deleted": domain.lower()}
@@ -1,6 +1,16 @@
+import json
+from typing import List, Optional
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
 
+class MailAccount(BaseModel):
+    email_address: str
+    app_password: str
+    mailboxes: List[str] = ["INBOX"]
+
+
 class Settings(BaseSettings):
     EMAIL_ADDRESS: str
     APP_PASSWORD: str
@@ -9,6 +19,65 @@ class Settings(BaseSettings):
     model: str = "gpt-4o-mini"
     debug: bool = False
     database_url: str = "sqlite+aiosqlite:///./email_orchestrator.db"
+    research_concurrency: int = 5
+    research_timeout: float = 90.0
+    research_mode: str = "parallel"  # sequential | parallel | combined
+    research_cache_ttl: int = 86400  # seconds
+    research_cache_size: int = 1024
+    research_cache_persist: bool = False  # always on with watch_inbox, so every worker sees pre-researched mail
+    research_metrics_batch_size: int = 1  # companies per metrics request (1 = off; capped by research_concurrency)
+    research_metrics_batch_wait: float = 0.25  # seconds to wait for a batch to fill
+    report_cache_size: int = 1024
+    imap_host: str = "imap.gmail.com"
+    imap_port: int = 993
+    imap_ssl: bool = True  # plain IMAP only for local test servers
+    imap_fetch_batch_size: int = 200  # UIDs per FETCH command
+    imap_snippet_bytes: int = 2048  # bytes of the text part fetched for the snippet
+    imap_max_workers: int = 8  # threads running blocking imaplib calls
+    imap_timeout: float = 30.0  # socket timeout in seconds
+    imap_pool_size: int = 3  # pooled sessions per account (Gmail allows 15 connections)
+    watch_inbox: bool = False  # hold an IMAP IDLE session and pre-research new mail in the background
+    watch_idle_refresh: float = 29 * 60  # re-issue IDLE before servers drop it at 30 minutes
+    watch_debounce: float = 5.0  # seconds to gather a burst of new mail into one batch
+    watch_poll_interval: float = 60.0  # used instead of IDLE when the server lacks it
+    watch_research_concurrency: int = 2  # companies researched at once by the watcher
+    watch_leader_lease: float = 30.0  # seconds before another worker takes over the watcher of a dead one
+    incremental_sync: bool = False  # fetch by UID high-water mark instead of UNSEEN
+    mail_accounts: List[MailAccount] = []  # extra mailboxes, JSON: [{"email_address": ..., "app_password": ...}]
+    mail_accounts_file: Optional[str] = None  # JSON file with the same list, for dozens of shared mailboxes
+    ingest_processes: int = 0  # processes syncing and extracting accounts in parallel (0 = CPU count)
+    ingest_batch_limit: int = 500  # messages per account per turn, so large mailboxes don't starve the rest
+    ingest_shard_timeout: float = 600.0  # seconds before one account's turn is abandoned
+    ingest_max_failures: int = 3  # consecutive failed turns before an account is skipped for the run
+    serper_url: str = "https://google.serper.dev/search"
+    serper_cache_ttl: int = 600  # seconds search results are reused
+    serper_max_connections: int = 20
+    serper_rpm: int = 300  # requests/minute budget shared by all Serper calls
+    serper_max_concurrency: int = 16  # ceiling for the adaptive in-flight window
+    openai_rpm: int = 500
+    openai_tpm: int = 200000  # tokens/minute, estimated per prompt and corrected from usage
+    openai_max_concurrency: int = 16
+    upstream_max_attempts: int = 5  # tries per Serper/OpenAI call on 429, 5xx or network errors
+    company_similarity_threshold: float = 0.88  # fuzzy merge of extracted company names
+    sender_learn_min_emails: int = 3  # emails that must agree before a sender domain is learned from NER
+    sender_index_reload_interval: float = 30.0  # seconds before a worker reloads the index (other workers' overrides)
+    job_workers: int = 2  # orchestration job workers per process
+    job_lease_seconds: float = 300.0
+    job_max_attempts: int = 3
+    job_poll_interval: float = 1.0
+    tracing: bool = False  # tag orchestration stages with a trace ID (X-Trace-Id, /metrics/traces/{id})
+
+    def all_mail_accounts(self) -> List[MailAccount]:
+        """The primary EMAIL_ADDRESS account followed by MAIL_ACCOUNTS and MAIL_ACCOUNTS_FILE, deduplicated."""
+        accounts = [MailAccount(email_address=self.EMAIL_ADDRESS, app_password=self.APP_PASSWORD)]
+        accounts.extend(self.mail_accounts)
+        if self.mail_accounts_file:
+            with open(self.mail_accounts_file, encoding="utf-8") as f:
+                accounts.extend(MailAccount.model_validate(entry) for entry in json.load(f))
+        unique = {}
+        for account in accounts:
+            unique.setdefault(account.email_address.lower(), account)
+        return list(unique.values())
 
     class Config:
         env_file = ".env"
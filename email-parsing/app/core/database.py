@@ -0,0 +1,11 @@
+from app.core.config import settings
+
+
+def sqlite_path(database_url: str = settings.database_url) -> str:
+    """
+    Returns the filesystem path of a SQLite `database_url`
+    (e.g. "sqlite+aiosqlite:///./email_orchestrator.db" -> "./email_orchestrator.db").
+    """
+    if ":///" not in database_url or not database_url.startswith("sqlite"):
+        raise ValueError(f"Only SQLite database URLs are supported, got '{database_url}'")
+    return database_url.split(":///", 1)[1] or ":memory:"
@@ -1,10 +1,14 @@
 import logging
 
+from app.core.metrics import TraceIdFilter
+
 def setup_logging():
+    handler = logging.StreamHandler()
+    handler.addFilter(TraceIdFilter())
     logging.basicConfig(
         level=logging.DEBUG,
-        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
+        format="%(asctime)s %(levelname)s %(name)s [%(trace_id)s] - %(message)s",
         handlers=[
-            logging.StreamHandler()
+            handler
         ],
     )
@@ -0,0 +1,251 @@
+import abc
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+PREFIX = "email_orchestrator"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = f"{PREFIX}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines in the text exposition format; called with the lock held."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format (version 0.0.4)."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+STAGE_SECONDS = Histogram("stage_seconds", "Time spent in each pipeline stage", ["stage"])
+STAGE_ERRORS = Counter("stage_errors", "Pipeline stage calls that raised", ["stage"])
+STAGE_IN_FLIGHT = Gauge("stage_in_flight", "Pipeline stage calls currently running", ["stage"])
+LLM_TOKENS = Counter("llm_tokens", "LLM tokens reported by the API", ["kind"])
+CACHE_REQUESTS = Counter("cache_requests", "Cache lookups by cache and result", ["cache", "result"])
+UPSTREAM_ERRORS = Counter("upstream_errors", "Failed upstream API calls by status", ["upstream", "status"])
+UPSTREAM_IN_FLIGHT = Gauge("upstream_in_flight", "Upstream calls holding a rate-limiter slot", ["upstream"])
+UPSTREAM_CONCURRENCY_LIMIT = Gauge(
+    "upstream_concurrency_limit", "Current adaptive concurrency window per upstream", ["upstream"]
+)
+ITEMS_PROCESSED = Counter("items_processed", "Emails fetched, companies extracted and reports produced", ["kind"])
+WATCHER_CONNECTED = Gauge("mail_watcher_connected", "1 while the mail watcher holds its IMAP IDLE session")
+WATCHER_RECONNECTS = Counter("mail_watcher_reconnects", "IMAP IDLE sessions lost by the mail watcher")
+
+
+# ---- Trace IDs -------------------------------------------------------------------------------
+
+trace_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_id", default=None)
+
+MAX_TRACES = 256
+MAX_SPANS_PER_TRACE = 2000
+_traces: "OrderedDict[str, List[dict]]" = OrderedDict()
+_traces_lock = threading.Lock()
+
+
+def start_trace(trace_id: Optional[str] = None) -> str:
+    """Tags every stage timed in the current context (and tasks/threads spawned from it) with a trace ID."""
+    trace_id = trace_id or uuid.uuid4().hex
+    trace_id_var.set(trace_id)
+    with _traces_lock:
+        _traces[trace_id] = []
+        while len(_traces) > MAX_TRACES:
+            _traces.popitem(last=False)
+    return trace_id
+
+
+def get_trace(trace_id: str) -> Optional[List[dict]]:
+    with _traces_lock:
+        spans = _traces.get(trace_id)
+        return list(spans) if spans is not None else None
+
+
+def _record_span(stage: str, started_at: float, seconds: float, error: Optional[str]):
+    trace_id = trace_id_var.get()
+    if trace_id is None:
+        return
+    with _traces_lock:
+        spans = _traces.get(trace_id)
+        if spans is not None and len(spans) < MAX_SPANS_PER_TRACE:
+            spans.append({"stage": stage, "started_at": started_at, "seconds": round(seconds, 6), "error": error})
+
+
+class TraceIdFilter(logging.Filter):
+    """Adds `trace_id` to log records so log lines can be joined with /metrics/traces."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get() or "-"
+        return True
+
+
+# ---- Stage timing ----------------------------------------------------------------------------
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Times a block into the stage histogram, counting errors and in-flight calls."""
+    STAGE_IN_FLIGHT.inc(stage=stage)
+    started_at = time.time()
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        if not isinstance(e, (asyncio.CancelledError, GeneratorExit)):
+            error = type(e).__name__
+            STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        STAGE_IN_FLIGHT.dec(stage=stage)
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        _record_span(stage, started_at, seconds, error)
+
+
+def timed(stage: str):
+    """Decorator form of `stage_timer` for plain and async functions."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage_timer(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,67 @@
+from typing import Any, Dict, Iterator, Optional
+
+# Dict key -> attribute ("from" is a keyword)
+_FIELDS = {"id": "id", "message_id": "message_id", "subject": "subject", "from": "sender", "date": "date", "snippet": "snippet"}
+
+
+class EmailRecord:
+    """
+    Compact summary of one fetched message, kept from fetch through extraction and research.
+    Reads like the dict it replaces (record["from"], record.get("subject")) so pipeline code is
+    unchanged; `to_dict()` is for the API/JSON boundary. `date` is the raw Date header, parsed
+    only when serialized (see app.utils.mime.parse_email_date).
+    """
+
+    __slots__ = tuple(_FIELDS.values())
+
+    def __init__(
+        self,
+        id: str,
+        message_id: str = "",
+        subject: str = "",
+        sender: str = "",
+        date: Optional[str] = None,
+        snippet: str = "",
+    ):
+        self.id = id
+        self.message_id = message_id
+        self.subject = subject
+        self.sender = sender
+        self.date = date
+        self.snippet = snippet
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, _FIELDS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        try:
+            setattr(self, _FIELDS[key], value)
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_FIELDS)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        attribute = _FIELDS.get(key)
+        return getattr(self, attribute) if attribute else default
+
+    def keys(self):
+        return _FIELDS.keys()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, attribute) for key, attribute in _FIELDS.items()}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, EmailRecord):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"EmailRecord(id={self.id!r}, message_id={self.message_id!r}, subject={self.subject!r})"
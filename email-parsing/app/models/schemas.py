@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import List, Optional, Any, Dict
 from datetime import datetime
 
@@ -12,7 +12,7 @@ class Email(BaseModel):
     id: str
     subject: str
     sender: EmailStr
-    date: datetime
+    date: Optional[datetime] = None  # None when the Date header is missing or unparseable
     snippet: str
 
 
@@ -26,6 +26,22 @@ class CompanyProfile(BaseModel):
     website: Optional[str]
 
 
+class CompanyMetrics(BaseModel):
+    founded_year: Optional[int] = Field(None, description="Year the company was founded")
+    market_cap: Optional[float] = Field(None, description="Market capitalisation in USD")
+    employees: Optional[int] = Field(None, description="Number of employees")
+    domain_age: Optional[int] = Field(None, description="Age of the company's web domain in years")
+    sentiment_score: Optional[float] = Field(None, ge=0, le=1, description="Online sentiment from 0 to 1")
+    certified: Optional[bool] = Field(None, description="Holds recognised industry certifications")
+    funded_by_top_investors: Optional[bool] = Field(None, description="Backed by well-known investors")
+
+
+class CompanyResearch(BaseModel):
+    """Profile and metrics returned together by a single structured LLM call."""
+    profile: str = Field(..., description="Concise factual company profile")
+    metrics: CompanyMetrics
+
+
 class CredibilityScore(BaseModel):
     score: float  # 🔁 Changed from int to float
     raw_metrics: Dict[str, Any]  # e.g., {"age_years": 5, "market_cap": 1e9}
@@ -45,3 +61,21 @@ class ResearchReport(BaseModel):
     key_insights: Optional[List[str]]
     recommendations: Optional[List[str]]
     credibility: Optional[CredibilityScore]
+
+
+class SenderDomainMapping(BaseModel):
+    domain: str
+    company_name: str
+    source: str  # extracted | research | manual
+
+
+class OrchestrationJob(BaseModel):
+    job_id: str
+    status: str  # queued | running | succeeded | failed
+    attempts: int
+    params: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+    deduplicated: bool = False
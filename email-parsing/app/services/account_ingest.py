@@ -0,0 +1,370 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import MailAccount
+from app.core.metrics import ITEMS_PROCESSED, stage_timer
+from app.models.schemas import ResearchReport
+from app.services.gmail_service import GmailService
+from app.services.mail_sync_state import MailSyncState, SyncCheckpoint
+from app.services.orchestrator import sender_domain_votes
+from app.services.research_engine import ResearchEngine, used_fallback_metrics
+from app.services.sender_index import SenderDomainIndex, sender_domain
+from app.utils.canonicalize import cluster_company_names
+from app.utils.extract import extract_companies_per_email
+
+Shard = Tuple[MailAccount, str]  # (account, mailbox)
+
+
+@dataclass
+class ShardResult:
+    """One account turn as sent back from a worker process: no message bodies, only what the merge needs."""
+    account: str
+    mailbox: str
+    domains: List[Optional[str]]  # sender domain of each new email
+    candidates: List[List[Tuple[str, str]]]  # (name, source) candidates of each new email
+    remaining: int  # new messages left for the account's next turn
+    message_ids: List[str] = field(default_factory=list)  # Message-ID of each new email
+    checkpoint: Optional[SyncCheckpoint] = None  # uncommitted sync, committed by the scheduler after research
+
+
+async def _sync_shard_async(
+    account: MailAccount, mailbox: str, db_path: str, limit: int, resume: Optional[SyncCheckpoint] = None
+) -> ShardResult:
+    sender_index = SenderDomainIndex(db_path)
+    await sender_index.load()
+    service = GmailService(account.email_address, account.app_password)
+    connected, message = await service.connect()
+    if not connected:
+        raise ConnectionError(message)
+    try:
+        # Errors propagate so the scheduler counts the turn as failed instead of "no new mail"
+        emails = await service.sync_new_emails(
+            MailSyncState(db_path), mailbox, limit=limit, raise_errors=True, commit=False, resume=resume
+        )
+        remaining = service.sync_remaining
+        checkpoint = service.sync_checkpoint
+    finally:
+        await service.logout()
+    candidates = extract_companies_per_email(emails, sender_index=sender_index)
+    return ShardResult(
+        account.email_address,
+        mailbox,
+        [sender_domain(email.get("from", "")) for email in emails],
+        candidates,
+        remaining,
+        [email["message_id"] for email in emails],
+        checkpoint,
+    )
+
+
+def sync_shard(
+    account: MailAccount, mailbox: str, db_path: str, limit: int, resume: Optional[SyncCheckpoint] = None
+) -> ShardResult:
+    """
+    Worker-process entry point: incremental sync of one mailbox plus company extraction (NER).
+    Nothing is committed to the sync state; `resume` continues after the previous turn's checkpoint.
+    """
+    return asyncio.run(_sync_shard_async(account, mailbox, db_path, limit, resume))
+
+
+class CompanyResearchQueue:
+    """
+    Research queue shared by every mailbox in a run. Names are clustered against the companies
+    already queued (same canonical key or fuzzy match), so a vendor mailing five mailboxes is
+    researched once; each new company is researched by one of `concurrency` workers.
+    Without an engine the queue only deduplicates.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[ResearchEngine],
+        concurrency: int = 5,
+        timeout: Optional[float] = None,
+        similarity_threshold: float = 0.88,
+    ):
+        self.engine = engine
+        self.concurrency = max(concurrency, 1)
+        self.timeout = timeout
+        self.similarity_threshold = similarity_threshold
+        self.companies: List[str] = []
+        self.reports: Dict[str, ResearchReport] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        if self.engine:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    def submit(self, names: Iterable[str]) -> Dict[str, str]:
+        """Queues the companies not seen before in this run; returns {name: company it was merged into}."""
+        names = [name.strip() for name in names if name and name.strip()]
+        if not names:
+            return {}
+        mapping = cluster_company_names(self.companies + names, threshold=self.similarity_threshold)
+        known: Dict[str, str] = {}
+        for company in self.companies:
+            known.setdefault(mapping[company], company)
+        merged = {}
+        for name in names:
+            cluster = mapping[name]
+            if cluster not in known:
+                known[cluster] = cluster
+                self.companies.append(cluster)
+                ITEMS_PROCESSED.inc(kind="companies")
+                if self.engine:
+                    self._queue.put_nowait(cluster)
+            merged[name] = known[cluster]
+        return merged
+
+    async def _work(self):
+        while True:
+            company = await self._queue.get()
+            try:
+                report = await asyncio.wait_for(self.engine.research_company(company), self.timeout)
+                if report:
+                    self.reports[company] = report
+            except asyncio.TimeoutError:
+                logging.warning(f"⏰ Research for {company} timed out after {self.timeout}s")
+            except Exception as e:
+                logging.error(f"❌ Failed to research {company}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def join(self) -> Dict[str, ResearchReport]:
+        """Waits for everything queued so far; returns {company: report} for the successful ones."""
+        await self._queue.join()
+        return self.reports
+
+    async def close(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+@dataclass
+class AccountStats:
+    emails: int = 0
+    turns: int = 0
+    failures: int = 0
+    skipped: bool = False
+    last_error: Optional[str] = None
+    mailboxes: Set[str] = field(default_factory=set)
+
+    def to_dict(self) -> dict:
+        return {
+            "emails": self.emails,
+            "turns": self.turns,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_error": self.last_error,
+            "mailboxes": sorted(self.mailboxes),
+        }
+
+
+class AccountIngestScheduler:
+    """
+    Syncs many mailboxes across a process pool and merges their companies into one
+    CompanyResearchQueue.
+
+    Each turn syncs at most `batch_limit` new messages of one (account, mailbox) shard and runs
+    NER on them in a worker process. An account has at most one turn in flight, and a shard with
+    mail left goes to the back of the round-robin queue, so one busy mailbox can't monopolise
+    the pool. A failing turn (login error, timeout, crashed worker) only affects its own account:
+    it is retried at the back of the queue and the account is skipped for the rest of the run
+    after `max_failures` consecutive failures. Sync progress is committed only after research:
+    a message stays unprocessed (and is fetched again by the next run) unless all of its
+    companies were researched. A turn that exceeds `shard_timeout` is stopped by
+    recycling the pool (its worker keeps running otherwise, holding a slot and racing the
+    account's next turn); the other turns lost with that pool are retried without counting as
+    failures. Sync state is per account and mailbox
+    (MailSyncState), so every account resumes from its own high-water mark.
+    """
+
+    def __init__(
+        self,
+        accounts: List[MailAccount],
+        db_path: str,
+        research: CompanyResearchQueue,
+        sender_index: Optional[SenderDomainIndex] = None,
+        processes: int = 0,
+        batch_limit: int = 500,
+        shard_timeout: Optional[float] = None,
+        max_failures: int = 3,
+    ):
+        self.accounts = accounts
+        self.db_path = db_path
+        self.research = research
+        self.sender_index = sender_index
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_limit = batch_limit
+        self.shard_timeout = shard_timeout
+        self.max_failures = max_failures
+        self.stats: Dict[str, AccountStats] = {account.email_address: AccountStats() for account in accounts}
+        self._confirmations: Dict[str, str] = {}
+        self._checkpoints: Dict[Tuple[str, str], SyncCheckpoint] = {}  # (account, mailbox) -> turns so far
+        self._message_companies: Dict[Tuple[str, str], Set[str]] = {}  # (account, Message-ID) -> companies
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._recycled: Set[ProcessPoolExecutor] = set()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: workers run their own event loop and IMAP threads
+        return ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def _initial_shards(self) -> Deque[Shard]:
+        # Interleave accounts (every account's first mailbox, then every second mailbox, ...)
+        depth = max((len(account.mailboxes) for account in self.accounts), default=0)
+        return deque(
+            (account, account.mailboxes[level])
+            for level in range(depth)
+            for account in self.accounts
+            if level < len(account.mailboxes)
+        )
+
+    async def _recycle_pool(self):
+        """Terminates the current pool's workers (a timed-out turn is still running) and starts a new pool."""
+        pool = self._pool
+        # ProcessPoolExecutor cannot stop a running task (terminate_workers() only arrives in 3.14)
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        await asyncio.gather(*(asyncio.to_thread(process.join, 10) for process in processes))
+        self._recycled.add(pool)
+        self._pool = self._new_pool()
+
+    async def _turn(self, pool: ProcessPoolExecutor, shard: Shard) -> ShardResult:
+        account, mailbox = shard
+        resume = self._checkpoints.get((account.email_address, mailbox))
+        future = pool.submit(sync_shard, account, mailbox, self.db_path, self.batch_limit, resume)
+        return await asyncio.wait_for(asyncio.wrap_future(future), self.shard_timeout)
+
+    async def run(self) -> Dict[str, dict]:
+        """One pass: every shard is synced until caught up (or skipped); returns per-account stats."""
+        pending = self._initial_shards()
+        in_flight: Dict[asyncio.Task, Tuple[Shard, ProcessPoolExecutor]] = {}
+        busy: Set[str] = set()
+        self._pool = self._new_pool()
+        started = time.perf_counter()
+        try:
+            while pending or in_flight:
+                for _ in range(len(pending)):
+                    if len(in_flight) >= self.processes:
+                        break
+                    shard = pending.popleft()
+                    if shard[0].email_address in busy:
+                        pending.append(shard)
+                        continue
+                    busy.add(shard[0].email_address)
+                    in_flight[asyncio.create_task(self._turn(self._pool, shard))] = (shard, self._pool)
+                if not in_flight:
+                    continue
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    shard, pool = in_flight.pop(task)
+                    if isinstance(task.exception(), asyncio.TimeoutError) and pool is self._pool:
+                        logging.warning(f"♻️ Turn for {shard[0].email_address}/{shard[1]} timed out, recycling the pool")
+                        await self._recycle_pool()
+                    # Only now is the account's worker known to be finished or dead
+                    busy.discard(shard[0].email_address)
+                    if self._finish_turn(shard, task, pool):
+                        pending.append(shard)
+                for task in done:
+                    if not task.exception():
+                        await self._merge(task.result())
+        finally:
+            for task in in_flight:
+                task.cancel()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+        reports = await self.research.join()
+        await self._commit_sync(reports)
+        if self.sender_index:
+            confirmed = {
+                domain: company
+                for domain, company in self._confirmations.items()
+                if company in reports and not used_fallback_metrics(reports[company])
+            }
+            await self.sender_index.record(confirmed, "research")
+        emails = sum(stats.emails for stats in self.stats.values())
+        logging.info(
+            f"📮 Ingested {emails} emails from {len(self.accounts)} accounts in {time.perf_counter() - started:.1f}s: "
+            f"{len(self.research.companies)} companies, {len(reports)} reports"
+        )
+        return {address: stats.to_dict() for address, stats in self.stats.items()}
+
+    def _finish_turn(self, shard: Shard, task: asyncio.Task, pool: ProcessPoolExecutor) -> bool:
+        """Updates the account's stats; returns True if the shard needs another turn."""
+        account, mailbox = shard
+        stats = self.stats[account.email_address]
+        stats.turns += 1
+        error = task.exception()
+        if error is None:
+            result: ShardResult = task.result()
+            stats.failures = 0
+            stats.emails += len(result.domains)
+            stats.mailboxes.add(mailbox)
+            if result.checkpoint:
+                key = (account.email_address, mailbox)
+                previous = self._checkpoints.get(key)
+                self._checkpoints[key] = previous.extend(result.checkpoint) if previous else result.checkpoint
+            return result.remaining > 0
+
+        if isinstance(error, BrokenProcessPool) and pool in self._recycled:
+            stats.turns -= 1
+            logging.info(f"🔁 Turn for {account.email_address}/{mailbox} was lost with a recycled pool, retrying")
+            return True
+        if isinstance(error, BrokenProcessPool) and pool is self._pool:
+            logging.warning("♻️ An ingest worker process died, restarting the pool")
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+        stats.failures += 1
+        stats.last_error = f"{type(error).__name__}: {error}"
+        if stats.failures >= self.max_failures:
+            stats.skipped = True
+            logging.error(f"❌ Skipping {account.email_address} for this run after {stats.failures} failures: {error}")
+            return False
+        logging.warning(f"⚠️ Turn for {account.email_address}/{mailbox} failed ({stats.last_error}), will retry")
+        return True
+
+    async def _commit_sync(self, reports: Dict[str, ResearchReport]):
+        """Commits every synced shard, leaving messages with an unresearched company for the next run."""
+        state = MailSyncState(self.db_path)
+        for checkpoint in self._checkpoints.values():
+            done = [
+                message_id
+                for message_id in checkpoint.messages
+                if self.research.engine is None
+                or self._message_companies.get((checkpoint.account, message_id), set()) <= reports.keys()
+            ]
+            await state.commit(checkpoint, done)
+        self._checkpoints.clear()
+
+    async def _merge(self, result: ShardResult):
+        """Feeds one turn's companies into the shared research queue."""
+        if not result.domains:
+            return
+        with stage_timer("ingest_merge"):
+            ITEMS_PROCESSED.inc(len(result.domains), kind="emails")
+            if self.sender_index:
+                await self.sender_index.vote(sender_domain_votes(result.domains, result.candidates))
+            merged = self.research.submit(name for candidates in result.candidates for name, _ in candidates)
+            for domain, candidates, message_id in zip(result.domains, result.candidates, result.message_ids):
+                companies = {merged[name.strip()] for name, _ in candidates if name.strip()}
+                self._message_companies[(result.account, message_id)] = set(companies)
+                # Only a lone NER ORG entity can be confirmed (see confirm_sender_domains)
+                if domain and len(candidates) == 1 and candidates[0][1] == "ORG" and len(companies) == 1:
+                    self._confirmations[domain] = companies.pop()
+        logging.info(
+            f"📥 {result.account}/{result.mailbox}: {len(result.domains)} new emails"
+            + (f", {result.remaining} left" if result.remaining else "")
+        )
@@ -1,24 +1,26 @@
 from app.models.schemas import Email
+from app.utils.mime import parse_email_date
 from email.utils import parseaddr
-from datetime import datetime
-from typing import List, Dict
+from typing import Iterable, List, Mapping
 
 class EmailParser:
     @staticmethod
-    def parse_emails(raw_emails: List[Dict]) -> List[Email]:
+    def parse_emails(raw_emails: Iterable[Mapping]) -> List[Email]:
+        """
+        Converts fetched email records (or dicts) into API `Email` models at the response boundary.
+        Fields are already decoded and normalized, so models are built without validation; the
+        /fetch endpoint serializes them directly instead of validating them as its response_model.
+        A missing or unparseable Date header gives date=None, so the same message always
+        serializes the same way.
+        """
         parsed = []
         for e in raw_emails:
             sender = parseaddr(e.get("from", ""))[1]
-            date_str = e.get("date", "")
-            try:
-                date_obj = datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %z")
-            except Exception:
-                date_obj = datetime.utcnow()
-            email_obj = Email(
+            email_obj = Email.model_construct(
                 id=e.get("id"),
                 subject=e.get("subject", ""),
                 sender=sender,
-                date=date_obj,
+                date=parse_email_date(e.get("date")),
                 snippet=e.get("snippet", ""),
             )
             parsed.append(email_obj)
@@ -1,31 +1,33 @@
-import imaplib
-import email
-from email.header import decode_header
+from app.core.config import settings
+from app.core.metrics import timed
+from app.services.imap_executor import run_imap
+from app.services.imap_fetch import fetch_email_summaries, open_imap
 
 class EmailReader:
     def __init__(self, user: str, password: str):
         self.user = user
         self.password = password
-        self.server = "imap.gmail.com"
+        self.server = settings.imap_host
 
+    @timed("imap_fetch")
     def fetch_unread_emails(self):
-        mail = imaplib.IMAP4_SSL(self.server)
+        mail = open_imap(self.server, settings.imap_port, settings.imap_ssl, settings.imap_timeout)
         mail.login(self.user, self.password)
         mail.select("inbox")
 
-        status, messages = mail.search(None, '(UNSEEN)')
+        status, messages = mail.uid("SEARCH", None, "(UNSEEN)")
         email_ids = messages[0].split()
 
-        emails = []
-        for num in email_ids:
-            _, data = mail.fetch(num, "(RFC822)")
-            msg = email.message_from_bytes(data[0][1])
-            subject, encoding = decode_header(msg["Subject"])[0]
-            if isinstance(subject, bytes):
-                subject = subject.decode(encoding or "utf-8")
-
-            from_ = msg.get("From")
-            emails.append({"from": from_, "subject": subject})
+        emails = fetch_email_summaries(
+            mail,
+            email_ids,
+            batch_size=settings.imap_fetch_batch_size,
+            snippet_bytes=settings.imap_snippet_bytes,
+        )
 
         mail.logout()
         return emails
+
+    async def afetch_unread_emails(self):
+        # Runs the blocking fetch on the shared IMAP executor instead of the event loop
+        return await run_imap(self.fetch_unread_emails)
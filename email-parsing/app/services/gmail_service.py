@@ -1,63 +1,162 @@
 import logging
 import imaplib
-import email
-from email.header import decode_header
-from typing import List, Dict
-import aiosqlite
-import asyncio
+from typing import List, Optional
+from app.core.config import settings
+from app.core.metrics import timed
+from app.models.records import EmailRecord
+from app.services.imap_executor import run_imap
+from app.services.imap_fetch import fetch_email_summaries, open_imap
+from app.services.mail_sync_state import MailSyncState, SyncCheckpoint
 
 class GmailService:
     def __init__(self, email_address: str, app_password: str):
         self.email_address = email_address
         self.app_password = app_password
-        self.imap_server = "imap.gmail.com"
+        self.imap_server = settings.imap_host
         self.imap = None
+        self.sync_remaining = 0
+        self.sync_checkpoint: Optional[SyncCheckpoint] = None
+
+    @timed("imap_login")
+    def _login(self) -> imaplib.IMAP4:
+        imap = open_imap(self.imap_server, settings.imap_port, settings.imap_ssl, settings.imap_timeout)
+        imap.login(self.email_address, self.app_password)
+        return imap
 
     async def connect(self):
         try:
-            self.imap = imaplib.IMAP4_SSL(self.imap_server)
-            self.imap.login(self.email_address, self.app_password)
+            self.imap = await run_imap(self._login)
             logging.info("Connected to Gmail IMAP server")
             return True, "Connected successfully"
         except Exception as e:
             logging.error(f"Gmail connection error: {e}")
             return False, str(e)
 
-    async def fetch_unread_emails(self) -> List[Dict]:
+    async def logout(self):
+        if self.imap is None:
+            return
+        try:
+            await run_imap(self.imap.logout)
+        except Exception as e:
+            logging.warning(f"Gmail logout error: {e}")
+        finally:
+            self.imap = None
+
+    @timed("imap_fetch")
+    def _fetch_unread_blocking(self) -> List[EmailRecord]:
+        self.imap.select("INBOX")
+        status, messages = self.imap.uid("SEARCH", None, "(UNSEEN)")
+        if status != "OK":
+            logging.warning("Failed to search for unread emails")
+            return []
+        return fetch_email_summaries(
+            self.imap,
+            messages[0].split(),
+            batch_size=settings.imap_fetch_batch_size,
+            snippet_bytes=settings.imap_snippet_bytes,
+        )
+
+    async def fetch_unread_emails(self) -> List[EmailRecord]:
         emails = []
         try:
-            self.imap.select("INBOX")
-            status, messages = self.imap.search(None, '(UNSEEN)')
-            if status != "OK":
-                logging.warning("Failed to search for unread emails")
-                return emails
-            for num in messages[0].split():
-                status, data = self.imap.fetch(num, '(RFC822)')
-                if status != "OK":
-                    continue
-                msg = email.message_from_bytes(data[0][1])
-                subject, encoding = decode_header(msg["Subject"])[0]
-                if isinstance(subject, bytes):
-                    subject = subject.decode(encoding or "utf-8")
-                from_ = msg.get("From")
-                date = msg.get("Date")
-                snippet = ""
-                if msg.is_multipart():
-                    for part in msg.walk():
-                        ctype = part.get_content_type()
-                        cdispo = str(part.get("Content-Disposition"))
-                        if ctype == "text/plain" and "attachment" not in cdispo:
-                            snippet = part.get_payload(decode=True).decode(errors="ignore")
-                            break
-                else:
-                    snippet = msg.get_payload(decode=True).decode(errors="ignore")
-                emails.append({
-                    "id": num.decode(),
-                    "subject": subject,
-                    "from": from_,
-                    "date": date,
-                    "snippet": snippet[:500]  # limit snippet length
-                })
+            emails = await run_imap(self._fetch_unread_blocking)
         except Exception as e:
             logging.error(f"Error fetching emails: {e}")
         return emails
+
+    @timed("imap_sync")
+    async def sync_new_emails(
+        self,
+        state: MailSyncState,
+        mailbox: str = "INBOX",
+        account: Optional[str] = None,
+        limit: Optional[int] = None,
+        raise_errors: bool = False,
+        commit: bool = True,
+        resume: Optional[SyncCheckpoint] = None,
+    ) -> List[EmailRecord]:
+        """
+        Incremental sync: fetches only messages with UID above the stored high-water mark
+        (or every UNSEEN message on the first sync / after a UIDVALIDITY change) and skips
+        Message-IDs that were already processed, regardless of their \\Seen flag.
+        `account` namespaces the stored state (default: the mailbox address), so independent
+        consumers of the same mailbox each see every message once. With `limit`, only the oldest
+        `limit` new messages are fetched and the high-water mark stops at the last of them;
+        `sync_remaining` then holds how many are left for the next call.
+        IMAP and state errors are logged and yield no emails unless `raise_errors` is set.
+        With `commit=False` nothing is stored: the messages are left for the caller to pass to
+        MailSyncState.commit (via `sync_checkpoint`) once they have been processed, and `resume`
+        continues after such an uncommitted checkpoint instead of the stored high-water mark.
+        """
+        account = account or self.email_address
+        self.sync_remaining = 0
+        self.sync_checkpoint = None
+        emails = []
+        try:
+            selected = await run_imap(self._select_for_sync, mailbox)
+            if not selected:
+                raise imaplib.IMAP4.error(f"Failed to select {mailbox}")
+            uidvalidity, uidnext = selected
+
+            stored = await state.get_state(account, mailbox)
+            if resume and resume.uidvalidity == uidvalidity:
+                stored = (uidvalidity, resume.high_water)
+            last_uid: Optional[int] = None
+            if stored and stored[0] == uidvalidity:
+                last_uid = stored[1]
+            elif stored:
+                logging.warning(f"UIDVALIDITY of {mailbox} changed ({stored[0]} -> {uidvalidity}), resyncing unread mail")
+
+            criteria = "(UNSEEN)" if last_uid is None else f"UID {last_uid + 1}:*"
+            status, messages = await run_imap(self.imap.uid, "SEARCH", None, criteria)
+            if status != "OK":
+                raise imaplib.IMAP4.error(f"Failed to search {mailbox} for new emails")
+
+            # "n:*" always matches the newest message, even when its UID is below n
+            uids = [uid for uid in messages[0].split() if last_uid is None or int(uid) > last_uid]
+            if limit and len(uids) > limit:
+                uids = sorted(uids, key=int)
+                self.sync_remaining = len(uids) - limit
+                uids = uids[:limit]
+            fetched = await run_imap(
+                fetch_email_summaries,
+                self.imap,
+                uids,
+                batch_size=settings.imap_fetch_batch_size,
+                snippet_bytes=settings.imap_snippet_bytes,
+                mark_seen=False,
+            )
+
+            for message in fetched:
+                message["message_id"] = message.get("message_id") or f"<uid-{uidvalidity}-{message['id']}@{mailbox}>"
+            new_ids = await state.unprocessed(account, (m["message_id"] for m in fetched))
+            emails = [m for m in fetched if m["message_id"] in new_ids]
+
+            caught_up = [] if self.sync_remaining else [uidnext - 1]
+            high_water = max([int(uid) for uid in uids] + [last_uid or 0] + caught_up)
+            checkpoint = SyncCheckpoint(
+                account, mailbox, uidvalidity, last_uid, high_water, {m["message_id"]: int(m["id"]) for m in emails}
+            )
+            if commit:
+                await state.commit(checkpoint, checkpoint.messages)
+            else:
+                self.sync_checkpoint = checkpoint
+            logging.info(f"🔄 Synced {mailbox}: {len(emails)} new of {len(uids)} fetched, high-water UID {high_water}")
+        except Exception as e:
+            logging.error(f"Error syncing emails: {e}")
+            if raise_errors:
+                raise
+        return emails
+
+    def _select_for_sync(self, mailbox: str) -> Optional[tuple]:
+        status, _ = self.imap.select(mailbox, readonly=True)
+        if status != "OK":
+            return None
+        return int(self.imap.response("UIDVALIDITY")[1][0]), self._uidnext(mailbox)
+
+    def _uidnext(self, mailbox: str) -> int:
+        uidnext = self.imap.response("UIDNEXT")[1][0]
+        if uidnext is None:
+            _, data = self.imap.status(mailbox, "(UIDNEXT)")
+            uidnext = data[0].split(b"UIDNEXT")[1].strip(b" )")
+        return int(uidnext)
@@ -0,0 +1,33 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+# imaplib is blocking; every IMAP call runs here so a slow server never stalls the event loop.
+# The pool is bounded so a burst of requests can't open an unbounded number of sockets/threads.
+# It is created on first use (and again after a shutdown, e.g. a second app lifespan in tests).
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.imap_max_workers, thread_name_prefix="imap")
+    return _executor
+
+
+async def run_imap(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. the orchestration trace ID) into the worker thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+
+def shutdown_imap_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,227 @@
+import re
+import imaplib
+import logging
+from email import policy
+from email.parser import BytesHeaderParser
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.metrics import stage_timer
+from app.models.records import EmailRecord
+from app.utils.mime import decode_header_value, decode_partial_body
+
+HEADER_FIELDS = "SUBJECT FROM DATE MESSAGE-ID"
+
+_TOKEN = re.compile(
+    rb'\s*(?:'
+    rb'(?P<open>\()|(?P<close>\))'
+    rb'|"(?P<quoted>(?:[^"\\]|\\.)*)"'
+    rb'|\{(?P<literal>\d+)\}$'
+    rb'|(?P<atom>[^\s()"\[]+(?:\[[^\]]*\](?:<\d+>)?)?)'
+    rb')'
+)
+
+
+# Sentinels so a quoted "(" in a response is not mistaken for list structure
+_OPEN, _CLOSE = object(), object()
+
+
+def _tokenize(data: Sequence) -> List:
+    tokens = []
+    for item in data:
+        if item is None:
+            continue
+        head, literal = (item[0], item[1]) if isinstance(item, tuple) else (item, None)
+        pos = 0
+        while pos < len(head):
+            match = _TOKEN.match(head, pos)
+            if not match or match.end() == pos:
+                break
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == "open":
+                tokens.append(_OPEN)
+            elif kind == "close":
+                tokens.append(_CLOSE)
+            elif kind == "quoted":
+                tokens.append(re.sub(rb"\\(.)", rb"\1", match.group("quoted")).decode(errors="replace"))
+            elif kind == "atom":
+                atom = match.group("atom").decode(errors="replace")
+                tokens.append(None if atom.upper() == "NIL" else atom)
+        if literal is not None:
+            tokens.append(bytes(literal))
+    return tokens
+
+
+def _parse_list(tokens: List, pos: int) -> Tuple[list, int]:
+    items = []
+    while pos < len(tokens):
+        token = tokens[pos]
+        if token is _OPEN:
+            child, pos = _parse_list(tokens, pos + 1)
+            items.append(child)
+        elif token is _CLOSE:
+            return items, pos + 1
+        else:
+            items.append(token)
+            pos += 1
+    return items, pos
+
+
+def parse_fetch_response(data: Sequence) -> List[Dict[str, object]]:
+    """
+    Parses the raw `data` returned by `imaplib.IMAP4.uid("FETCH", ...)` into one dict per message,
+    mapping upper-cased item names (UID, BODYSTRUCTURE, BODY[...]) to their values.
+    """
+    parsed, _ = _parse_list(_tokenize(data), 0)
+    messages = []
+    for item in parsed:
+        if not isinstance(item, list):
+            continue  # message sequence number preceding the item list
+        values = {}
+        for key, value in zip(item[::2], item[1::2]):
+            if isinstance(key, str):
+                values[key.upper()] = value
+        messages.append(values)
+    return messages
+
+
+def find_text_part(structure: list, prefix: str = "") -> Optional[Tuple[str, str, str]]:
+    """
+    Walks a parsed BODYSTRUCTURE and returns (section, transfer_encoding, charset)
+    of the first non-attachment text/plain part, falling back to the first text/* part.
+    """
+    candidates = []
+
+    def walk(node: list, section: str):
+        if node and isinstance(node[0], list):
+            for index, child in enumerate(n for n in node if isinstance(n, list) and n and not _is_params(n)):
+                walk(child, f"{section}.{index + 1}" if section else str(index + 1))
+            return
+        if len(node) < 7 or not isinstance(node[0], str):
+            return
+        ctype, subtype = node[0].lower(), (node[1] or "").lower()
+        disposition = node[9] if ctype == "text" and len(node) > 9 else None
+        if isinstance(disposition, list) and disposition and str(disposition[0]).lower() == "attachment":
+            return
+        if ctype == "text":
+            params = node[2] if isinstance(node[2], list) else []
+            charset = next(
+                (str(v) for k, v in zip(params[::2], params[1::2]) if str(k).lower() == "charset"),
+                "utf-8",
+            )
+            candidates.append((subtype, section or "1", (node[5] or "7bit").lower(), charset))
+
+    walk(structure, prefix)
+    for subtype, section, encoding, charset in candidates:
+        if subtype == "plain":
+            return section, encoding, charset
+    if candidates:
+        _, section, encoding, charset = candidates[0]
+        return section, encoding, charset
+    return None
+
+
+def _is_params(node: list) -> bool:
+    # A body parameter list ("charset" "utf-8") sits among multipart children; children start with a list or type string
+    return not isinstance(node[0], list) and len(node) < 7
+
+
+def _as_bytes(value) -> bytes:
+    if isinstance(value, bytes):
+        return bytes(value)
+    return value.encode() if isinstance(value, str) else b""
+
+
+def open_imap(host: str, port: int, ssl: bool = True, timeout: Optional[float] = None) -> imaplib.IMAP4:
+    """Opens an IMAP connection; `ssl=False` is for local stand-in servers (benchmarks)."""
+    if ssl:
+        return imaplib.IMAP4_SSL(host, port, timeout=timeout)
+    return imaplib.IMAP4(host, port, timeout=timeout)
+
+
+def _uid_set(uids: Sequence[bytes]) -> str:
+    return ",".join(uid.decode() if isinstance(uid, bytes) else str(uid) for uid in uids)
+
+
+def fetch_email_summaries(
+    imap,
+    uids: Sequence[bytes],
+    batch_size: int = 200,
+    snippet_bytes: int = 2048,
+    snippet_chars: int = 500,
+    mark_seen: bool = True,
+) -> List[EmailRecord]:
+    """
+    Fetches subject/from/date/message-id and a short text snippet for `uids` on an already
+    selected mailbox. Each batch costs one UID FETCH for headers + BODYSTRUCTURE and one
+    partial BODY.PEEK fetch per distinct text-part section, instead of a full RFC822 per message.
+    PEEK leaves flags untouched, so with `mark_seen` the batch is flagged \\Seen explicitly,
+    matching what a full RFC822 fetch did implicitly.
+    """
+    emails = []
+    round_trips = 0
+    bytes_received = 0
+    header_parser = BytesHeaderParser(policy=policy.compat32)
+
+    for start in range(0, len(uids), batch_size):
+        batch = uids[start:start + batch_size]
+        status, data = imap.uid(
+            "FETCH", _uid_set(batch), f"(UID BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])"
+        )
+        round_trips += 1
+        if status != "OK":
+            logging.warning(f"Header fetch failed for {len(batch)} messages: {status}")
+            continue
+
+        summaries: Dict[str, EmailRecord] = {}
+        text_parts: Dict[str, Tuple[str, str, str]] = {}
+        sections: Dict[str, List[str]] = {}
+        with stage_timer("mime_parse"):
+            items = parse_fetch_response(data)
+        for item in items:
+            uid = item.get("UID")
+            header_bytes = _as_bytes(next((v for k, v in item.items() if k.startswith("BODY[HEADER")), None))
+            if uid is None:
+                continue
+            bytes_received += len(header_bytes)
+            headers = header_parser.parsebytes(header_bytes)
+            text_part = find_text_part(item["BODYSTRUCTURE"]) if isinstance(item.get("BODYSTRUCTURE"), list) else None
+            date = headers.get("Date")
+            summaries[uid] = EmailRecord(
+                id=uid,
+                message_id=str(headers.get("Message-ID") or "").strip(),
+                subject=decode_header_value(headers.get("Subject")),
+                sender=decode_header_value(headers.get("From")),
+                date=str(date).strip() if date is not None else None,
+            )
+            if text_part:
+                text_parts[uid] = text_part
+                sections.setdefault(text_part[0], []).append(uid)
+
+        for section, section_uids in sections.items():
+            status, data = imap.uid("FETCH", _uid_set(section_uids), f"(UID BODY.PEEK[{section}]<0.{snippet_bytes}>)")
+            round_trips += 1
+            if status != "OK":
+                continue
+            with stage_timer("mime_parse"):
+                items = parse_fetch_response(data)
+            for item in items:
+                summary = summaries.get(item.get("UID"))
+                body = _as_bytes(next((v for k, v in item.items() if k.startswith("BODY[")), None))
+                if summary is None:
+                    continue
+                bytes_received += len(body)
+                _, encoding, charset = text_parts[summary.id]
+                summary.snippet = decode_partial_body(body, encoding, charset).strip()[:snippet_chars]
+
+        if mark_seen and summaries:
+            imap.uid("STORE", _uid_set(list(summaries)), "+FLAGS", "(\\Seen)")
+            round_trips += 1
+
+        for uid in batch:
+            summary = summaries.get(uid.decode() if isinstance(uid, bytes) else str(uid))
+            if summary:
+                emails.append(summary)
+
+    logging.info(f"📥 Fetched {len(emails)} email summaries in {round_trips} round trips ({bytes_received} bytes)")
+    return emails
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Tuple
+
+from app.services.gmail_service import GmailService
+from app.services.imap_executor import run_imap
+
+
+class _AccountSessions:
+    def __init__(self, max_sessions: int):
+        self.semaphore = asyncio.Semaphore(max_sessions)
+        self.idle: Deque[GmailService] = deque()
+
+
+class ImapSessionPool:
+    """
+    Application-scoped pool of logged-in GmailService sessions, at most `max_sessions`
+    per account. Idle sessions are health-checked with NOOP before reuse and replaced
+    when the server dropped them.
+    """
+
+    def __init__(self, max_sessions: int = 3):
+        self.max_sessions = max_sessions
+        self._accounts: Dict[Tuple[str, str], _AccountSessions] = {}
+        self._closed = False
+
+    def _account(self, email_address: str, app_password: str) -> _AccountSessions:
+        key = (email_address, app_password)
+        if key not in self._accounts:
+            self._accounts[key] = _AccountSessions(self.max_sessions)
+        return self._accounts[key]
+
+    async def _healthy(self, service: GmailService) -> bool:
+        try:
+            status, _ = await run_imap(service.imap.noop)
+            return status == "OK"
+        except Exception as e:
+            logging.info(f"Pooled IMAP session for {service.email_address} is stale: {e}")
+            return False
+
+    async def _checkout(self, email_address: str, app_password: str, account: _AccountSessions) -> GmailService:
+        while account.idle:
+            service = account.idle.pop()
+            if await self._healthy(service):
+                return service
+            await service.logout()
+
+        service = GmailService(email_address, app_password)
+        connected, message = await service.connect()
+        if not connected:
+            raise ConnectionError(message)
+        return service
+
+    @asynccontextmanager
+    async def session(self, email_address: str, app_password: str) -> AsyncIterator[GmailService]:
+        """Borrows a connected session; it is returned to the pool unless the caller raised."""
+        if self._closed:
+            raise RuntimeError("IMAP session pool is closed")
+        account = self._account(email_address, app_password)
+        async with account.semaphore:
+            service = await self._checkout(email_address, app_password, account)
+            try:
+                yield service
+            except BaseException:
+                await service.logout()
+                raise
+            if self._closed:
+                await service.logout()
+            else:
+                account.idle.append(service)
+
+    async def close(self):
+        self._closed = True
+        sessions = [service for account in self._accounts.values() for service in account.idle]
+        for account in self._accounts.values():
+            account.idle.clear()
+        await asyncio.gather(*(service.logout() for service in sessions))
+        logging.info(f"Closed {len(sessions)} pooled IMAP sessions")
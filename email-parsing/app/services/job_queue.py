@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import aiosqlite
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def dedupe_key(kind: str, params: Dict[str, Any]) -> str:
+    payload = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class JobQueue:
+    """
+    Durable job queue on SQLite, safe to share between uvicorn worker processes.
+    Claims take the database write lock (BEGIN IMMEDIATE) and hand out a time-limited lease;
+    a job whose lease expires (e.g. its worker crashed) is claimed again by another worker.
+    A partial unique index on dedupe_key rejects a second identical job while one is in flight.
+    """
+
+    def __init__(self, db_path: str, lease_seconds: float = 120.0, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._schema_ready = False
+        self._schema_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        # Autocommit mode so claim() can issue its own BEGIN IMMEDIATE
+        async with aiosqlite.connect(self.db_path, isolation_level=None, timeout=30) as db:
+            db.row_factory = aiosqlite.Row
+            await self._ensure_schema(db)
+            yield db
+
+    async def _ensure_schema(self, db: aiosqlite.Connection):
+        if not self._schema_ready:
+            async with self._schema_lock:
+                if not self._schema_ready:
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.executescript(
+                        "CREATE TABLE IF NOT EXISTS jobs ("
+                        "  job_id TEXT PRIMARY KEY,"
+                        "  kind TEXT NOT NULL,"
+                        "  params_json TEXT NOT NULL,"
+                        "  dedupe_key TEXT NOT NULL,"
+                        "  status TEXT NOT NULL,"
+                        "  attempts INTEGER NOT NULL DEFAULT 0,"
+                        "  lease_owner TEXT,"
+                        "  lease_expires_at REAL,"
+                        "  result_json TEXT,"
+                        "  error TEXT,"
+                        "  created_at REAL NOT NULL,"
+                        "  updated_at REAL NOT NULL"
+                        ");"
+                        "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_inflight ON jobs (dedupe_key) "
+                        "  WHERE status IN ('queued', 'running');"
+                        "CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, created_at);"
+                        "CREATE TABLE IF NOT EXISTS leader_leases ("
+                        "  name TEXT PRIMARY KEY,"
+                        "  owner TEXT NOT NULL,"
+                        "  expires_at REAL NOT NULL"
+                        ");"
+                    )
+                    self._schema_ready = True
+
+    async def enqueue(self, kind: str, params: Dict[str, Any]) -> tuple[str, bool]:
+        """Returns (job_id, created); an identical queued/running job is returned instead of a new one."""
+        key = dedupe_key(kind, params)
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        async with self._connect() as db:
+            try:
+                await db.execute(
+                    "INSERT INTO jobs (job_id, kind, params_json, dedupe_key, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                    (job_id, kind, json.dumps(params, default=str), key, now, now),
+                )
+                return job_id, True
+            except aiosqlite.IntegrityError:
+                async with db.execute(
+                    "SELECT job_id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')", (key,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+                if row is None:  # the in-flight twin finished between our INSERT and SELECT
+                    return await self.enqueue(kind, params)
+                return row["job_id"], False
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        async with self._connect() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose lease expired too often are failed in place and the next one is tried
+                while True:
+                    async with db.execute(
+                        "SELECT job_id, kind, params_json, attempts FROM jobs "
+                        "WHERE status = 'queued' OR (status = 'running' AND lease_expires_at < ?) "
+                        "ORDER BY created_at LIMIT 1",
+                        (now,),
+                    ) as cursor:
+                        row = await cursor.fetchone()
+                    if row is None or row["attempts"] < self.max_attempts:
+                        break
+                    await db.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, updated_at = ? WHERE job_id = ?",
+                        (f"Lease expired after {row['attempts']} attempts", now, row["job_id"]),
+                    )
+                if row is None:
+                    await db.execute("COMMIT")
+                    return None
+                await db.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires_at = ?, updated_at = ? WHERE job_id = ?",
+                    (worker_id, now + self.lease_seconds, now, row["job_id"]),
+                )
+                await db.execute("COMMIT")
+            except BaseException:
+                await db.execute("ROLLBACK")
+                raise
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "params": json.loads(row["params_json"]),
+            "attempt": row["attempts"] + 1,
+        }
+
+    async def renew(self, job_id: str, worker_id: str) -> bool:
+        now = time.time()
+        async with self._connect() as db:
+            cursor = await db.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? "
+                "WHERE job_id = ? AND lease_owner = ? AND status = 'running'",
+                (now + self.lease_seconds, now, job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    async def complete(self, job_id: str, worker_id: str, result: Any) -> bool:
+        return await self._finish(job_id, worker_id, "succeeded", result_json=json.dumps(result, default=str))
+
+    async def fail(self, job_id: str, worker_id: str, error: str, retry: bool = False) -> bool:
+        return await self._finish(job_id, worker_id, "queued" if retry else "failed", error=error)
+
+    async def _finish(
+        self, job_id: str, worker_id: str, status: str, result_json: Optional[str] = None, error: Optional[str] = None
+    ) -> bool:
+        async with self._connect() as db:
+            cursor = await db.execute(
+                "UPDATE jobs SET status = ?, result_json = ?, error = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, updated_at = ? WHERE job_id = ? AND lease_owner = ?",
+                (status, result_json, error, time.time(), job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    async def acquire_lease(self, name: str, owner: str, seconds: float) -> bool:
+        """Takes or renews the named lease; False while another owner holds an unexpired one."""
+        now = time.time()
+        async with self._connect() as db:
+            cursor = await db.execute(
+                "INSERT INTO leader_leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leader_leases.owner = excluded.owner OR leader_leases.expires_at < ?",
+                (name, owner, now + seconds, now),
+            )
+            return cursor.rowcount == 1
+
+    async def release_lease(self, name: str, owner: str):
+        async with self._connect() as db:
+            await db.execute("DELETE FROM leader_leases WHERE name = ? AND owner = ?", (name, owner))
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        async with self._connect() as db:
+            async with db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)) as cursor:
+                row = await cursor.fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "params": json.loads(row["params_json"]),
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result_json"]) if row["result_json"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+
+class JobWorkerPool:
+    """
+    Runs `workers` asyncio workers in this process that claim jobs from `queue` and dispatch them
+    to the handler registered for the job kind. Every uvicorn process can run its own pool.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        workers: int = 2,
+        poll_interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self._prefix}:{index}")) for index in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, worker_id: str):
+        while True:
+            try:
+                job = await self.queue.claim(worker_id)
+            except Exception as e:
+                logging.error(f"Job worker {worker_id} failed to claim: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._run(job, worker_id)
+
+    async def _run(self, job: Dict[str, Any], worker_id: str):
+        job_id = job["job_id"]
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            await self.queue.fail(job_id, worker_id, f"No handler for job kind '{job['kind']}'")
+            return
+
+        logging.info(f"🛠️ Worker {worker_id} running {job['kind']} job {job_id} (attempt {job['attempt']})")
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, worker_id))
+        try:
+            result = await handler(job["params"])
+        except asyncio.CancelledError:
+            # Shutting down: leave the lease to expire so another worker picks the job up
+            raise
+        except Exception as e:
+            logging.error(f"❌ Job {job_id} failed: {e}")
+            await self.queue.fail(job_id, worker_id, str(e), retry=job["attempt"] < self.queue.max_attempts)
+        else:
+            if not await self.queue.complete(job_id, worker_id, result):
+                logging.warning(f"Job {job_id} finished after its lease was taken over; result discarded")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str, worker_id: str):
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await self.queue.renew(job_id, worker_id):
+                logging.warning(f"Lost lease on job {job_id}")
+                return
@@ -0,0 +1,202 @@
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from app.models.records import EmailRecord
+from app.utils.mime import parse_message_fast
+
+ARCHIVE_FORMATS = ("mbox", "maildir")
+
+# An mbox "From_" separator: "From <addr> <asctime>", e.g. "From sender@example.com Mon Jan  1 00:00:00 2024",
+# optionally with a zone before the year ("... 19:35:25 +0000 2018" in Google Takeout exports).
+# Anchored to the asctime layout so body lines like "From 10:30 we start..." are not taken for one.
+FROM_LINE = re.compile(
+    rb"From \S+ +(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun) +(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) +"
+    rb"\d{1,2} +\d\d:\d\d(?::\d\d)? +(?:(?:[A-Z]{3,5}|[+-]\d{4}) +)?\d{4}\b[^\n]*\n"
+)
+
+Position = Union[int, str]  # mbox byte offset / last Maildir unique name
+
+
+# ---- mbox ------------------------------------------------------------------------------------
+
+def _next_from_line(mm: mmap.mmap, pos: int) -> int:
+    """Offset of the first From_ line starting at or after `pos`, or -1."""
+    if pos == 0:
+        if FROM_LINE.match(mm, 0):
+            return 0
+        pos = 1
+    while True:
+        index = mm.find(b"\nFrom ", pos - 1)
+        if index == -1:
+            return -1
+        if FROM_LINE.match(mm, index + 1):
+            return index + 1
+        pos = index + 2
+
+
+def iter_mbox_spans(path: str, start: int = 0) -> Iterator[Tuple[int, int]]:
+    """
+    Yields (start, end) byte ranges of the messages in an mbox file from `start` on. The file is
+    memory-mapped and scanned for From_ lines, so it is never read into memory as a whole.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = _next_from_line(mm, start)
+            while pos != -1:
+                following = _next_from_line(mm, pos + 1)
+                yield pos, following if following != -1 else size
+                pos = following
+
+
+def parse_mbox_chunk(path: str, spans: Sequence[Tuple[int, int]], snippet_chars: int = 500) -> List[EmailRecord]:
+    """Process-pool task: parses the messages at `spans` (From_ line excluded) of an mbox file."""
+    emails = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start, end in spans:
+            body = mm.find(b"\n", start, end) + 1
+            try:
+                emails.append(parse_message_fast(mm[body:end], str(start), snippet_chars))
+            except Exception as e:
+                logging.warning(f"Skipping unparsable message at byte {start} of {path}: {e}")
+    return emails
+
+
+# ---- Maildir ---------------------------------------------------------------------------------
+
+def _maildir_key(name: str) -> str:
+    # The unique part of a Maildir file name; ":2,FLAGS" changes when a message is read or moved
+    return name.split(":", 1)[0]
+
+
+def list_maildir(path: str, after: Optional[str] = None) -> List[str]:
+    """Message files ("cur/…", "new/…") ordered by unique name, optionally only those after `after`."""
+    names = []
+    for sub in ("cur", "new"):
+        directory = os.path.join(path, sub)
+        if os.path.isdir(directory):
+            names.extend(f"{sub}/{entry.name}" for entry in os.scandir(directory) if entry.is_file())
+    names.sort(key=lambda name: _maildir_key(name.split("/", 1)[1]))
+    if after is not None:
+        names = [name for name in names if _maildir_key(name.split("/", 1)[1]) > after]
+    return names
+
+
+def parse_maildir_chunk(path: str, names: Sequence[str], snippet_chars: int = 500) -> List[EmailRecord]:
+    """Process-pool task: parses a batch of Maildir message files."""
+    emails = []
+    for name in names:
+        try:
+            with open(os.path.join(path, name), "rb") as f:
+                emails.append(parse_message_fast(f.read(), _maildir_key(name.split("/", 1)[1]), snippet_chars))
+        except Exception as e:
+            logging.warning(f"Skipping unreadable message {name} in {path}: {e}")
+    return emails
+
+
+# ---- Streaming through a process pool ----------------------------------------------------------
+
+def _chunks(path: str, archive_format: str, position: Optional[Position], chunk_size: int):
+    """Yields (task, args, resume_position) in archive order; resume_position is valid once the task is done."""
+    if archive_format == "mbox":
+        spans = []
+        for span in iter_mbox_spans(path, int(position or 0)):
+            spans.append(span)
+            if len(spans) == chunk_size:
+                yield parse_mbox_chunk, spans, spans[-1][1]
+                spans = []
+        if spans:
+            yield parse_mbox_chunk, spans, spans[-1][1]
+    elif archive_format == "maildir":
+        names = list_maildir(path, position if isinstance(position, str) else None)
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start:start + chunk_size]
+            yield parse_maildir_chunk, chunk, _maildir_key(chunk[-1].split("/", 1)[1])
+    else:
+        raise ValueError(f"Unknown archive format '{archive_format}', expected one of {ARCHIVE_FORMATS}")
+
+
+def detect_format(path: str) -> str:
+    return "maildir" if os.path.isdir(path) else "mbox"
+
+
+def iter_archive(
+    path: str,
+    archive_format: Optional[str] = None,
+    position: Optional[Position] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 500,
+    snippet_chars: int = 500,
+) -> Iterator[Tuple[Position, List[EmailRecord]]]:
+    """
+    Streams an mbox file or Maildir directory as (resume_position, emails) chunks in archive order.
+    Chunks are parsed in a process pool with a bounded number of chunks in flight; pass the last
+    resume_position back as `position` to continue after that chunk. `workers=0` parses in-process.
+    """
+    archive_format = archive_format or detect_format(path)
+    chunks = _chunks(path, archive_format, position, chunk_size)
+
+    if workers == 0:
+        for task, items, resume in chunks:
+            yield resume, task(path, items, snippet_chars)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    # Spawned workers: forking a process that already runs an event loop and threads is unsafe
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    pending: Deque[Tuple[Future, Position]] = deque()
+    max_pending = 2 * workers  # bounded read-ahead: parsing overlaps the pipeline without buffering the archive
+    try:
+        for task, items, resume in chunks:
+            pending.append((pool.submit(task, path, items, snippet_chars), resume))
+            if len(pending) >= max_pending:
+                future, done_at = pending.popleft()
+                yield done_at, future.result()
+        while pending:
+            future, done_at = pending.popleft()
+            yield done_at, future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class ArchiveCheckpoint:
+    """
+    Resume point of an archive backfill in a small JSON file, replaced atomically after every
+    completed batch so an interrupted run continues after the last batch that fully finished.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, source: str, archive_format: str) -> Optional[Dict]:
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        if state.get("source") != os.path.abspath(source) or state.get("format") != archive_format:
+            raise ValueError(f"Checkpoint {self.path} belongs to {state.get('source')} ({state.get('format')})")
+        return state
+
+    def save(self, source: str, archive_format: str, position: Position, counters: Dict[str, int]):
+        state = {
+            "source": os.path.abspath(source),
+            "format": archive_format,
+            "position": position,
+            "updated_at": time.time(),
+            **counters,
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
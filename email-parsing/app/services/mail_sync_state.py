@@ -0,0 +1,136 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+
+import aiosqlite
+
+
+@dataclass
+class SyncCheckpoint:
+    """
+    What an uncommitted incremental sync fetched: the high-water UID it reached and the UID of
+    every new message, so MailSyncState.commit can leave the messages that failed downstream
+    for the next sync to fetch again.
+    """
+    account: str
+    mailbox: str
+    uidvalidity: int
+    previous_uid: Optional[int]  # stored high-water mark before the sync (None: first sync)
+    high_water: int
+    messages: Dict[str, int] = field(default_factory=dict)  # Message-ID -> UID
+
+    def extend(self, later: "SyncCheckpoint") -> "SyncCheckpoint":
+        """This checkpoint followed by a later sync that resumed from it."""
+        if later.uidvalidity != self.uidvalidity:
+            return later
+        return SyncCheckpoint(
+            self.account, self.mailbox, self.uidvalidity, self.previous_uid, later.high_water,
+            {**self.messages, **later.messages},
+        )
+
+
+class MailSyncState:
+    """
+    Per-mailbox incremental sync bookkeeping in SQLite: the UIDVALIDITY and highest processed UID
+    of each (account, mailbox), plus the Message-IDs already handed to the pipeline.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._schema_ready = False
+        self._schema_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        async with aiosqlite.connect(self.db_path) as db:
+            await self._ensure_schema(db)
+            yield db
+
+    async def _ensure_schema(self, db: aiosqlite.Connection):
+        if not self._schema_ready:
+            async with self._schema_lock:
+                if not self._schema_ready:
+                    await db.executescript(
+                        "CREATE TABLE IF NOT EXISTS mailbox_sync_state ("
+                        "  account TEXT NOT NULL,"
+                        "  mailbox TEXT NOT NULL,"
+                        "  uidvalidity INTEGER NOT NULL,"
+                        "  last_uid INTEGER NOT NULL,"
+                        "  updated_at REAL NOT NULL,"
+                        "  PRIMARY KEY (account, mailbox)"
+                        ");"
+                        "CREATE TABLE IF NOT EXISTS processed_messages ("
+                        "  account TEXT NOT NULL,"
+                        "  message_id TEXT NOT NULL,"
+                        "  processed_at REAL NOT NULL,"
+                        "  PRIMARY KEY (account, message_id)"
+                        ");"
+                    )
+                    await db.commit()
+                    self._schema_ready = True
+
+    async def get_state(self, account: str, mailbox: str) -> Optional[Tuple[int, int]]:
+        """Returns (uidvalidity, last_uid) or None if the mailbox was never synced."""
+        async with self._connect() as db:
+            async with db.execute(
+                "SELECT uidvalidity, last_uid FROM mailbox_sync_state WHERE account = ? AND mailbox = ?",
+                (account, mailbox),
+            ) as cursor:
+                row = await cursor.fetchone()
+        return (row[0], row[1]) if row else None
+
+    async def save_state(self, account: str, mailbox: str, uidvalidity: int, last_uid: int):
+        async with self._connect() as db:
+            await db.execute(
+                "INSERT OR REPLACE INTO mailbox_sync_state (account, mailbox, uidvalidity, last_uid, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (account, mailbox, uidvalidity, last_uid, time.time()),
+            )
+            await db.commit()
+
+    async def unprocessed(self, account: str, message_ids: Iterable[str]) -> Set[str]:
+        """Returns the subset of `message_ids` not yet recorded as processed for `account`."""
+        message_ids = set(message_ids)
+        if not message_ids:
+            return set()
+        seen = set()
+        ids = list(message_ids)
+        async with self._connect() as db:
+            for start in range(0, len(ids), 500):  # stay under SQLite's bound-parameter limit
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                async with db.execute(
+                    f"SELECT message_id FROM processed_messages WHERE account = ? AND message_id IN ({placeholders})",
+                    (account, *chunk),
+                ) as cursor:
+                    seen.update(row[0] for row in await cursor.fetchall())
+        return message_ids - seen
+
+    async def commit(self, checkpoint: SyncCheckpoint, done: Iterable[str]):
+        """
+        Records the messages in `done` as processed and advances the high-water mark, but not past
+        a message that is not done: the next sync fetches it again (messages after it that are
+        done are skipped by Message-ID). A first sync with failures stores no mark at all, so the
+        next one repeats the UNSEEN search.
+        """
+        done = set(done) & set(checkpoint.messages)
+        failed = [uid for message_id, uid in checkpoint.messages.items() if message_id not in done]
+        await self.mark_processed(checkpoint.account, done)
+        if not failed:
+            high_water = checkpoint.high_water
+        elif checkpoint.previous_uid is not None:
+            high_water = max(min(failed) - 1, checkpoint.previous_uid)
+        else:
+            return
+        await self.save_state(checkpoint.account, checkpoint.mailbox, checkpoint.uidvalidity, high_water)
+
+    async def mark_processed(self, account: str, message_ids: Iterable[str]):
+        now = time.time()
+        async with self._connect() as db:
+            await db.executemany(
+                "INSERT OR IGNORE INTO processed_messages (account, message_id, processed_at) VALUES (?, ?, ?)",
+                [(account, message_id, now) for message_id in message_ids],
+            )
+            await db.commit()
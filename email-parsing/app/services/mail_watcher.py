@@ -0,0 +1,355 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import ssl
+from typing import Awaitable, Callable, List, Optional
+
+from app.core.config import Settings
+from app.core.metrics import ITEMS_PROCESSED, WATCHER_CONNECTED, WATCHER_RECONNECTS, stage_timer
+from app.services.imap_pool import ImapSessionPool
+from app.services.job_queue import JobQueue
+from app.services.mail_sync_state import MailSyncState
+from app.services.orchestrator import commit_sync, confirm_sender_domains, extract_companies
+from app.services.research_engine import ResearchEngine
+from app.services.sender_index import SenderDomainIndex
+
+
+class ImapIdleError(Exception):
+    pass
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class ImapIdleClient:
+    """
+    Minimal asyncio IMAP client used only as a change-notification channel: LOGIN, EXAMINE and
+    IDLE (RFC 2177). It never fetches; new mail is read through the regular session pool.
+    imaplib (before 3.14) has no IDLE, and a socket timeout leaves its buffered reader unusable,
+    so waiting on a blocking connection would tie up an executor thread for up to 29 minutes.
+    """
+
+    def __init__(self, host: str, port: int, use_ssl: bool = True, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.capabilities: List[str] = []
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._tag = 0
+
+    async def connect(self):
+        context = ssl.create_default_context() if self.use_ssl else None
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context), self.timeout
+        )
+        greeting = await self._readline(self.timeout)
+        if not greeting.startswith("* OK"):
+            raise ImapIdleError(f"Unexpected greeting: {greeting}")
+        self._parse_capabilities(greeting)
+
+    async def login(self, user: str, password: str):
+        untagged = await self.command(f"LOGIN {_quote(user)} {_quote(password)}")
+        for line in untagged:
+            self._parse_capabilities(line)
+        if not self.capabilities:
+            for line in await self.command("CAPABILITY"):
+                self._parse_capabilities(line)
+
+    async def examine(self, mailbox: str = "INBOX"):
+        await self.command(f"EXAMINE {_quote(mailbox)}")
+
+    @property
+    def supports_idle(self) -> bool:
+        return "IDLE" in self.capabilities
+
+    def _parse_capabilities(self, line: str):
+        upper = line.upper()
+        if "CAPABILITY " in upper:
+            rest = upper.split("CAPABILITY ", 1)[1]
+            self.capabilities = rest.split("]", 1)[0].split()
+
+    async def _readline(self, timeout: Optional[float]) -> str:
+        raw = await asyncio.wait_for(self._reader.readline(), timeout)
+        if not raw:
+            raise ConnectionError("IMAP server closed the connection")
+        line = raw.decode(errors="replace").rstrip("\r\n")
+        if line.endswith("}") and "{" in line:  # skip literals; nothing here needs their content
+            size = line[line.rindex("{") + 1:-1]
+            if size.isdigit():
+                await asyncio.wait_for(self._reader.readexactly(int(size)), timeout)
+                line += await self._readline(timeout)
+        if line.startswith("* BYE"):
+            raise ConnectionError(f"IMAP server said goodbye: {line}")
+        return line
+
+    async def _send(self, line: str):
+        self._writer.write(line.encode() + b"\r\n")
+        await asyncio.wait_for(self._writer.drain(), self.timeout)
+
+    def _next_tag(self) -> str:
+        self._tag += 1
+        return f"W{self._tag}"
+
+    async def _await_tagged(self, tag: str) -> List[str]:
+        untagged = []
+        while True:
+            line = await self._readline(self.timeout)
+            if line.startswith(tag + " "):
+                status = line.split(" ", 2)[1].upper()
+                if status != "OK":
+                    raise ImapIdleError(line)
+                return untagged
+            untagged.append(line)
+
+    async def command(self, command: str) -> List[str]:
+        """Sends one command and returns its untagged responses; raises unless it completes OK."""
+        tag = self._next_tag()
+        await self._send(f"{tag} {command}")
+        return await self._await_tagged(tag)
+
+    async def idle(self, duration: float) -> bool:
+        """
+        Holds IDLE for up to `duration` seconds. Returns True as soon as the server reports a
+        new message count (EXISTS/RECENT), False when the time ran out with no change.
+        """
+        tag = self._next_tag()
+        await self._send(f"{tag} IDLE")
+        while True:
+            line = await self._readline(self.timeout)
+            if line.startswith("+"):
+                break
+            if line.startswith(tag + " "):
+                raise ImapIdleError(f"IDLE rejected: {line}")
+
+        changed = False
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        while not changed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                line = await self._readline(remaining)
+            except asyncio.TimeoutError:
+                break
+            words = line.upper().split()
+            changed = len(words) >= 3 and words[0] == "*" and words[2] in ("EXISTS", "RECENT")
+
+        await self._send("DONE")
+        await self._await_tagged(tag)
+        return changed
+
+    async def close(self):
+        if self._writer is None:
+            return
+        try:
+            if not self._writer.is_closing():
+                tag = self._next_tag()
+                await self._send(f"{tag} LOGOUT")
+                await asyncio.wait_for(self._reader.read(), 2)
+        except Exception:
+            pass
+        finally:
+            self._writer.close()
+            self._writer = None
+
+
+class MailWatcher:
+    """
+    Background pre-research of incoming mail, started from the FastAPI lifespan.
+
+    One task holds an IMAP IDLE session on INBOX (re-issued every `idle_refresh` seconds, before
+    servers drop it at 30 minutes, and reconnected with exponential backoff). Another task turns
+    notifications into work: it waits `debounce` seconds so a burst of mail is handled as one
+    batch, syncs new messages through the session pool, extracts companies and researches them
+    with at most `concurrency` companies in flight. Notifications that arrive while a batch runs
+    collapse into a single follow-up sync, so a burst never queues more research than one batch
+    at a time; the shared rate limiters still bound the Serper/OpenAI calls themselves.
+
+    The sync uses its own processed-messages namespace, so /fetch and /orchestrate still see the
+    same messages afterwards; their research is answered from the research cache.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        imap_pool: ImapSessionPool,
+        sync_state: MailSyncState,
+        engine: ResearchEngine,
+        sender_index: Optional[SenderDomainIndex] = None,
+        mailbox: str = "INBOX",
+    ):
+        self.settings = settings
+        self.imap_pool = imap_pool
+        self.sync_state = sync_state
+        self.engine = engine
+        self.sender_index = sender_index
+        self.mailbox = mailbox
+        self.idle_refresh = settings.watch_idle_refresh
+        self.debounce = settings.watch_debounce
+        self.poll_interval = settings.watch_poll_interval
+        self.concurrency = settings.watch_research_concurrency
+        self.sync_account = f"{settings.EMAIL_ADDRESS}#watch"
+        self._pending = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.connected = False
+        self.batches = 0
+        self.reports = 0
+
+    def start(self):
+        self._pending.set()  # catch up on mail that arrived while the server was down
+        self._tasks = [
+            asyncio.create_task(self._watch()),
+            asyncio.create_task(self._consume()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _watch(self):
+        failures = 0
+        while True:
+            client = ImapIdleClient(
+                self.settings.imap_host, self.settings.imap_port, self.settings.imap_ssl, self.settings.imap_timeout
+            )
+            try:
+                await client.connect()
+                await client.login(self.settings.EMAIL_ADDRESS, self.settings.APP_PASSWORD)
+                await client.examine(self.mailbox)
+                if failures:
+                    self._pending.set()  # mail may have arrived while disconnected
+                self.connected = True
+                WATCHER_CONNECTED.set(1)
+                logging.info(f"👀 Watching {self.mailbox} for new mail")
+                if not client.supports_idle:
+                    logging.warning(f"IMAP server has no IDLE, polling {self.mailbox} every {self.poll_interval:.0f}s")
+                while True:
+                    if client.supports_idle:
+                        changed = await client.idle(self.idle_refresh)
+                    else:
+                        await asyncio.sleep(self.poll_interval)
+                        await client.command("NOOP")
+                        changed = True
+                    failures = 0
+                    if changed:
+                        self._pending.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                WATCHER_RECONNECTS.inc()
+                delay = min(300.0, 2 ** min(failures, 8)) * random.uniform(0.5, 1.0)
+                logging.warning(f"⚠️ Mail watcher lost IMAP IDLE ({e}), reconnecting in {delay:.0f}s")
+            finally:
+                self.connected = False
+                WATCHER_CONNECTED.set(0)
+                await client.close()
+            await asyncio.sleep(delay)
+
+    async def _consume(self):
+        while True:
+            await self._pending.wait()
+            await asyncio.sleep(self.debounce)
+            self._pending.clear()
+            try:
+                await self._process_new_mail()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"❌ Mail watcher batch failed: {e}")
+
+    async def _process_new_mail(self):
+        with stage_timer("watch_batch"):
+            try:
+                async with self.imap_pool.session(self.settings.EMAIL_ADDRESS, self.settings.APP_PASSWORD) as service:
+                    emails = await service.sync_new_emails(
+                        self.sync_state, self.mailbox, account=self.sync_account, commit=False
+                    )
+                    checkpoint = service.sync_checkpoint
+            except ConnectionError as e:
+                logging.error(f"Mail watcher failed to connect to Gmail: {e}")
+                return
+            if not emails:
+                await commit_sync(self.sync_state, checkpoint, [], [], [])
+                return
+            ITEMS_PROCESSED.inc(len(emails), kind="emails")
+
+            company_names, candidates_per_email = await extract_companies(
+                emails, self.sender_index, self.settings.company_similarity_threshold
+            )
+            results = await self.engine.research_companies(
+                company_names, concurrency=self.concurrency, timeout=self.settings.research_timeout
+            )
+            reports = [report for report in results if report]
+            await confirm_sender_domains(emails, candidates_per_email, reports, self.sender_index)
+            researched = [name for name, report in zip(company_names, results) if report]
+            await commit_sync(self.sync_state, checkpoint, emails, candidates_per_email, researched)
+            self.batches += 1
+            self.reports += len(reports)
+            logging.info(
+                f"📬 Pre-researched {len(reports)}/{len(company_names)} companies from {len(emails)} new emails"
+            )
+
+
+class LeaderElection:
+    """
+    Runs a singleton background service in exactly one process of the deployment. Every process
+    tries to take (or renew) a named lease in the job database every `lease_seconds / 3`; the
+    holder calls `start()`, and a process that fails to renew in time calls `stop()`. When the
+    holder exits or dies, its lease is released or expires and another process takes over.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        name: str,
+        start: Callable[[], None],
+        stop: Callable[[], Awaitable[None]],
+        lease_seconds: float = 30.0,
+    ):
+        self.queue = queue
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.leading = False
+        self._start = start
+        self._stop = stop
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.leading:
+            self.leading = False
+            await self._stop()
+            await self.queue.release_lease(self.name, self.owner)
+
+    async def _run(self):
+        while True:
+            try:
+                held = await self.queue.acquire_lease(self.name, self.owner, self.lease_seconds)
+            except Exception as e:
+                logging.error(f"Leader election for {self.name} failed: {e}")
+                held = False
+            if held and not self.leading:
+                logging.info(f"👑 {self.owner} now runs {self.name}")
+                self.leading = True
+                self._start()
+            elif not held and self.leading:
+                logging.warning(f"{self.owner} lost the {self.name} lease, stopping")
+                self.leading = False
+                await self._stop()
+            await asyncio.sleep(self.lease_seconds / 3)
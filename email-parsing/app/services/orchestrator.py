@@ -0,0 +1,200 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import Settings
+from app.core.metrics import ITEMS_PROCESSED, timed
+from app.models.records import EmailRecord
+from app.models.schemas import ResearchReport
+from app.services.imap_pool import ImapSessionPool
+from app.services.mail_sync_state import MailSyncState, SyncCheckpoint
+from app.services.report_store import ReportStore
+from app.services.research_cache import ResearchCache
+from app.services.research_engine import ResearchEngine, used_fallback_metrics
+from app.services.sender_index import SenderDomainIndex, sender_domain
+from app.utils.canonicalize import cluster_company_names
+from app.utils.extract import extract_companies_per_email
+
+
+async def fetch_emails(
+    settings: Settings,
+    imap_pool: ImapSessionPool,
+    sync_state: MailSyncState,
+    incremental: Optional[bool] = None,
+    raise_on_connection_error: bool = False,
+) -> Tuple[List[EmailRecord], Optional[SyncCheckpoint]]:
+    """
+    Unread (or, incrementally, new) mail for the configured account. A mailbox that cannot be
+    reached yields no emails unless raise_on_connection_error is set, so callers that retry
+    (background jobs) don't mistake an outage for an empty inbox.
+    An incremental sync is not committed here: the returned checkpoint goes to commit_sync once
+    the emails have been researched.
+    """
+    emails, checkpoint = [], None
+    try:
+        async with imap_pool.session(settings.EMAIL_ADDRESS, settings.APP_PASSWORD) as gmail_service:
+            if settings.incremental_sync if incremental is None else incremental:
+                emails = await gmail_service.sync_new_emails(sync_state, commit=False)
+                checkpoint = gmail_service.sync_checkpoint
+            else:
+                emails = await gmail_service.fetch_unread_emails()
+    except ConnectionError as e:
+        logging.error(f"Failed to connect to Gmail: {e}")
+        if raise_on_connection_error:
+            raise
+    ITEMS_PROCESSED.inc(len(emails), kind="emails")
+    return emails, checkpoint
+
+
+def researched_message_ids(
+    emails: List[dict], candidates_per_email: List[List[Tuple[str, str]]], researched: Set[str]
+) -> List[str]:
+    """Message-IDs of the emails whose companies were all researched (emails without companies included)."""
+    return [
+        email["message_id"]
+        for email, candidates in zip(emails, candidates_per_email)
+        if email.get("message_id") and all(name in researched for name, _ in candidates)
+    ]
+
+
+async def commit_sync(
+    sync_state: MailSyncState,
+    checkpoint: Optional[SyncCheckpoint],
+    emails: List[dict],
+    candidates_per_email: List[List[Tuple[str, str]]],
+    researched: Iterable[str],
+):
+    """Marks the synced emails whose research succeeded as processed; the rest are fetched again next sync."""
+    if checkpoint is None:
+        return
+    await sync_state.commit(checkpoint, researched_message_ids(emails, candidates_per_email, set(researched)))
+
+
+def sender_domain_votes(
+    domains: List[Optional[str]], per_email: List[List[Tuple[str, str]]]
+) -> Dict[str, Tuple[Optional[str], int]]:
+    """
+    Sender domain -> (company, emails) for mail whose only candidate is a single ORG entity.
+    A domain whose emails named different companies maps to (None, 0).
+    """
+    votes: Dict[str, Tuple[Optional[str], int]] = {}
+    for domain, candidates in zip(domains, per_email):
+        orgs = [name for name, source in candidates if source == "ORG"]
+        if not domain or len(orgs) != 1 or len(candidates) != 1:
+            continue
+        company, count = votes.get(domain, (orgs[0], 0))
+        votes[domain] = (company, count + 1) if company == orgs[0] else (None, 0)
+    return votes
+
+
+def _representatives(candidates: List[Tuple[str, str]], canonical: Dict[str, str]) -> List[Tuple[str, str]]:
+    """An email's (name, source) candidates mapped to their cluster representatives, first seen wins."""
+    representatives: Dict[str, str] = {}
+    for name, source in candidates:
+        if name.strip():
+            representatives.setdefault(canonical[name.strip()], source)
+    return list(representatives.items())
+
+
+async def extract_companies(
+    emails: List[dict],
+    sender_index: Optional[SenderDomainIndex] = None,
+    similarity_threshold: float = 0.88,
+    n_process: int = 1,
+) -> Tuple[List[str], List[List[Tuple[str, str]]]]:
+    """
+    Returns (company_names, candidates_per_email). Known sender domains skip NER; a sender whose
+    mail keeps yielding the same single ORG entity is voted into the index as an "extracted" mapping.
+    Spellings of the same company ("Acme Inc", "Acme Inc.", "ACME") are clustered so each company
+    is researched once; candidates_per_email holds each email's cluster representatives as
+    (name, source) pairs, source being "sender_index" when the name came from the index.
+    n_process is handed to spaCy's nlp.pipe; only worth raising for batches of thousands of emails.
+    """
+    if sender_index:
+        await sender_index.refresh()
+    per_email = extract_companies_per_email(emails, n_process=n_process, sender_index=sender_index)
+
+    if sender_index:
+        domains = [sender_domain(email.get("from", "")) for email in emails]
+        await sender_index.vote(sender_domain_votes(domains, per_email))
+
+    raw_names = [name.strip() for candidates in per_email for name, _ in candidates if name.strip()]
+    canonical = cluster_company_names(raw_names, threshold=similarity_threshold)
+    candidates_per_email = [_representatives(candidates, canonical) for candidates in per_email]
+    company_names = list(dict.fromkeys(name for candidates in candidates_per_email for name, _ in candidates))
+    ITEMS_PROCESSED.inc(len(company_names), kind="companies")
+    if len(company_names) < len(set(raw_names)):
+        logging.info(f"🧩 Merged {len(set(raw_names))} extracted names into {len(company_names)} companies")
+    return company_names, candidates_per_email
+
+
+async def confirm_sender_domains(
+    emails: List[dict],
+    candidates_per_email: List[List[Tuple[str, str]]],
+    reports: List[ResearchReport],
+    sender_index: Optional[SenderDomainIndex],
+):
+    """
+    Maps the sender domain of single-company emails to the company a research report confirmed.
+    Only an ORG entity NER found on its own counts, and only when its report was scored on real
+    metrics: research almost always returns a report (falling back to default metrics), and
+    heuristic/PERSON/GPE names or names read back from the index would pin junk at "research"
+    rank. Everything else is left to the agreement vote in extract_companies.
+    """
+    if not sender_index:
+        return
+    researched = {report.company_name for report in reports if not used_fallback_metrics(report)}
+    confirmed: Dict[str, str] = {}
+    for email, candidates in zip(emails, candidates_per_email):
+        domain = sender_domain(email.get("from", ""))
+        if domain and len(candidates) == 1 and candidates[0][1] == "ORG" and candidates[0][0] in researched:
+            confirmed[domain] = candidates[0][0]
+    await sender_index.record(confirmed, "research")
+
+
+def build_engine(settings: Settings, cache: ResearchCache, store: ReportStore) -> ResearchEngine:
+    """The application's one ResearchEngine; created in the lifespan and shared by every request."""
+    return ResearchEngine(
+        settings.openai_api_key,
+        settings.serper_api_key,
+        settings.model,
+        settings.research_mode,
+        cache,
+        store,
+        # A batch can never fill beyond the companies researched at once; a larger size only waits out max_wait
+        metrics_batch_size=min(settings.research_metrics_batch_size, settings.research_concurrency),
+        metrics_batch_wait=settings.research_metrics_batch_wait,
+    )
+
+
+@timed("orchestration")
+async def run_orchestration(
+    settings: Settings,
+    imap_pool: ImapSessionPool,
+    sync_state: MailSyncState,
+    engine: ResearchEngine,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    force_refresh: bool = False,
+    incremental: Optional[bool] = None,
+    sender_index: Optional[SenderDomainIndex] = None,
+    raise_on_connection_error: bool = False,
+) -> List[ResearchReport]:
+    """Fetch -> extract -> research for one orchestration run; returns the successful reports in email order."""
+    emails, checkpoint = await fetch_emails(settings, imap_pool, sync_state, incremental, raise_on_connection_error)
+    logging.info(f"Fetched {len(emails)} emails for orchestration")
+
+    company_names, candidates_per_email = await extract_companies(
+        emails, sender_index, settings.company_similarity_threshold
+    )
+
+    results = await engine.research_companies(
+        company_names,
+        concurrency=concurrency or settings.research_concurrency,
+        timeout=timeout or settings.research_timeout,
+        force_refresh=force_refresh,
+    )
+    reports = [report for report in results if report]
+    await confirm_sender_domains(emails, candidates_per_email, reports, sender_index)
+    researched = [name for name, report in zip(company_names, results) if report]
+    await commit_sync(sync_state, checkpoint, emails, candidates_per_email, researched)
+    return reports
@@ -0,0 +1,219 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.models.schemas import ResearchReport
+from app.services.report_store import ReportStore
+from app.utils.credibility import FACTOR_METRICS, METRIC_DEFAULTS
+from app.utils.report_generator import generate_markdown_report
+
+EXPORT_FORMATS = ("jsonl", "csv", "parquet", "markdown")
+MEDIA_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "markdown": "text/markdown; charset=utf-8",
+}
+FILE_EXTENSIONS = {"jsonl": "jsonl", "csv": "csv", "parquet": "parquet", "markdown": "md"}
+
+RAW_METRIC_COLUMNS = [f"raw_metrics.{metric}" for metric in METRIC_DEFAULTS]
+BREAKDOWN_COLUMNS = [f"score_breakdown.{factor}" for factor in FACTOR_METRICS]
+COLUMNS = [
+    "report_id", "company_name", "research_date", "overall_status", "completion_percentage", "description",
+    "credibility_score", *RAW_METRIC_COLUMNS, "raw_metrics.other", *BREAKDOWN_COLUMNS,
+    "key_insights", "recommendations",
+]
+
+CHUNK_ROWS = 200  # rows per chunk written to the response for the text formats
+MARKDOWN_SEPARATOR = "\n---\n"
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    return None
+
+
+def flatten_report(report: dict) -> Dict[str, object]:
+    """
+    One flat row per report: scalar fields, one column per known raw metric and score factor
+    (None when missing or not numeric; booleans as 1.0/0.0), any other raw metrics as a JSON
+    string in "raw_metrics.other", and the insight/recommendation lists as lists.
+    """
+    credibility = report.get("credibility") or {}
+    raw = credibility.get("raw_metrics") or {}
+    breakdown = credibility.get("score_breakdown") or {}
+    other = {
+        key: value for key, value in raw.items() if key not in METRIC_DEFAULTS or _number(value) is None
+    }
+    row = {
+        "report_id": report.get("report_id"),
+        "company_name": report.get("company_name"),
+        "research_date": report.get("research_date"),
+        "overall_status": report.get("overall_status"),
+        "completion_percentage": _number(report.get("completion_percentage")),
+        "description": (report.get("company_profile") or {}).get("description"),
+        "credibility_score": _number(credibility.get("score")),
+    }
+    row.update({f"raw_metrics.{metric}": _number(raw.get(metric)) for metric in METRIC_DEFAULTS})
+    row["raw_metrics.other"] = json.dumps(other) if other else None
+    row.update({f"score_breakdown.{factor}": _number(breakdown.get(factor)) for factor in FACTOR_METRICS})
+    row["key_insights"] = [str(item) for item in report.get("key_insights") or []]
+    row["recommendations"] = [str(item) for item in report.get("recommendations") or []]
+    return row
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data.encode("utf-8")
+
+
+async def _jsonl(rows: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    # Stored report JSON is compact (no newlines), so each row is already one line
+    chunk: List[str] = []
+    async for raw in rows:
+        chunk.append(raw)
+        if len(chunk) >= CHUNK_ROWS:
+            yield ("\n".join(chunk) + "\n").encode("utf-8")
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode("utf-8")
+
+
+async def _csv(rows: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, COLUMNS)
+    writer.writeheader()
+    count = 0
+    async for raw in rows:
+        row = flatten_report(json.loads(raw))
+        row["key_insights"] = "\n".join(row["key_insights"])
+        row["recommendations"] = "\n".join(row["recommendations"])
+        writer.writerow(row)
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+async def _markdown(rows: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    first = True
+    async for raw in rows:
+        text = generate_markdown_report(ResearchReport.model_validate_json(raw))
+        yield ((text if first else MARKDOWN_SEPARATOR + text)).encode("utf-8")
+        first = False
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that keeps what the Parquet writer produced until it is drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _parquet_schema(pa):
+    fields = [
+        pa.field("report_id", pa.string()),
+        pa.field("company_name", pa.string()),
+        pa.field("research_date", pa.timestamp("us", tz="UTC")),
+        pa.field("overall_status", pa.string()),
+        pa.field("completion_percentage", pa.float64()),
+        pa.field("description", pa.string()),
+        pa.field("credibility_score", pa.float64()),
+    ]
+    fields += [pa.field(column, pa.float64()) for column in RAW_METRIC_COLUMNS]
+    fields.append(pa.field("raw_metrics.other", pa.string()))
+    fields += [pa.field(column, pa.float64()) for column in BREAKDOWN_COLUMNS]
+    fields += [pa.field("key_insights", pa.list_(pa.string())), pa.field("recommendations", pa.list_(pa.string()))]
+    return pa.schema(fields)
+
+
+def _research_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def _parquet(rows: AsyncIterator[str], pa, row_group_size: int) -> AsyncIterator[bytes]:
+    """One row group per `row_group_size` reports; each is sent as soon as it is written."""
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(pa)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        batch: List[dict] = []
+        async for raw in rows:
+            row = flatten_report(json.loads(raw))
+            row["research_date"] = _research_datetime(row["research_date"])
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+                yield sink.drain()
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_reports(
+    store: ReportStore,
+    export_format: str,
+    company_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    page_size: int = 500,
+) -> AsyncIterator[bytes]:
+    """
+    Streams every matching report (oldest first) as `export_format` bytes. Reports are read
+    page by page and written as they arrive, so memory does not grow with the export size.
+    Raises ValueError for an unknown format and ImportError when Parquet is requested without
+    pyarrow, before anything is read.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}', expected one of {', '.join(EXPORT_FORMATS)}")
+    pa = _require_pyarrow() if export_format == "parquet" else None
+    rows = store.iter_report_json(company_name, since, until, min_score, max_score, page_size=page_size)
+    if export_format == "jsonl":
+        return _jsonl(rows)
+    if export_format == "csv":
+        return _csv(rows)
+    if export_format == "markdown":
+        return _markdown(rows)
+    return _parquet(rows, pa, row_group_size=page_size)
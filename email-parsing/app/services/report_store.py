@@ -0,0 +1,246 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiosqlite
+import numpy as np
+from cachetools import LRUCache
+
+from app.core.metrics import CACHE_REQUESTS
+from app.models.schemas import ResearchReport
+from app.utils.credibility import CREDIBILITY_INSIGHT_PREFIX, FLAG_METRICS, METRIC_DEFAULTS, coerce_metric, credibility_insight
+
+# Raw credibility metrics kept as REAL columns so bulk rescoring never parses report JSON
+SCORE_METRICS = tuple(METRIC_DEFAULTS)
+
+
+# report_json with a new score (?2), score breakdown (?3, JSON) and "Credibility Score: ..." insight (?4)
+RESCORED_REPORT_JSON = (
+    "json_set(report_json, '$.credibility.score', ?2, '$.credibility.score_breakdown', json(?3), "
+    "'$.financial_metrics[0].credibility_score', ?2, '$.key_insights', "
+    "CASE WHEN json_type(report_json, '$.key_insights') = 'array' THEN json(("
+    f"  SELECT json_group_array(CASE WHEN value LIKE '{CREDIBILITY_INSIGHT_PREFIX}%' THEN ?4 ELSE value END) "
+    "  FROM json_each(report_json, '$.key_insights'))) "
+    "ELSE json_extract(report_json, '$.key_insights') END)"
+)
+
+
+def rescore_rows(rows: Iterable[Tuple[str, float, str]]) -> List[Tuple[str, float, str, str]]:
+    """(report_id, score, breakdown) -> the parameters of RESCORED_REPORT_JSON."""
+    return [(report_id, score, breakdown, credibility_insight(score)) for report_id, score, breakdown in rows]
+
+
+def _json_metric(metric: str) -> str:
+    """SQL reading one raw metric from report_json the way coerce_metric does (NULL when missing)."""
+    path = f"'$.credibility.raw_metrics.{metric}'"
+    value = f"json_extract(report_json, {path})"
+    if metric in FLAG_METRICS:
+        return (
+            f"CASE json_type(report_json, {path}) WHEN 'null' THEN 0 WHEN 'text' THEN {value} != '' "
+            f"WHEN 'array' THEN json_array_length(report_json, {path}) > 0 WHEN 'object' THEN {value} != '{{}}' "
+            f"ELSE {value} != 0 END"
+        )
+    return f"CASE WHEN json_type(report_json, {path}) IN ('integer', 'real', 'true', 'false') THEN {value} END"
+
+
+class ReportStore:
+    """
+    Durable ResearchReport storage in SQLite with an in-process LRU read cache.
+    report_id is the primary key; company_name, research_date and credibility_score
+    are indexed so lookups stay logarithmic as history grows.
+    """
+
+    def __init__(self, db_path: str, cache_size: int = 1024):
+        self.db_path = db_path
+        self._cache = LRUCache(maxsize=cache_size)
+        self._schema_ready = False
+        self._schema_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        async with aiosqlite.connect(self.db_path) as db:
+            await self._ensure_schema(db)
+            yield db
+
+    async def _ensure_schema(self, db: aiosqlite.Connection):
+        if not self._schema_ready:
+            async with self._schema_lock:
+                if not self._schema_ready:
+                    # WAL lets several uvicorn workers read while one writes
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.executescript(
+                        "CREATE TABLE IF NOT EXISTS reports ("
+                        "  report_id TEXT PRIMARY KEY,"
+                        "  company_name TEXT NOT NULL,"
+                        "  research_date TEXT NOT NULL,"
+                        "  credibility_score REAL,"
+                        "  report_json TEXT NOT NULL"
+                        ");"
+                        "CREATE INDEX IF NOT EXISTS idx_reports_company ON reports (company_name COLLATE NOCASE);"
+                        "CREATE INDEX IF NOT EXISTS idx_reports_date ON reports (research_date);"
+                        "CREATE INDEX IF NOT EXISTS idx_reports_date_id ON reports (research_date, report_id);"
+                        "CREATE INDEX IF NOT EXISTS idx_reports_score ON reports (credibility_score);"
+                        "CREATE TABLE IF NOT EXISTS report_metrics ("
+                        "  report_id TEXT PRIMARY KEY REFERENCES reports (report_id),"
+                        "  credibility_score REAL,"
+                        + ",".join(f"  {metric} REAL" for metric in SCORE_METRICS)
+                        + ");"
+                    )
+                    await db.commit()
+                    self._schema_ready = True
+
+    async def save(self, report: ResearchReport):
+        score = report.credibility.score if report.credibility else None
+        async with self._connect() as db:
+            await db.execute(
+                "INSERT OR REPLACE INTO reports (report_id, company_name, research_date, credibility_score, report_json) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (report.report_id, report.company_name, report.research_date.isoformat(), score, report.model_dump_json()),
+            )
+            raw = report.credibility.raw_metrics if report.credibility else {}
+            await db.execute(
+                f"INSERT OR REPLACE INTO report_metrics (report_id, credibility_score, {', '.join(SCORE_METRICS)}) "
+                f"VALUES (?, ?, {', '.join('?' for _ in SCORE_METRICS)})",
+                (report.report_id, score, *(coerce_metric(metric, raw.get(metric)) for metric in SCORE_METRICS)),
+            )
+            await db.commit()
+        self._cache[report.report_id] = report
+        logging.debug(f"🗄️ Stored report {report.report_id} for {report.company_name}")
+
+    async def get(self, report_id: str) -> Optional[ResearchReport]:
+        report = self._cache.get(report_id)
+        CACHE_REQUESTS.inc(cache="report", result="miss" if report is None else "hit")
+        if report is not None:
+            return report
+
+        async with self._connect() as db:
+            async with db.execute("SELECT report_json FROM reports WHERE report_id = ?", (report_id,)) as cursor:
+                row = await cursor.fetchone()
+        if not row:
+            return None
+        report = ResearchReport.model_validate_json(row[0])
+        self._cache[report_id] = report
+        return report
+
+    @staticmethod
+    def _filters(
+        company_name: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        min_score: Optional[float],
+        max_score: Optional[float],
+    ) -> Tuple[List[str], List]:
+        clauses, params = [], []
+        if company_name:
+            clauses.append("company_name = ? COLLATE NOCASE")
+            params.append(company_name)
+        if since:
+            clauses.append("research_date >= ?")
+            params.append(since.isoformat())
+        if until:
+            clauses.append("research_date <= ?")
+            params.append(until.isoformat())
+        if min_score is not None:
+            clauses.append("credibility_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("credibility_score <= ?")
+            params.append(max_score)
+        return clauses, params
+
+    async def search(
+        self,
+        company_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[ResearchReport]:
+        clauses, params = self._filters(company_name, since, until, min_score, max_score)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT report_json FROM reports {where} ORDER BY research_date DESC LIMIT ?"
+        async with self._connect() as db:
+            async with db.execute(query, (*params, limit)) as cursor:
+                rows = await cursor.fetchall()
+        return [ResearchReport.model_validate_json(row[0]) for row in rows]
+
+    async def iter_report_json(
+        self,
+        company_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        page_size: int = 500,
+    ) -> AsyncIterator[str]:
+        """
+        Yields the stored JSON of every matching report, oldest first, for bulk export. Pages of
+        `page_size` rows are read by (research_date, report_id) keyset, each in its own short
+        query, so memory stays constant and no read transaction is held while the consumer is slow.
+        """
+        clauses, params = self._filters(company_name, since, until, min_score, max_score)
+        after: Optional[Tuple[str, str]] = None
+        while True:
+            page_clauses = clauses + ["(research_date, report_id) > (?, ?)"] if after else clauses
+            where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+            query = (
+                f"SELECT research_date, report_id, report_json FROM reports {where} "
+                "ORDER BY research_date, report_id LIMIT ?"
+            )
+            async with self._connect() as db:
+                async with db.execute(query, (*params, *(after or ()), page_size)) as cursor:
+                    rows = await cursor.fetchall()
+            for row in rows:
+                yield row[2]
+            if len(rows) < page_size:
+                return
+            after = (rows[-1][0], rows[-1][1])
+
+    async def load_score_inputs(self) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Reads every scored report's raw metrics as float columns ({metric: array}, NaN where the
+        metric is missing or not a number). Returns (report_ids, current_scores, columns).
+        """
+        async with self._connect() as db:
+            async with db.execute(
+                "SELECT (SELECT count(*) FROM reports) - (SELECT count(*) FROM report_metrics)"
+            ) as cursor:
+                missing = (await cursor.fetchone())[0]
+            if missing:
+                # Reports stored before report_metrics existed are backfilled from their JSON once
+                await db.execute(
+                    f"INSERT INTO report_metrics (report_id, credibility_score, {', '.join(SCORE_METRICS)}) "
+                    f"SELECT report_id, credibility_score, {', '.join(_json_metric(m) for m in SCORE_METRICS)} "
+                    "FROM reports r WHERE NOT EXISTS (SELECT 1 FROM report_metrics m WHERE m.report_id = r.report_id)"
+                )
+                await db.commit()
+            async with db.execute(
+                f"SELECT report_id, credibility_score, {', '.join(SCORE_METRICS)} "
+                "FROM report_metrics WHERE credibility_score IS NOT NULL"
+            ) as cursor:
+                rows = await cursor.fetchall()
+        if not rows:
+            return [], np.array([]), {metric: np.array([]) for metric in SCORE_METRICS}
+        report_ids, scores, *values = zip(*rows)
+        columns = {metric: np.array(column, dtype=np.float64) for metric, column in zip(SCORE_METRICS, values)}
+        return list(report_ids), np.array(scores, dtype=np.float64), columns
+
+    async def update_scores(self, rows: Iterable[Tuple[str, float, str]]):
+        """
+        Rewrites score, score breakdown (a JSON string) and the score line of key_insights in place
+        for (report_id, score, breakdown) rows.
+        """
+        rows = rescore_rows(rows)
+        async with self._connect() as db:
+            await db.executemany(
+                f"UPDATE reports SET credibility_score = ?2, report_json = {RESCORED_REPORT_JSON} WHERE report_id = ?1",
+                rows,
+            )
+            await db.executemany(
+                "UPDATE report_metrics SET credibility_score = ?2 WHERE report_id = ?1", (row[:2] for row in rows)
+            )
+            await db.commit()
+        self._cache.clear()
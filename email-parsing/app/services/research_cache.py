@@ -0,0 +1,138 @@
+import time
+import json
+import asyncio
+import logging
+from typing import Iterable, Optional, Tuple
+
+import aiosqlite
+from cachetools import TTLCache
+
+from app.core.metrics import CACHE_REQUESTS
+from app.models.schemas import ResearchReport
+from app.services.report_store import RESCORED_REPORT_JSON, rescore_rows
+from app.utils.canonicalize import canonical_key
+from app.utils.credibility import CREDIBILITY_INSIGHT_PREFIX
+
+
+def normalize_company_name(name: str) -> str:
+    """
+    Cache key for a company: its canonical key, so "Acme, Inc." and "ACME" share one entry.
+    """
+    return canonical_key(name) or name.casefold()
+
+
+class ResearchCache:
+    """
+    TTL + LRU cache of ResearchReports keyed by normalized company name,
+    optionally persisted to SQLite so entries survive restarts.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024, db_path: Optional[str] = None):
+        self.ttl = ttl
+        self.db_path = db_path
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._schema_ready = False
+        self._schema_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    async def _ensure_schema(self, db: aiosqlite.Connection):
+        if self._schema_ready:
+            return
+        async with self._schema_lock:
+            await db.execute(
+                "CREATE TABLE IF NOT EXISTS research_cache ("
+                "  key TEXT PRIMARY KEY,"
+                "  report_json TEXT NOT NULL,"
+                "  duration REAL NOT NULL,"
+                "  expires_at REAL NOT NULL"
+                ")"
+            )
+            await db.commit()
+            self._schema_ready = True
+
+    async def get(self, company_name: str) -> Optional[ResearchReport]:
+        key = normalize_company_name(company_name)
+        entry = self._memory.get(key)
+
+        if entry is None and self.db_path:
+            async with aiosqlite.connect(self.db_path) as db:
+                await self._ensure_schema(db)
+                async with db.execute(
+                    "SELECT report_json, duration FROM research_cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time()),
+                ) as cursor:
+                    row = await cursor.fetchone()
+            if row:
+                entry = (ResearchReport.model_validate_json(row[0]), row[1])
+                self._memory[key] = entry
+
+        if entry is None:
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache="research", result="miss")
+            return None
+
+        report, duration = entry
+        self.hits += 1
+        CACHE_REQUESTS.inc(cache="research", result="hit")
+        self.seconds_saved += duration
+        logging.info(f"💾 Research cache hit for {company_name} (saved ~{duration:.1f}s)")
+        return report
+
+    async def set(self, company_name: str, report: ResearchReport, duration: float = 0.0):
+        key = normalize_company_name(company_name)
+        self._memory[key] = (report, duration)
+
+        if self.db_path:
+            async with aiosqlite.connect(self.db_path) as db:
+                await self._ensure_schema(db)
+                await db.execute(
+                    "INSERT OR REPLACE INTO research_cache (key, report_json, duration, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, report.model_dump_json(), duration, time.time() + self.ttl),
+                )
+                await db.execute("DELETE FROM research_cache WHERE expires_at <= ?", (time.time(),))
+                await db.commit()
+
+    async def update_scores(self, rows: Iterable[Tuple[str, float, str]]):
+        """
+        Applies rescored (report_id, score, breakdown) rows to the cached reports, so cache hits
+        serve the same scores as the report store. Entries keep their original expiry.
+        """
+        rows = {row[0]: row for row in rescore_rows(rows)}
+        for report, _ in list(self._memory.values()):
+            row = rows.get(report.report_id)
+            if row is None:
+                continue
+            _, score, breakdown, insight = row
+            if report.credibility:
+                report.credibility.score = score
+                report.credibility.score_breakdown = json.loads(breakdown)
+            if report.financial_metrics and isinstance(report.financial_metrics[0], dict):
+                report.financial_metrics[0]["credibility_score"] = score
+            if report.key_insights:
+                report.key_insights = [
+                    insight if line.startswith(CREDIBILITY_INSIGHT_PREFIX) else line for line in report.key_insights
+                ]
+
+        if self.db_path and rows:
+            async with aiosqlite.connect(self.db_path) as db:
+                await self._ensure_schema(db)
+                async with db.execute("SELECT key, json_extract(report_json, '$.report_id') FROM research_cache") as cursor:
+                    cached = [(key, report_id) for key, report_id in await cursor.fetchall() if report_id in rows]
+                await db.executemany(
+                    f"UPDATE research_cache SET report_json = {RESCORED_REPORT_JSON} WHERE key = ?5",
+                    [(*rows[report_id], key) for key, report_id in cached],
+                )
+                await db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "seconds_saved": round(self.seconds_saved, 2),
+            "size": len(self._memory),
+            "persistent": bool(self.db_path),
+        }
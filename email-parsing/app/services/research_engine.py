@@ -2,37 +2,21 @@ import uuid
 import logging
 import json
 import re
+import time
+import asyncio
 from datetime import datetime
-from typing import Optional
+from functools import cached_property
+from typing import Any, AsyncIterator, List, Optional, Set, Tuple
 
-from langchain_openai import ChatOpenAI
-from langchain.tools import BaseTool
-from pydantic import Field
+from pydantic import ValidationError
 
-from app.models.schemas import ResearchReport, CompanyProfile
-from app.utils.credibility import compute_credibility_score
-
-
-class SerperSearchTool(BaseTool):
-    name: str = "serper_search"
-    description: str = "Google search tool using Serper API"
-    api_key: str = Field(...)
-
-    def _run(self, query: str) -> str:
-        import asyncio
-        return asyncio.run(self._arun(query))
-
-    async def _arun(self, query: str) -> str:
-        import httpx
-        headers = {"X-API-KEY": self.api_key}
-        params = {"q": query, "num": 3}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get("https://google.serper.dev/search", headers=headers, params=params)
-            if resp.status_code == 200:
-                results = resp.json().get("organic", [])
-                return "\n".join(f"{r.get('title', '')}: {r.get('snippet', '')}" for r in results)
-            else:
-                return f"Serper error: {resp.status_code}"
+from app.core.metrics import ITEMS_PROCESSED, LLM_TOKENS, stage_timer, timed
+from app.models.schemas import ResearchReport, CompanyProfile, CompanyResearch, CompanyMetrics
+from app.services.research_cache import ResearchCache
+from app.services.report_store import ReportStore
+from app.utils.canonicalize import canonical_key
+from app.utils.credibility import compute_credibility_score, credibility_insight
+from app.utils.rate_limit import UpstreamError, call_with_retry, get_limiter, parse_retry_after
 
 
 def extract_json_block(text: str) -> Optional[dict]:
@@ -44,68 +28,282 @@ def extract_json_block(text: str) -> Optional[dict]:
         return None
 
 
+PROFILE_PROMPT = "Write a concise factual company profile for '{company_name}' using this data:\n\n{search_results}"
+
+METRICS_PROMPT = (
+    "Based on this info about '{company_name}', estimate realistic values for the following metrics.\n"
+    "Respond ONLY with JSON in this format (no extra text):\n"
+    "{{\n"
+    "  \"founded_year\": 2004,\n"
+    "  \"market_cap\": 150000000000,\n"
+    "  \"employees\": 10000,\n"
+    "  \"domain_age\": 15,\n"
+    "  \"sentiment_score\": 0.85,\n"
+    "  \"certified\": true,\n"
+    "  \"funded_by_top_investors\": true\n"
+    "}}\n\n"
+    "Search results:\n{search_results}"
+)
+
+BATCH_METRICS_PROMPT = (
+    "For each company below, estimate realistic values for the following metrics from its search results.\n"
+    "Respond ONLY with JSON in this format (no extra text), one entry per company, "
+    "using each company name exactly as given:\n"
+    "{{\"companies\": [\n"
+    "  {{\n"
+    "    \"company\": \"Example Corp\",\n"
+    "    \"founded_year\": 2004,\n"
+    "    \"market_cap\": 150000000000,\n"
+    "    \"employees\": 10000,\n"
+    "    \"domain_age\": 15,\n"
+    "    \"sentiment_score\": 0.85,\n"
+    "    \"certified\": true,\n"
+    "    \"funded_by_top_investors\": true\n"
+    "  }}\n"
+    "]}}\n\n"
+    "{companies}"
+)
+
+BATCH_COMPANY_BLOCK = "### {company_name}\nSearch results:\n{search_results}\n"
+
+COMBINED_PROMPT = (
+    "Using the search results below about '{company_name}', write a concise factual company profile "
+    "and estimate realistic values for its credibility metrics.\n\n"
+    "Search results:\n{search_results}"
+)
+
+FALLBACK_METRICS = {
+    "age_years": 5,
+    "market_cap": 1e9,
+    "employees": 500,
+    "domain_age": 5,
+    "sentiment_score": 0.6,
+    "certified": True,
+    "funded_by_top_investors": False
+}
+
+def used_fallback_metrics(report: ResearchReport) -> bool:
+    """True if the report was scored on FALLBACK_METRICS because no usable metrics came back."""
+    return report.credibility is None or report.credibility.raw_metrics == FALLBACK_METRICS
+
+
+RESEARCH_MODES = ("sequential", "parallel", "combined")
+
+# Completion tokens reserved per call against the tokens/minute budget until actual usage is known
+LLM_OUTPUT_TOKENS_ESTIMATE = 400
+
+
+def estimate_tokens(prompt: str) -> int:
+    return len(prompt) // 4 + LLM_OUTPUT_TOKENS_ESTIMATE
+
+
+def _usage(response: Any) -> Optional[dict]:
+    raw = response.get("raw") if isinstance(response, dict) else response
+    return getattr(raw, "usage_metadata", None)
+
+
+async def invoke_llm(runnable, prompt: str):
+    """
+    Calls an LLM runnable through the shared "openai" limiter, translating OpenAI SDK errors into
+    UpstreamError so 429s and 5xx are retried with backoff (and Retry-After honored).
+    """
+    import openai
+
+    limiter = get_limiter("openai")
+    estimated = estimate_tokens(prompt)
+
+    async def call():
+        try:
+            return await runnable.ainvoke(prompt)
+        except openai.APIStatusError as e:
+            raise UpstreamError("openai", e.status_code, parse_retry_after(e.response.headers), e.message) from e
+        except openai.APIConnectionError as e:
+            raise UpstreamError("openai", message=str(e)) from e
+
+    response = await call_with_retry(limiter, call, tokens=estimated)
+    usage = _usage(response)
+    limiter.record_tokens(estimated, usage.get("total_tokens") if usage else None)
+    if usage:
+        LLM_TOKENS.inc(usage.get("input_tokens", 0), kind="prompt")
+        LLM_TOKENS.inc(usage.get("output_tokens", 0), kind="completion")
+    return response
+
+
+def normalize_metrics(raw_metrics: Optional[dict]) -> dict:
+    if not raw_metrics:
+        logging.warning("⚠️ Using fallback values due to invalid LLM response")
+        return dict(FALLBACK_METRICS)
+
+    # Convert founded_year → age_years
+    if "founded_year" in raw_metrics:
+        try:
+            current_year = datetime.utcnow().year
+            raw_metrics["age_years"] = max(current_year - int(raw_metrics.pop("founded_year")), 0)
+        except Exception as e:
+            logging.warning(f"⚠️ Failed to convert founded_year to age_years: {e}")
+            raw_metrics["age_years"] = 5
+    return raw_metrics
+
+
+def parse_batch_metrics(raw_text: str, company_names: List[str]) -> dict:
+    """
+    Maps each requested company to its validated metrics from a batched response. Entries are
+    validated one at a time, so a malformed entry only drops that company (absent from the result).
+    """
+    payload = extract_json_block(raw_text) or {}
+    entries = payload.get("companies") if isinstance(payload, dict) else None
+    by_key = {canonical_key(name): name for name in company_names}
+    metrics = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        name = by_key.get(canonical_key(str(entry.pop("company", ""))))
+        if name is None or name in metrics:
+            continue
+        try:
+            validated = CompanyMetrics.model_validate(entry).model_dump(exclude_none=True)
+        except ValidationError as e:
+            logging.warning(f"⚠️ Invalid batched metrics for {name}: {e.error_count()} errors")
+            continue
+        if validated:
+            metrics[name] = validated
+    return metrics
+
+
+class MetricsBatcher:
+    """
+    Coalesces the metrics stage of concurrently running `research_company` calls into one LLM
+    request per `batch_size` companies. A batch is sent when full or `max_wait` seconds after its
+    first company arrived; companies missing or invalid in the batched answer fall back to the
+    single-company metrics prompt.
+    """
+
+    def __init__(self, engine: "ResearchEngine", batch_size: int, max_wait: float = 0.25):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()  # running batches; the loop only keeps weak references
+
+    async def submit(self, company_name: str, search_results: str) -> Optional[dict]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((company_name, search_results, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        batch = [item for item in batch if not item[2].done()]  # drop callers that timed out
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        results = {}
+        if len(batch) > 1:
+            try:
+                results = await self.engine._research_metrics_batch([(name, sr) for name, sr, _ in batch])
+            except Exception as e:
+                logging.warning(f"⚠️ Batched metrics for {len(batch)} companies failed, using single prompts: {e}")
+
+        async def resolve(name: str, search_results: str, future: asyncio.Future):
+            try:
+                metrics = results[name] if name in results else await self.engine._research_metrics(name, search_results)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                return
+            if not future.done():
+                future.set_result(metrics)
+
+        await asyncio.gather(*(resolve(*item) for item in batch))
+
+
 class ResearchEngine:
-    def __init__(self, openai_api_key: str, serper_api_key: str, model: str):
+    def __init__(
+        self,
+        openai_api_key: str,
+        serper_api_key: str,
+        model: str,
+        mode: str = "parallel",
+        cache: Optional[ResearchCache] = None,
+        store: Optional[ReportStore] = None,
+        metrics_batch_size: int = 1,
+        metrics_batch_wait: float = 0.25,
+    ):
+        if mode not in RESEARCH_MODES:
+            raise ValueError(f"Unknown research mode '{mode}', expected one of {RESEARCH_MODES}")
         self.openai_api_key = openai_api_key
         self.serper_api_key = serper_api_key
         self.model = model
+        self.mode = mode
+        self.cache = cache
+        self.store = store
 
-        self.llm = ChatOpenAI(api_key=openai_api_key, model=model, temperature=0)
-        self.search_tool = SerperSearchTool(api_key=serper_api_key)
         self.reports = {}
-
-    async def research_company(self, company_name: str) -> Optional[ResearchReport]:
-        logging.info(f"🚀 Starting research for: {company_name}")
-        search_results = await self.search_tool._arun(f"{company_name} company profile")
-
-        # Step 1: Company Profile
-        profile_prompt = f"Write a concise factual company profile for '{company_name}' using this data:\n\n{search_results}"
-        profile_response = await self.llm.ainvoke(profile_prompt)
-        profile_text = profile_response.content.strip()
-
-        # Step 2: Extract Metrics (with 'founded_year')
-        metrics_prompt = (
-            f"Based on this info about '{company_name}', estimate realistic values for the following metrics.\n"
-            f"Respond ONLY with JSON in this format (no extra text):\n"
-            "{\n"
-            "  \"founded_year\": 2004,\n"
-            "  \"market_cap\": 150000000000,\n"
-            "  \"employees\": 10000,\n"
-            "  \"domain_age\": 15,\n"
-            "  \"sentiment_score\": 0.85,\n"
-            "  \"certified\": true,\n"
-            "  \"funded_by_top_investors\": true\n"
-            "}\n\n"
-            f"Search results:\n{search_results}"
+        # Combined mode already answers profile + metrics in one call per company, so it is not batched
+        self.metrics_batcher = (
+            MetricsBatcher(self, metrics_batch_size, metrics_batch_wait)
+            if metrics_batch_size > 1 and mode != "combined"
+            else None
         )
 
-        metrics_response = await self.llm.ainvoke(metrics_prompt)
-        raw_text = metrics_response.content.strip()
-        logging.info(f"🧾 Raw LLM metrics response:\n{raw_text}")
+    # LangChain/OpenAI clients are built on first use so importing and constructing the engine stays cheap
+    @cached_property
+    def llm(self):
+        from langchain_openai import ChatOpenAI
 
-        raw_metrics = extract_json_block(raw_text)
-        logging.info(f"📊 Parsed metrics: {raw_metrics}")
+        # Retries are handled by invoke_llm so they share the adaptive limiter
+        return ChatOpenAI(api_key=self.openai_api_key, model=self.model, temperature=0, max_retries=0)
 
-        if not raw_metrics:
-            logging.warning("⚠️ Using fallback values due to invalid LLM response")
-            raw_metrics = {
-                "age_years": 5,
-                "market_cap": 1e9,
-                "employees": 500,
-                "domain_age": 5,
-                "sentiment_score": 0.6,
-                "certified": True,
-                "funded_by_top_investors": False
-            }
+    @cached_property
+    def structured_llm(self):
+        return self.llm.with_structured_output(CompanyResearch, include_raw=True)
+
+    @cached_property
+    def json_llm(self):
+        return self.llm.bind(response_format={"type": "json_object"})
+
+    @cached_property
+    def search_tool(self):
+        from app.services.search_tool import SerperSearchTool
+
+        return SerperSearchTool(api_key=self.serper_api_key)
+
+    @timed("research_company")
+    async def research_company(self, company_name: str, force_refresh: bool = False) -> Optional[ResearchReport]:
+        if self.cache and not force_refresh:
+            cached = await self.cache.get(company_name)
+            if cached:
+                return cached
+
+        logging.info(f"🚀 Starting research for: {company_name}")
+        started = time.perf_counter()
+        with stage_timer("serper_search"):
+            search_results = await self.search_tool._arun(f"{company_name} company profile")
+
+        # Steps 1 & 2: Company Profile + Metrics (both depend only on search_results)
+        if self.mode == "combined":
+            profile_text, raw_metrics = await self._research_combined(company_name, search_results)
+        elif self.mode == "parallel":
+            profile_text, raw_metrics = await asyncio.gather(
+                self._research_profile(company_name, search_results),
+                self._metrics_stage(company_name, search_results),
+            )
         else:
-            # Convert founded_year → age_years
-            if "founded_year" in raw_metrics:
-                try:
-                    current_year = datetime.utcnow().year
-                    raw_metrics["age_years"] = max(current_year - int(raw_metrics.pop("founded_year")), 0)
-                except Exception as e:
-                    logging.warning(f"⚠️ Failed to convert founded_year to age_years: {e}")
-                    raw_metrics["age_years"] = 5
+            profile_text = await self._research_profile(company_name, search_results)
+            raw_metrics = await self._metrics_stage(company_name, search_results)
+
+        raw_metrics = normalize_metrics(raw_metrics)
 
         # Step 3: Score Calculation
         credibility_score, score_breakdown = compute_credibility_score(**raw_metrics)
@@ -126,7 +324,7 @@ class ResearchEngine:
             financial_metrics=[{"credibility_score": credibility_score}],
             key_insights=[
                 "Generated using Serper + OpenAI",
-                f"Credibility Score: {credibility_score}"
+                credibility_insight(credibility_score)
             ],
             recommendations=["Verify insights with official sources for critical decisions."],
             credibility={
@@ -136,9 +334,147 @@ class ResearchEngine:
             }
         )
 
-        self.reports[report_id] = report
+        if self.store:
+            await self.store.save(report)
+        else:
+            self.reports[report_id] = report
+        if self.cache:
+            await self.cache.set(company_name, report, time.perf_counter() - started)
+        ITEMS_PROCESSED.inc(kind="reports")
         logging.info(f"✅ Completed research for {company_name} — Score: {credibility_score}")
         return report
 
+    @timed("llm_profile")
+    async def _research_profile(self, company_name: str, search_results: str) -> str:
+        profile_prompt = PROFILE_PROMPT.format(company_name=company_name, search_results=search_results)
+        profile_response = await invoke_llm(self.llm, profile_prompt)
+        return profile_response.content.strip()
+
+    @timed("llm_metrics")
+    async def _research_metrics(self, company_name: str, search_results: str) -> Optional[dict]:
+        metrics_prompt = METRICS_PROMPT.format(company_name=company_name, search_results=search_results)
+        metrics_response = await invoke_llm(self.llm, metrics_prompt)
+        raw_text = metrics_response.content.strip()
+        logging.info(f"🧾 Raw LLM metrics response:\n{raw_text}")
+
+        raw_metrics = extract_json_block(raw_text)
+        logging.info(f"📊 Parsed metrics: {raw_metrics}")
+        return raw_metrics
+
+    async def _metrics_stage(self, company_name: str, search_results: str) -> Optional[dict]:
+        if self.metrics_batcher:
+            return await self.metrics_batcher.submit(company_name, search_results)
+        return await self._research_metrics(company_name, search_results)
+
+    @timed("llm_metrics_batch")
+    async def _research_metrics_batch(self, companies: List[Tuple[str, str]]) -> dict:
+        """One JSON-mode request for several companies' metrics; returns {company_name: metrics}."""
+        blocks = "\n".join(
+            BATCH_COMPANY_BLOCK.format(company_name=name, search_results=search_results)
+            for name, search_results in companies
+        )
+        response = await invoke_llm(self.json_llm, BATCH_METRICS_PROMPT.format(companies=blocks))
+        metrics = parse_batch_metrics(response.content, [name for name, _ in companies])
+        logging.info(f"📊 Batched metrics: {len(metrics)}/{len(companies)} companies parsed in one request")
+        return metrics
+
+    @timed("llm_combined")
+    async def _research_combined(self, company_name: str, search_results: str) -> tuple[str, Optional[dict]]:
+        """
+        Single structured LLM call returning the profile and the metrics together.
+        Falls back to the two-prompt path if the structured response fails validation;
+        upstream errors (already retried) are raised rather than doubling the load.
+        """
+        prompt = COMBINED_PROMPT.format(company_name=company_name, search_results=search_results)
+        response = await invoke_llm(self.structured_llm, prompt)
+        result: Optional[CompanyResearch] = response["parsed"]
+        if result is None:
+            logging.warning(
+                f"⚠️ Structured research failed for {company_name}, using separate prompts: {response['parsing_error']}"
+            )
+            return await asyncio.gather(
+                self._research_profile(company_name, search_results),
+                self._research_metrics(company_name, search_results),
+            )
+        raw_metrics = result.metrics.model_dump(exclude_none=True)
+        logging.info(f"📊 Structured metrics: {raw_metrics}")
+        return result.profile.strip(), raw_metrics
+
+    def _schedule_research(
+        self,
+        company_names: List[str],
+        concurrency: int,
+        timeout: Optional[float],
+        force_refresh: bool,
+        durations: List[float],
+    ) -> List[asyncio.Task]:
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def run(index: int, name: str) -> Tuple[int, Optional[ResearchReport]]:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    return index, await asyncio.wait_for(self.research_company(name, force_refresh), timeout)
+                except asyncio.TimeoutError:
+                    logging.warning(f"⏰ Research for {name} timed out after {timeout}s")
+                except Exception as e:
+                    logging.error(f"❌ Failed to research {name}: {e}")
+                finally:
+                    durations[index] = time.perf_counter() - started
+                return index, None
+
+        return [asyncio.ensure_future(run(i, name)) for i, name in enumerate(company_names)]
+
+    def _log_fan_out(self, company_names: List[str], started: float, durations: List[float], concurrency: int):
+        wall_time = time.perf_counter() - started
+        logging.info(
+            f"⏱️ Researched {len(company_names)} companies in {wall_time:.2f}s wall-clock "
+            f"vs {sum(durations):.2f}s summed per-company time (concurrency={concurrency})"
+        )
+
+    async def research_companies(
+        self,
+        company_names: List[str],
+        concurrency: int = 5,
+        timeout: Optional[float] = None,
+        force_refresh: bool = False,
+    ) -> List[Optional[ResearchReport]]:
+        """
+        Researches several companies concurrently, at most `concurrency` at a time.
+        Results keep the order of `company_names`; a company that fails or times out yields None.
+        """
+        durations = [0.0] * len(company_names)
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *self._schedule_research(company_names, concurrency, timeout, force_refresh, durations)
+        )
+        self._log_fan_out(company_names, started, durations, concurrency)
+        return [report for _, report in results]
+
+    async def research_companies_as_completed(
+        self,
+        company_names: List[str],
+        concurrency: int = 5,
+        timeout: Optional[float] = None,
+        force_refresh: bool = False,
+    ) -> AsyncIterator[Tuple[str, Optional[ResearchReport]]]:
+        """
+        Same fan-out as `research_companies`, but yields (company_name, report) as each company
+        finishes. Outstanding research is cancelled if the consumer stops iterating.
+        """
+        durations = [0.0] * len(company_names)
+        started = time.perf_counter()
+        tasks = self._schedule_research(company_names, concurrency, timeout, force_refresh, durations)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, report = await next_done
+                yield company_names[index], report
+        finally:
+            for task in tasks:
+                task.cancel()
+        self._log_fan_out(company_names, started, durations, concurrency)
+
     async def get_report(self, report_id: str) -> Optional[ResearchReport]:
+        if self.store:
+            return await self.store.get(report_id)
         return self.reports.get(report_id)
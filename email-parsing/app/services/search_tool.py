@@ -0,0 +1,16 @@
+from langchain.tools import BaseTool
+from pydantic import Field
+
+from app.services.serper_client import get_serper_client
+
+
+class SerperSearchTool(BaseTool):
+    name: str = "serper_search"
+    description: str = "Google search tool using Serper API"
+    api_key: str = Field(...)
+
+    def _run(self, query: str) -> str:
+        return get_serper_client(self.api_key).search_sync(query)
+
+    async def _arun(self, query: str) -> str:
+        return await get_serper_client(self.api_key).search(query)
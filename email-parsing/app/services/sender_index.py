@@ -0,0 +1,178 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.utils import parseaddr
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+# Mailbox providers say nothing about the sender's company
+FREE_MAIL_DOMAINS = {
+    "gmail.com", "googlemail.com", "yahoo.com", "outlook.com", "hotmail.com", "live.com",
+    "icloud.com", "me.com", "aol.com", "proton.me", "protonmail.com", "gmx.com", "mail.com",
+}
+
+# A higher-ranked source is never overwritten by a lower-ranked one
+SOURCE_RANK = {"extracted": 0, "research": 1, "manual": 2}
+
+
+def sender_domain(sender: str) -> Optional[str]:
+    """Returns the lower-cased domain of a From header, or None for free-mail/unparseable senders."""
+    address = parseaddr(sender or "")[1]
+    if "@" not in address:
+        return None
+    domain = address.rsplit("@", 1)[1].strip().lower().rstrip(".")
+    if not domain or domain in FREE_MAIL_DOMAINS:
+        return None
+    return domain
+
+
+class SenderDomainIndex:
+    """
+    Maps sender domain -> resolved company name so mail from known senders skips NER.
+    Entries come from past extractions, confirmed research reports and manual overrides,
+    persisted in SQLite and held in memory for O(1) lookups from the (synchronous) extractor.
+    The in-memory copy is reloaded by refresh() once it is `reload_interval` seconds old, so
+    overrides made through another worker process are picked up.
+    An extracted mapping is only learned once `min_agreement` emails from the domain named the
+    same company; the votes so far are kept in SQLite too.
+    """
+
+    def __init__(self, db_path: str, min_agreement: int = 3, reload_interval: float = 30.0):
+        self.db_path = db_path
+        self.min_agreement = max(min_agreement, 1)
+        self.reload_interval = reload_interval
+        self._entries: Dict[str, Tuple[str, str]] = {}
+        self._loaded_at = float("-inf")
+        self._schema_ready = False
+        self._schema_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        async with aiosqlite.connect(self.db_path) as db:
+            await self._ensure_schema(db)
+            yield db
+
+    async def _ensure_schema(self, db: aiosqlite.Connection):
+        if not self._schema_ready:
+            async with self._schema_lock:
+                if not self._schema_ready:
+                    await db.executescript(
+                        "CREATE TABLE IF NOT EXISTS sender_domains ("
+                        "  domain TEXT PRIMARY KEY,"
+                        "  company_name TEXT NOT NULL,"
+                        "  source TEXT NOT NULL,"
+                        "  updated_at REAL NOT NULL"
+                        ");"
+                        "CREATE TABLE IF NOT EXISTS sender_domain_votes ("
+                        "  domain TEXT PRIMARY KEY,"
+                        "  company_name TEXT NOT NULL,"
+                        "  votes INTEGER NOT NULL,"
+                        "  updated_at REAL NOT NULL"
+                        ");"
+                    )
+                    await db.commit()
+                    self._schema_ready = True
+
+    async def load(self):
+        async with self._connect() as db:
+            async with db.execute("SELECT domain, company_name, source FROM sender_domains") as cursor:
+                self._entries = {row[0]: (row[1], row[2]) for row in await cursor.fetchall()}
+        self._loaded_at = time.monotonic()
+
+    async def refresh(self):
+        """Reloads the index if it is older than reload_interval."""
+        if time.monotonic() - self._loaded_at >= self.reload_interval:
+            await self.load()
+
+    def lookup(self, domain: Optional[str]) -> Optional[str]:
+        entry = self._entries.get(domain) if domain else None
+        return entry[0] if entry else None
+
+    def entries(self) -> List[dict]:
+        return [
+            {"domain": domain, "company_name": company, "source": source}
+            for domain, (company, source) in sorted(self._entries.items())
+        ]
+
+    async def record(self, mappings: Dict[str, str], source: str):
+        """Stores domain -> company mappings unless a higher-ranked source already owns the domain."""
+        rank = SOURCE_RANK[source]
+        updates = {
+            domain: company
+            for domain, company in mappings.items()
+            if domain and company
+            and (domain not in self._entries or SOURCE_RANK[self._entries[domain][1]] <= rank)
+            and self._entries.get(domain) != (company, source)
+        }
+        if not updates:
+            return
+        now = time.time()
+        # The rank is checked again in SQL: another worker may have stored a higher-ranked entry
+        # (e.g. a manual override) that this process has not loaded yet
+        stored_rank = " ".join(f"WHEN '{name}' THEN {value}" for name, value in SOURCE_RANK.items())
+        async with self._connect() as db:
+            await db.executemany(
+                "INSERT INTO sender_domains (domain, company_name, source, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(domain) DO UPDATE SET company_name = excluded.company_name, "
+                "source = excluded.source, updated_at = excluded.updated_at "
+                f"WHERE (CASE sender_domains.source {stored_rank} ELSE 0 END) <= ?",
+                [(domain, company, source, now, rank) for domain, company in updates.items()],
+            )
+            await db.commit()
+            domains = list(updates)
+            for offset in range(0, len(domains), 500):
+                chunk = domains[offset:offset + 500]
+                async with db.execute(
+                    f"SELECT domain, company_name, source FROM sender_domains "
+                    f"WHERE domain IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        self._entries[row[0]] = (row[1], row[2])
+
+    async def vote(self, observations: Dict[str, Tuple[Optional[str], int]]):
+        """
+        Counts (company, emails) observations per domain from NER and records a domain as
+        "extracted" once `min_agreement` emails agreed on the company. A different company, or a
+        None company (the batch disagreed with itself), restarts the count.
+        """
+        pending = {domain: seen for domain, seen in observations.items() if domain and domain not in self._entries}
+        if not pending:
+            return
+        now = time.time()
+        async with self._connect() as db:
+            await db.executemany(
+                "DELETE FROM sender_domain_votes WHERE domain = ?",
+                [(domain,) for domain, (company, _) in pending.items() if company is None],
+            )
+            agreed = [(domain, company, count) for domain, (company, count) in pending.items() if company]
+            await db.executemany(
+                "INSERT INTO sender_domain_votes (domain, company_name, votes, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(domain) DO UPDATE SET votes = CASE WHEN company_name = excluded.company_name "
+                "THEN votes + excluded.votes ELSE excluded.votes END, "
+                "company_name = excluded.company_name, updated_at = excluded.updated_at",
+                [(domain, company, count, now) for domain, company, count in agreed],
+            )
+            learned = {}
+            for domain, _, _ in agreed:
+                async with db.execute(
+                    "SELECT company_name, votes FROM sender_domain_votes WHERE domain = ?", (domain,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+                if row and row[1] >= self.min_agreement:
+                    learned[domain] = row[0]
+            await db.executemany("DELETE FROM sender_domain_votes WHERE domain = ?", [(domain,) for domain in learned])
+            await db.commit()
+        await self.record(learned, "extracted")
+
+    async def set_override(self, domain: str, company_name: str):
+        await self.record({domain.lower(): company_name}, "manual")
+
+    async def remove(self, domain: str) -> bool:
+        domain = domain.lower()
+        async with self._connect() as db:
+            cursor = await db.execute("DELETE FROM sender_domains WHERE domain = ?", (domain,))
+            await db.commit()
+        self._entries.pop(domain, None)
+        return cursor.rowcount > 0
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.utils.rate_limit import UpstreamError, backoff_delay, call_with_retry, get_limiter, parse_retry_after
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+
+# Result handed to followers when the leader of a coalesced query was cancelled; they retry
+_LEADER_CANCELLED = object()
+
+
+def format_results(payload: dict) -> str:
+    results = payload.get("organic", [])
+    return "\n".join(f"{r.get('title', '')}: {r.get('snippet', '')}" for r in results)
+
+
+class SerperClient:
+    """
+    Application-scoped Serper client: one pooled keep-alive connection set (HTTP/2 when `h2` is
+    installed), single-flight coalescing of concurrent identical queries and a short-TTL cache
+    of successful results. Requests go through the shared "serper" rate limiter and are retried
+    on 429/5xx; a call that still fails raises UpstreamError rather than returning error text.
+    """
+
+    def __init__(self, api_key: str, cache_ttl: float = 600, cache_size: int = 2048, max_connections: int = 20):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+
+    def _headers(self) -> dict:
+        return {"X-API-KEY": self.api_key}
+
+    def _async_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(http2=HTTP2, limits=self._limits(), timeout=httpx.Timeout(20.0))
+        return self._client
+
+    def _parse(self, resp: httpx.Response) -> str:
+        if resp.status_code != 200:
+            raise UpstreamError("serper", resp.status_code, parse_retry_after(resp.headers), resp.reason_phrase)
+        return format_results(resp.json())
+
+    async def _request(self, query: str, num: int) -> str:
+        try:
+            resp = await self._async_client().get(
+                settings.serper_url, headers=self._headers(), params={"q": query, "num": num}
+            )
+        except httpx.TransportError as e:
+            raise UpstreamError("serper", message=str(e) or type(e).__name__) from e
+        return self._parse(resp)
+
+    async def search(self, query: str, num: int = 3) -> str:
+        key = (query, num)
+        if key in self._cache:
+            CACHE_REQUESTS.inc(cache="serper", result="hit")
+            return self._cache[key]
+        CACHE_REQUESTS.inc(cache="serper", result="miss")
+        while key in self._inflight:
+            result = await asyncio.shield(self._inflight[key])
+            if result is not _LEADER_CANCELLED:
+                return result
+            if key in self._cache:  # another follower became leader and already finished
+                return self._cache[key]
+
+        future = asyncio.get_running_loop().create_future()
+        # Retrieve the exception even when no follower awaited it, so it isn't logged as unhandled
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await call_with_retry(get_limiter("serper"), lambda: self._request(query, num))
+            self._cache[key] = result
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Only this caller was cancelled (client disconnect, wait_for timeout): followers retry
+            self._inflight.pop(key, None)
+            future.set_result(_LEADER_CANCELLED)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def search_sync(self, query: str, num: int = 3) -> str:
+        """Blocking variant for LangChain's synchronous tool interface; safe inside a running event loop."""
+        key = (query, num)
+        if key in self._cache:
+            return self._cache[key]
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(limits=self._limits(), timeout=httpx.Timeout(20.0))
+        max_attempts = get_limiter("serper").max_attempts
+        for attempt in range(1, max_attempts + 1):
+            try:
+                try:
+                    resp = self._sync_client.get(
+                        settings.serper_url, headers=self._headers(), params={"q": query, "num": num}
+                    )
+                except httpx.TransportError as e:
+                    raise UpstreamError("serper", message=str(e) or type(e).__name__) from e
+                result = self._parse(resp)
+                break
+            except UpstreamError as e:
+                if not e.retryable or attempt == max_attempts:
+                    raise
+                time.sleep(backoff_delay(e, attempt))
+        self._cache[key] = result
+        return result
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+
+_clients: Dict[str, SerperClient] = {}
+
+
+def get_serper_client(api_key: str) -> SerperClient:
+    if api_key not in _clients:
+        if not HTTP2 and not _clients:
+            logging.warning("h2 is not installed; Serper requests use HTTP/1.1 (pip install 'httpx[http2]')")
+        _clients[api_key] = SerperClient(
+            api_key,
+            cache_ttl=settings.serper_cache_ttl,
+            max_connections=settings.serper_max_connections,
+        )
+        logging.debug(f"Created Serper client (http2={HTTP2})")
+    return _clients[api_key]
+
+
+async def close_serper_clients():
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
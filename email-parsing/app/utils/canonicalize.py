@@ -0,0 +1,85 @@
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Set
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "sas", "srl", "bv", "nv", "pvt", "pte", "pty", "oy", "ab", "kk",
+}
+
+# Minimum n-gram Dice overlap before two names are compared character by character
+MIN_NGRAM_OVERLAP = 0.5
+
+
+def canonical_key(name: str) -> str:
+    """
+    Folds case and punctuation and strips trailing legal suffixes:
+    "Acme, Inc.", "ACME Inc" and "Acme Corp." all become "acme".
+    """
+    words = re.sub(r"[^\w\s]", " ", name.casefold()).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def _ngrams(key: str, n: int) -> Set[str]:
+    padded = f" {key} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+def cluster_company_names(names: Iterable[str], threshold: float = 0.88, ngram: int = 3) -> Dict[str, str]:
+    """
+    Groups spellings of the same company and returns {original name: cluster representative}.
+    Names with the same canonical key are merged outright; distinct keys are only compared
+    (SequenceMatcher ratio >= threshold) when they share an n-gram block, so the pairwise work
+    stays near-linear instead of quadratic. Single-word keys are never fuzzy-merged: one letter
+    is the whole difference between "Meta" and "Metal" or "Stripe" and "Striped". The
+    representative is the most frequent spelling, ties going to the first seen.
+    """
+    names = [name.strip() for name in names if name and name.strip()]
+    counts = Counter(names)
+
+    # Exact merge on canonical key, keeping first-seen key order
+    spellings: Dict[str, List[str]] = defaultdict(list)
+    for name in dict.fromkeys(names):
+        spellings[canonical_key(name) or name.casefold()].append(name)
+
+    # Fuzzy merge of keys via n-gram blocking + union-find
+    parent = {key: key for key in spellings}
+
+    def find(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    blocks: Dict[str, List[str]] = defaultdict(list)
+    gram_counts: Dict[str, int] = {}
+    for key in spellings:
+        if " " not in key:
+            continue
+        grams = _ngrams(key, ngram)
+        gram_counts[key] = len(grams)
+        shared = Counter(other for gram in grams for other in blocks[gram])
+        for other, overlap in shared.items():
+            # Cheap filters first: n-gram Dice overlap, then the length bound on SequenceMatcher.ratio()
+            if 2 * overlap / (len(grams) + gram_counts[other]) < MIN_NGRAM_OVERLAP:
+                continue
+            if 2 * min(len(key), len(other)) / (len(key) + len(other)) < threshold:
+                continue
+            if find(other) != find(key) and SequenceMatcher(None, key, other).ratio() >= threshold:
+                parent[find(key)] = find(other)
+        for gram in grams:
+            blocks[gram].append(key)
+
+    clusters: Dict[str, List[str]] = defaultdict(list)
+    for key, members in spellings.items():
+        clusters[find(key)].extend(members)
+
+    mapping = {}
+    for members in clusters.values():
+        representative = max(members, key=lambda name: (counts[name], -members.index(name)))
+        for name in members:
+            mapping[name] = representative
+    return mapping
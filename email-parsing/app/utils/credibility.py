@@ -1,3 +1,179 @@
+from dataclasses import dataclass, replace
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.core.metrics import timed
+
+# Factor name -> raw metric it is computed from. Magnitude factors are divided by a profile
+# `unit`; the 0–1 and boolean factors are multiplied by a profile `points` value.
+FACTOR_METRICS = {
+    "age": "age_years",
+    "market_cap": "market_cap",
+    "employee_count": "employees",
+    "domain_age": "domain_age",
+    "online_sentiment": "sentiment_score",
+    "certifications": "certified",
+    "funding_backing": "funded_by_top_investors",
+}
+
+UNIT_FACTORS = ("age", "market_cap", "employee_count", "domain_age")
+POINT_FACTORS = ("online_sentiment", "certifications", "funding_backing")
+
+METRIC_DEFAULTS = {
+    "age_years": 0,
+    "market_cap": 0,
+    "employees": 0,
+    "domain_age": 0,
+    "sentiment_score": 0.5,
+    "certified": False,
+    "funded_by_top_investors": False,
+}
+
+# Boolean metrics count by truthiness, as the original scorer did ("yes" and 1 are certified)
+FLAG_METRICS = ("certified", "funded_by_top_investors")
+
+
+def coerce_metric(metric: str, value, default=None) -> Optional[float]:
+    """A raw metric as the scorer reads it: flags by truthiness, anything else only if it is a number."""
+    if metric in FLAG_METRICS:
+        return float(bool(value))
+    return float(value) if isinstance(value, (int, float)) else default
+
+
+@dataclass(frozen=True)
+class ScoringProfile:
+    """
+    Named scoring configuration. Each factor is min(metric / unit, cap) for magnitude metrics
+    (`unit` is the amount worth one point) or min(metric * points, cap) for 0–1 and boolean
+    metrics; score = 10 * sum(factor * weight).
+    """
+    name: str
+    units: Dict[str, float]
+    points: Dict[str, float]
+    caps: Dict[str, float]
+    weights: Dict[str, float]
+    description: str = ""
+
+    def __post_init__(self):
+        required = {"units": UNIT_FACTORS, "points": POINT_FACTORS, "caps": FACTOR_METRICS, "weights": FACTOR_METRICS}
+        for part, factors in required.items():
+            missing = set(factors) - set(getattr(self, part))
+            if missing:
+                raise ValueError(f"Scoring profile '{self.name}' has no {part} for {sorted(missing)}")
+        total = sum(self.weights[factor] for factor in FACTOR_METRICS)
+        if abs(total - 1) > 1e-6:
+            raise ValueError(f"Weights of scoring profile '{self.name}' sum to {total:g}, expected 1 (0–100 scale)")
+
+    def with_overrides(self, weights: Optional[Mapping[str, float]] = None, caps: Optional[Mapping[str, float]] = None):
+        unknown = set(weights or {}).union(caps or {}) - set(FACTOR_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown credibility factors {sorted(unknown)}")
+        return replace(
+            self,
+            name=f"{self.name}+custom",
+            caps={**self.caps, **(caps or {})},
+            weights={**self.weights, **(weights or {})},
+        )
+
+
+DEFAULT_PROFILE = ScoringProfile(
+    name="default",
+    units={
+        "age": 3,                   # Max at 30 years
+        "market_cap": 1e8,          # Max at $1B
+        "employee_count": 100,      # Max at 1,000
+        "domain_age": 2,            # Max at 20 years
+    },
+    points={
+        "online_sentiment": 10,     # Score from 0–10
+        "certifications": 10,
+        "funding_backing": 10,
+    },
+    caps={factor: 10 for factor in FACTOR_METRICS},
+    weights={
+        "age": 0.20,
+        "market_cap": 0.20,
+        "employee_count": 0.15,
+        "domain_age": 0.10,
+        "online_sentiment": 0.15,
+        "certifications": 0.10,
+        "funding_backing": 0.10,
+    },
+    description="Original weighting",
+)
+
+SCORING_PROFILES: Dict[str, ScoringProfile] = {
+    "default": DEFAULT_PROFILE,
+    "established": replace(
+        DEFAULT_PROFILE,
+        name="established",
+        units={**DEFAULT_PROFILE.units, "age": 5, "market_cap": 1e9, "employee_count": 1000},
+        weights={**DEFAULT_PROFILE.weights, "online_sentiment": 0.10, "certifications": 0.15},
+        description="Saturates at 50 years, $10B market cap and 10,000 employees",
+    ),
+    "risk": replace(
+        DEFAULT_PROFILE,
+        name="risk",
+        weights={
+            "age": 0.15,
+            "market_cap": 0.10,
+            "employee_count": 0.10,
+            "domain_age": 0.20,
+            "online_sentiment": 0.25,
+            "certifications": 0.15,
+            "funding_backing": 0.05,
+        },
+        description="Favours domain age, sentiment and certifications over size",
+    ),
+}
+
+
+def register_profile(profile: ScoringProfile):
+    SCORING_PROFILES[profile.name] = profile
+
+
+def get_profile(name: str) -> ScoringProfile:
+    try:
+        return SCORING_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown scoring profile '{name}', expected one of {sorted(SCORING_PROFILES)}")
+
+
+def _column(metric: str, values: Sequence) -> np.ndarray:
+    default = float(METRIC_DEFAULTS[metric])
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        values = values.astype(np.float64)
+        values = np.where(np.isnan(values), default, values)  # NaN marks a missing metric
+        return (values != 0).astype(np.float64) if metric in FLAG_METRICS else values
+    return np.fromiter((coerce_metric(metric, v, default) for v in values), dtype=np.float64, count=len(values))
+
+
+def score_batch(
+    metrics: Mapping[str, Sequence], profile: ScoringProfile = DEFAULT_PROFILE
+) -> tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Scores many companies at once from columnar raw metrics ({metric: values}, all the same
+    length; flags count by truthiness, absent metrics, other non-numbers and NaN use their defaults).
+    Returns (scores, {factor: factor_values}).
+    """
+    length = len(next(iter(metrics.values()))) if metrics else 0
+    factors = {}
+    total = np.zeros(length)
+    for factor, metric in FACTOR_METRICS.items():
+        if metric in metrics:
+            values = _column(metric, metrics[metric])
+        else:
+            values = np.full(length, float(METRIC_DEFAULTS[metric]))
+        scaled = values / profile.units[factor] if factor in profile.units else values * profile.points[factor]
+        factors[factor] = np.minimum(scaled, profile.caps[factor])
+        total += factors[factor] * profile.weights[factor]
+    # 0–100 scale, two decimal points; Python's round (not np.round) so scores match the scalar path exactly
+    scores = np.fromiter((round(value, 2) for value in (total * 10).tolist()), dtype=np.float64, count=length)
+    return scores, factors
+
+
+@timed("scoring")
 def compute_credibility_score(
     age_years: int = 0,
     market_cap: float = 0,
@@ -5,39 +181,30 @@ def compute_credibility_score(
     domain_age: int = 0,
     sentiment_score: float = 0.5,
     certified: bool = False,
-    funded_by_top_investors: bool = False
+    funded_by_top_investors: bool = False,
+    profile: ScoringProfile = DEFAULT_PROFILE,
 ) -> tuple[float, dict]:
     """
     Computes a credibility score as a float (e.g., 98.5) based on weighted metrics.
     """
+    scores, factors = score_batch(
+        {
+            "age_years": [age_years],
+            "market_cap": [market_cap],
+            "employees": [employees],
+            "domain_age": [domain_age],
+            "sentiment_score": [sentiment_score],
+            "certified": [certified],
+            "funded_by_top_investors": [funded_by_top_investors],
+        },
+        profile,
+    )
+    return float(scores[0]), {factor: float(values[0]) for factor, values in factors.items()}
 
-    def safe(value, default=0):
-        return value if isinstance(value, (int, float)) and value is not None else default
-
-    # Normalized scores (capped)
-    factors = {
-        "age": min(safe(age_years) / 3, 10),                # Max at 30 years
-        "market_cap": min(safe(market_cap) / 1e8, 10),      # Max at $1B
-        "employee_count": min(safe(employees) / 100, 10),   # Max at 1,000
-        "domain_age": min(safe(domain_age) / 2, 10),        # Max at 20 years
-        "online_sentiment": min(safe(sentiment_score, 0.5) * 10, 10),  # Score from 0–10
-        "certifications": 10 if certified else 0,
-        "funding_backing": 10 if funded_by_top_investors else 0,
-    }
-
-    # Weights for each factor
-    weights = {
-        "age": 0.20,
-        "market_cap": 0.20,
-        "employee_count": 0.15,
-        "domain_age": 0.10,
-        "online_sentiment": 0.15,
-        "certifications": 0.10,
-        "funding_backing": 0.10,
-    }
 
-    # Weighted average and final float score
-    weighted_total = sum(factors[k] * weights[k] for k in factors)
-    final_score = round(weighted_total * 10, 2)  # Keep two decimal points (0–100 scale)
+CREDIBILITY_INSIGHT_PREFIX = "Credibility Score: "
+
 
-    return final_score, factors
+def credibility_insight(score: float) -> str:
+    """The key_insights line stating a report's score; rewritten whenever the report is rescored."""
+    return f"{CREDIBILITY_INSIGHT_PREFIX}{score}"
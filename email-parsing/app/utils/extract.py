@@ -1,42 +1,101 @@
-from typing import List
+from typing import List, Optional, Tuple, TYPE_CHECKING
+import logging
 import re
 
-try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm")
-    USE_SPACY = True
-except ImportError:
-    nlp = None
-    USE_SPACY = False
+from app.core.metrics import timed
+from app.services.sender_index import sender_domain
 
+if TYPE_CHECKING:
+    from app.services.sender_index import SenderDomainIndex
 
-def extract_company_names(emails: List[dict]) -> List[str]:
-    company_names = []
+SPACY_MODEL = "en_core_web_sm"
+# Only NER is used; skip loading the rest of the pipeline (tok2vec stays, ner may listen to it)
+SPACY_EXCLUDE = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
 
-    for email in emails:
-        sender = email.get("from", "")
-        subject = email.get("subject", "")
+_nlp = None
+_nlp_loaded = False
 
-        # Extract from sender name (e.g., "John from Acme Inc <john@acme.com>")
-        match = re.match(r"(.*)<.*>", sender)
-        sender_name = match.group(1).strip() if match else sender
 
+def get_nlp():
+    """Loads the spaCy NER pipeline on first use; returns None if spaCy or the model is unavailable."""
+    global _nlp, _nlp_loaded
+    if not _nlp_loaded:
+        try:
+            import spacy
+            _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+        except (ImportError, OSError) as e:
+            logging.info(f"spaCy unavailable, using heuristic company extraction: {e}")
+            _nlp = None
+        _nlp_loaded = True
+    return _nlp
+
+
+def _sender_name(email: dict) -> str:
+    sender = email.get("from", "")
+
+    # Extract from sender name (e.g., "John from Acme Inc <john@acme.com>")
+    match = re.match(r"(.*)<.*>", sender)
+    return match.group(1).strip() if match else sender
+
+
+@timed("extract")
+def extract_companies_per_email(
+    emails: List[dict],
+    batch_size: int = 256,
+    n_process: int = 1,
+    nlp: Optional[object] = None,
+    sender_index: Optional["SenderDomainIndex"] = None,
+) -> List[List[Tuple[str, str]]]:
+    """
+    Returns, for each email, its candidate company names as (name, source) pairs, where source is
+    the spaCy entity label, "sender_index" or "heuristic". Senders whose domain is in
+    `sender_index` resolve directly and never reach NER. Remaining texts go through spaCy's
+    `nlp.pipe` in batches of `batch_size`; `n_process` > 1 fans batches out to worker processes
+    for large backfills.
+    """
+    results: List[List[Tuple[str, str]]] = [[] for _ in emails]
+    pending = []
+    for index, email in enumerate(emails):
+        known = sender_index.lookup(sender_domain(email.get("from", ""))) if sender_index else None
+        if known:
+            results[index].append((known, "sender_index"))
+        else:
+            pending.append(index)
+
+    if not pending:
+        return results
+
+    nlp = nlp or get_nlp()
+    if nlp is not None:
         # Try spaCy NER on sender name + subject
-        if USE_SPACY:
-            text = f"{sender_name} {subject}"
-            doc = nlp(text)
+        texts = (f"{_sender_name(emails[i])} {emails[i].get('subject', '')}" for i in pending)
+        for index, doc in zip(pending, nlp.pipe(texts, batch_size=batch_size, n_process=n_process)):
             for ent in doc.ents:
                 if ent.label_ in ["ORG", "PERSON", "GPE"]:
-                    company_names.append(ent.text.strip())
+                    results[index].append((ent.text.strip(), ent.label_))
 
-        else:
-            # Fallback: use simple heuristics
-            words = sender_name.split()
+    else:
+        # Fallback: use simple heuristics
+        for index in pending:
+            words = _sender_name(emails[index]).split()
             if len(words) > 1:
-                company_names.append(" ".join(words[-2:]))  # Last two words
-            else:
-                company_names.append(words[0])
+                results[index].append((" ".join(words[-2:]), "heuristic"))  # Last two words
+            elif words:
+                results[index].append((words[0], "heuristic"))
+
+    return results
+
+
+def extract_company_names(
+    emails: List[dict],
+    batch_size: int = 256,
+    n_process: int = 1,
+    nlp: Optional[object] = None,
+    sender_index: Optional["SenderDomainIndex"] = None,
+) -> List[str]:
+    per_email = extract_companies_per_email(emails, batch_size, n_process, nlp, sender_index)
+    company_names = [name for candidates in per_email for name, _ in candidates]
 
-    # Deduplicate and clean
-    cleaned = list({name.strip() for name in company_names if name.strip()})
+    # Deduplicate and clean (keep first-seen order so results are deterministic)
+    cleaned = list(dict.fromkeys(name.strip() for name in company_names if name.strip()))
     return cleaned
@@ -0,0 +1,161 @@
+import base64
+import binascii
+import logging
+import quopri
+import re
+from datetime import datetime, timezone
+from email import policy
+from email.header import Header, decode_header
+from email.message import Message
+from email.parser import BytesHeaderParser
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+from app.models.records import EmailRecord
+
+_FOLD = re.compile(r"\r?\n[ \t]")
+_BLANK_LINE = re.compile(rb"\r?\n\r?\n")
+_header_parser = BytesHeaderParser(policy=policy.compat32)
+
+MAX_MULTIPART_DEPTH = 8
+
+
+def _decode_bytes(data: bytes, charset: Optional[str]) -> str:
+    if charset in (None, "unknown-8bit"):
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError:
+            return data.decode("cp1252", errors="replace")
+    try:
+        return data.decode(charset, errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+def decode_header_value(value) -> str:
+    """
+    Decodes a complete header value: unfolds continuation lines, decodes every RFC 2047 encoded
+    word (not just the first) and raw 8-bit bytes, falling back to UTF-8 for unknown charsets.
+    """
+    if not value:
+        return ""
+    try:
+        if isinstance(value, Header):  # compat32 returns raw 8-bit headers as Header objects
+            chunks = decode_header(value)
+        else:
+            chunks = decode_header(_FOLD.sub(" ", value))
+        return "".join(
+            chunk if isinstance(chunk, str) else _decode_bytes(chunk, charset) for chunk, charset in chunks
+        ).strip()
+    except Exception:
+        return _FOLD.sub(" ", str(value)).strip()
+
+
+def parse_email_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    RFC 2822 Date header -> timezone-aware datetime, accepting the obsolete forms found in real
+    mail (no weekday or seconds, named zones, trailing comments, two-digit years) and ISO 8601.
+    Dates without a zone are taken as UTC; returns None if the value is not a date.
+    """
+    if not value:
+        return None
+    value = _FOLD.sub(" ", str(value)).strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def decode_partial_body(data: bytes, encoding: str, charset: str) -> str:
+    """Decodes a possibly truncated body part, dropping any incomplete trailing bytes."""
+    try:
+        if encoding == "base64":
+            compact = b"".join(data.split())
+            data = base64.b64decode(compact[: len(compact) - len(compact) % 4])
+        elif encoding == "quoted-printable":
+            data = quopri.decodestring(data)
+    except (binascii.Error, ValueError) as e:
+        logging.warning(f"Failed to decode {encoding} body snippet: {e}")
+        return ""
+    try:
+        return data.decode(charset, errors="ignore")
+    except LookupError:
+        return data.decode("utf-8", errors="ignore")
+
+
+# ---- Fast path: headers + first text part ------------------------------------------------------
+
+def _split_entity(data: bytes, start: int, end: int) -> Tuple[Message, int]:
+    """Parses only the header block of the MIME entity in data[start:end]; returns (headers, body offset)."""
+    if data.startswith(b"\n", start):
+        return _header_parser.parsebytes(b""), start + 1
+    if data.startswith(b"\r\n", start):
+        return _header_parser.parsebytes(b""), start + 2
+    match = _BLANK_LINE.search(data, start, end)
+    header_end, body_start = (match.start(), match.end()) if match else (end, end)
+    return _header_parser.parsebytes(data[start:header_end]), body_start
+
+
+def _first_text_part(data: bytes, headers: Message, start: int, end: int, depth: int = 0):
+    """
+    (headers, body_start, body_end) of the first non-attachment text/plain part — or the first
+    text/* part if there is none — found by scanning for MIME boundaries. Parts before it are
+    skipped without being parsed, and nothing after it is read.
+    """
+    if headers.get_content_maintype() == "multipart":
+        boundary = headers.get_param("boundary")
+        if not boundary or depth >= MAX_MULTIPART_DEPTH:
+            return None
+        delimiter = b"--" + str(boundary).encode("ascii", errors="ignore")
+        fallback = None
+        position = data.find(delimiter, start, end)
+        while position != -1 and not data.startswith(b"--", position + len(delimiter)):
+            line_end = data.find(b"\n", position, end)
+            if line_end == -1:
+                break
+            following = data.find(b"\n" + delimiter, line_end, end)
+            part_end = following if following != -1 else end
+            if data[part_end - 1:part_end] == b"\r":
+                part_end -= 1
+            part_headers, body_start = _split_entity(data, line_end + 1, part_end)
+            found = _first_text_part(data, part_headers, body_start, part_end, depth + 1)
+            if found and found[0].get_content_subtype() == "plain":
+                return found
+            fallback = fallback or found
+            if following == -1:
+                break
+            position = following + 1
+        return fallback
+
+    if headers.get_content_maintype() == "text" and headers.get_content_disposition() != "attachment":
+        return headers, start, end
+    return None
+
+
+def parse_message_fast(data: bytes, key: str, snippet_chars: int = 500, snippet_bytes: int = 4096) -> EmailRecord:
+    """
+    Summarizes one RFC 822 message without building a Message tree: parses the top-level header
+    block, walks multipart boundaries to the first text part and decodes at most `snippet_bytes`
+    of it. Attachments and later parts are never parsed or decoded.
+    """
+    headers, body_start = _split_entity(data, 0, len(data))
+    snippet = ""
+    found = _first_text_part(data, headers, body_start, len(data))
+    if found:
+        part_headers, start, end = found
+        encoding = (part_headers.get("Content-Transfer-Encoding") or "7bit").strip().lower()
+        charset = part_headers.get_content_charset() or "utf-8"
+        snippet = decode_partial_body(data[start:min(end, start + snippet_bytes)], encoding, charset)
+    date = headers.get("Date")
+    return EmailRecord(
+        id=key,
+        message_id=str(headers.get("Message-ID") or "").strip(),
+        subject=decode_header_value(headers.get("Subject")),
+        sender=decode_header_value(headers.get("From")),
+        date=str(date).strip() if date is not None else None,
+        snippet=snippet.strip()[:snippet_chars],
+    )
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Mapping, Optional, TypeVar
+
+from app.core.metrics import UPSTREAM_CONCURRENCY_LIMIT, UPSTREAM_ERRORS, UPSTREAM_IN_FLIGHT
+
+T = TypeVar("T")
+
+
+class UpstreamError(Exception):
+    """A failed call to an external API (OpenAI, Serper); status None means a network/timeout error."""
+
+    def __init__(self, upstream: str, status: Optional[int] = None, retry_after: Optional[float] = None, message: str = ""):
+        super().__init__(f"{upstream} error{f' {status}' if status else ''}: {message}".rstrip(": "))
+        self.upstream = upstream
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status == 429 or self.status >= 500
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds to wait from `retry-after-ms` / `Retry-After` (delta-seconds or HTTP-date) headers."""
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+class TokenBucket:
+    """Per-minute budget; reservations may overdraw it, returning how long the caller must wait."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+        return max(-self.tokens / self.rate, 0.0)
+
+    def adjust(self, delta: float):
+        """Charges (or refunds, if negative) the difference between estimated and actual usage."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class AdaptiveLimiter:
+    """
+    Shared limiter for one upstream: requests/min and (optionally) tokens/min buckets plus an
+    AIMD concurrency window. The window starts at `initial_concurrency` (default: the maximum),
+    so a healthy upstream is never throttled; each 429 halves it and each later success adds
+    1/limit (about +1 per window of calls) until it is back at the maximum.
+    A Retry-After from the upstream pauses every caller until it has passed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        initial_concurrency: Optional[int] = None,
+        max_attempts: int = 5,
+    ):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        initial = max_concurrency if initial_concurrency is None else initial_concurrency
+        self.limit = float(min(max(initial, min_concurrency), max_concurrency))
+        self.in_flight = 0
+        self.throttled = 0
+        self._paused_until = 0.0
+        self._cond: Optional[asyncio.Condition] = None
+        self._cond_loop: Optional[asyncio.AbstractEventLoop] = None
+        UPSTREAM_CONCURRENCY_LIMIT.set(self.limit, upstream=name)
+
+    def _condition(self) -> asyncio.Condition:
+        # The limiter is process-global but a Condition belongs to one event loop; create one per loop
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._cond_loop is not loop:
+            self._cond, self._cond_loop = asyncio.Condition(), loop
+        return self._cond
+
+    @asynccontextmanager
+    async def slot(self, tokens: float = 0) -> AsyncIterator[None]:
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            UPSTREAM_IN_FLIGHT.set(self.in_flight, upstream=self.name)
+        try:
+            delay = max(
+                self._paused_until - time.monotonic(),
+                self.requests.reserve(1),
+                self.tokens.reserve(tokens) if self.tokens and tokens else 0.0,
+            )
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+        finally:
+            async with cond:
+                self.in_flight -= 1
+                UPSTREAM_IN_FLIGHT.set(self.in_flight, upstream=self.name)
+                cond.notify_all()
+
+    def on_success(self):
+        self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        UPSTREAM_CONCURRENCY_LIMIT.set(self.limit, upstream=self.name)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        self.throttled += 1
+        self.limit = max(self.min_concurrency, self.limit / 2)
+        UPSTREAM_CONCURRENCY_LIMIT.set(self.limit, upstream=self.name)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        logging.warning(
+            f"🐢 {self.name} throttled; concurrency window now {self.limit:.1f}"
+            + (f", pausing {retry_after:.1f}s" if retry_after else "")
+        )
+
+    def record_tokens(self, estimated: float, actual: Optional[float]):
+        if self.tokens and actual is not None:
+            self.tokens.adjust(actual - estimated)
+
+    def stats(self) -> dict:
+        return {"concurrency_limit": round(self.limit, 2), "in_flight": self.in_flight, "throttled": self.throttled}
+
+
+def backoff_delay(error: UpstreamError, attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
+    """The upstream's Retry-After if it sent one, else full-jitter exponential backoff."""
+    if error.retry_after:
+        return min(error.retry_after, max_delay)
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+async def call_with_retry(
+    limiter: AdaptiveLimiter,
+    func: Callable[[], Awaitable[T]],
+    tokens: float = 0,
+    max_attempts: Optional[int] = None,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+) -> T:
+    """
+    Runs `func` inside a limiter slot, retrying retryable UpstreamErrors with the upstream's
+    Retry-After or full-jitter exponential backoff. Non-retryable errors are raised immediately.
+    """
+    max_attempts = max_attempts or limiter.max_attempts
+    for attempt in range(1, max_attempts + 1):
+        try:
+            async with limiter.slot(tokens):
+                result = await func()
+            limiter.on_success()
+            return result
+        except UpstreamError as e:
+            UPSTREAM_ERRORS.inc(upstream=e.upstream, status=str(e.status or "network"))
+            if e.status == 429:
+                limiter.on_throttle(e.retry_after)
+            if not e.retryable or attempt == max_attempts:
+                raise
+            delay = backoff_delay(e, attempt, base_delay, max_delay)
+            logging.info(f"🔁 {e} — retry {attempt}/{max_attempts - 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_limiter(upstream: str) -> AdaptiveLimiter:
+    """Process-wide limiter for "openai" or "serper", configured from settings."""
+    if upstream not in _limiters:
+        from app.core.config import settings
+
+        if upstream == "openai":
+            _limiters[upstream] = AdaptiveLimiter(
+                "openai",
+                settings.openai_rpm,
+                settings.openai_tpm,
+                max_concurrency=settings.openai_max_concurrency,
+                max_attempts=settings.upstream_max_attempts,
+            )
+        elif upstream == "serper":
+            _limiters[upstream] = AdaptiveLimiter(
+                "serper",
+                settings.serper_rpm,
+                max_concurrency=settings.serper_max_concurrency,
+                max_attempts=settings.upstream_max_attempts,
+            )
+        else:
+            raise ValueError(f"Unknown upstream '{upstream}'")
+    return _limiters[upstream]
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from app.models.schemas import ResearchReport
 from jinja2 import Template
 
@@ -23,6 +25,11 @@ md_template = """
 {% endfor %}
 """
 
+@lru_cache(maxsize=None)
+def get_markdown_template() -> Template:
+    """Compiles the report template on first use; every later render reuses it."""
+    return Template(md_template)
+
+
 def generate_markdown_report(report: ResearchReport) -> str:
-    template = Template(md_template)
-    return template.render(report=report)
+    return get_markdown_template().render(report=report)
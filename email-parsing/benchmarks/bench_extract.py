@@ -0,0 +1,86 @@
+"""
+Throughput benchmark for company-name extraction on a synthetic corpus.
+
+    python -m benchmarks.bench_extract --emails 20000 --batch-size 256 --processes 1 4
+
+Compares the old one-`nlp(text)`-per-email loop against batched `nlp.pipe`
+(optionally multi-process) and reports emails/second for each. The winning
+process count maps to `ingest_archive.py --ner-processes`.
+"""
+import argparse
+import random
+import time
+
+from app.utils.extract import extract_company_names, get_nlp, _sender_name
+
+COMPANIES = ["Acme Inc", "Globex Corporation", "Initech", "Umbrella Corp", "Stark Industries",
+             "Wayne Enterprises", "Hooli", "Pied Piper", "Vandelay Industries", "Soylent Ltd"]
+PEOPLE = ["John Smith", "Maria Garcia", "Wei Zhang", "Aisha Khan", "Liam Murphy"]
+SUBJECTS = ["Invoice #{n} from {company}", "{company} quarterly partnership update",
+            "Meeting request: {company} x our team", "Your {company} order {n} has shipped",
+            "Re: pricing proposal for {company}"]
+
+
+def synthetic_emails(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    emails = []
+    for n in range(count):
+        company = rng.choice(COMPANIES)
+        person = rng.choice(PEOPLE)
+        domain = company.split()[0].lower()
+        emails.append({
+            "from": f"{person} from {company} <{person.split()[0].lower()}@{domain}.com>",
+            "subject": rng.choice(SUBJECTS).format(company=company, n=n),
+        })
+    return emails
+
+
+def per_email_baseline(emails: list, nlp) -> list:
+    names = []
+    for email in emails:
+        doc = nlp(f"{_sender_name(email)} {email.get('subject', '')}")
+        names.extend(ent.text for ent in doc.ents if ent.label_ in ["ORG", "PERSON", "GPE"])
+    return list(dict.fromkeys(names))
+
+
+def timed(label: str, count: int, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed:8.2f}s {count / elapsed:12.0f} emails/s  ({len(result)} names)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--emails", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    emails = synthetic_emails(args.emails)
+
+    started = time.perf_counter()
+    nlp = get_nlp()
+    print(f"Model load: {time.perf_counter() - started:.2f}s ({'spaCy' if nlp else 'heuristic fallback'})")
+
+    if nlp is None:
+        timed("heuristic", len(emails), lambda: extract_company_names(emails))
+        return
+
+    timed("per-email nlp(text) (full pipeline)", len(emails), lambda: per_email_baseline(emails, _full_pipeline()))
+    for processes in args.processes:
+        timed(
+            f"nlp.pipe batch={args.batch_size} n_process={processes}",
+            len(emails),
+            lambda: extract_company_names(emails, batch_size=args.batch_size, n_process=processes),
+        )
+
+
+def _full_pipeline():
+    import spacy
+    from app.utils.extract import SPACY_MODEL
+    return spacy.load(SPACY_MODEL)
+
+
+if __name__ == "__main__":
+    main()
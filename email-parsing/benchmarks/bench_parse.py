@@ -0,0 +1,134 @@
+"""
+Parse throughput and memory for a large synthetic corpus: the full `email.message.Message`
+tree path with dict summaries and a validated pydantic `Email` per message, versus the fast path
+(header block + first text part only, slots-based `EmailRecord`, models built at the boundary).
+
+    python -m benchmarks.bench_parse --messages 100000 --attachment-ratio 0.3 --attachment-kb 128
+
+The corpus cycles `--unique` generated messages (generation is slower than parsing).
+"""
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from email import policy
+from email.parser import BytesParser
+
+from benchmarks.import_budget import budget_env
+from benchmarks.standins import synthetic_message
+
+
+def tree_summary(data: bytes, key: str, snippet_chars: int = 500) -> dict:
+    """The previous approach: parse the whole message tree, walk every part for text/plain."""
+    from app.utils.mime import decode_header_value
+
+    message = BytesParser(policy=policy.compat32).parsebytes(data)
+    fallback = chosen = None
+    for part in message.walk():
+        if part.get_content_maintype() != "text" or part.get_filename():
+            continue
+        if part.get_content_subtype() == "plain":
+            chosen = part
+            break
+        fallback = fallback or part
+    chosen = chosen or fallback
+    snippet = ""
+    if chosen is not None:
+        payload = chosen.get_payload(decode=True) or b""
+        snippet = payload.decode(chosen.get_content_charset() or "utf-8", errors="ignore").strip()[:snippet_chars]
+    return {
+        "id": key,
+        "message_id": (message.get("Message-ID") or "").strip(),
+        "subject": decode_header_value(message.get("Subject")),
+        "from": decode_header_value(message.get("From")),
+        "date": message.get("Date"),
+        "snippet": snippet,
+    }
+
+
+def validated_models(summaries: list) -> list:
+    """The previous EmailParser: strptime with one format and a fully validated model per message."""
+    from email.utils import parseaddr
+    from app.models.schemas import Email
+
+    models = []
+    for e in summaries:
+        try:
+            date = datetime.strptime(e.get("date", ""), "%a, %d %b %Y %H:%M:%S %z")
+        except Exception:
+            date = datetime.utcnow()
+        models.append(
+            Email(id=e["id"], subject=e["subject"], sender=parseaddr(e["from"])[1], date=date, snippet=e["snippet"])
+        )
+    return models
+
+
+def measure(label: str, count: int, func):
+    gc.collect()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<44} {elapsed:8.2f}s {count / elapsed:12.0f} msg/s")
+    return result, elapsed
+
+
+def retained_bytes(build) -> int:
+    """Bytes still allocated after `build()` returns, i.e. the cost of holding its result."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--unique", type=int, default=2000)
+    parser.add_argument("--attachment-ratio", type=float, default=0.3)
+    parser.add_argument("--attachment-kb", type=int, default=64)
+    parser.add_argument("--html-ratio", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, value in budget_env(workdir).items():
+            os.environ.setdefault(name, value)
+        from app.services.email_parser import EmailParser
+        from app.utils.mime import parse_message_fast
+
+        rng = random.Random(7)
+        unique = [
+            synthetic_message(n, rng, args.attachment_ratio, args.attachment_kb, args.html_ratio)
+            for n in range(args.unique)
+        ]
+        corpus = [unique[n % len(unique)] for n in range(args.messages)]
+        print(f"Corpus: {len(corpus)} messages, {sum(map(len, corpus)) / 2**20:.0f} MiB")
+
+        old, old_parse = measure(
+            "message tree -> dict", len(corpus), lambda: [tree_summary(m, str(i)) for i, m in enumerate(corpus)]
+        )
+        new, new_parse = measure(
+            "fast path -> EmailRecord", len(corpus), lambda: [parse_message_fast(m, str(i)) for i, m in enumerate(corpus)]
+        )
+        mismatched = sum(1 for a, b in zip(old, new) if a["snippet"] != b.snippet or a["subject"] != b.subject)
+        print(f"{'  parse speed-up':<44} {old_parse / new_parse:8.1f}x   ({mismatched} summaries differ)")
+
+        _, old_models = measure("validated Email models (strptime)", len(corpus), lambda: validated_models(old))
+        _, new_models = measure("EmailParser.parse_emails (boundary)", len(corpus), lambda: EmailParser.parse_emails(new))
+        print(f"{'  model speed-up':<44} {old_models / new_models:8.1f}x")
+
+        sample = corpus[: min(len(corpus), 20000)]
+        dict_bytes = retained_bytes(lambda: [tree_summary(m, str(i)) for i, m in enumerate(sample)])
+        record_bytes = retained_bytes(lambda: [parse_message_fast(m, str(i)) for i, m in enumerate(sample)])
+        print(f"{'held in memory per message: dict':<44} {dict_bytes / len(sample):8.0f} B")
+        print(f"{'held in memory per message: EmailRecord':<44} {record_bytes / len(sample):8.0f} B")
+
+
+if __name__ == "__main__":
+    main()
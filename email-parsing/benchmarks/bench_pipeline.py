@@ -0,0 +1,300 @@
+"""
+Offline end-to-end pipeline benchmarks against local stand-ins for Gmail IMAP, Serper and OpenAI
+(see benchmarks/standins.py) — no network access or API quota needed.
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --emails 5000 --companies 500 --llm-latency 0.5 --repeat 5
+    python -m benchmarks.bench_pipeline --scenarios fetch research --fail-on-regression
+
+Scenarios: fetch (GmailService over IMAP), extract (company names), research (ResearchEngine
+fan-out), scoring (vectorized credibility scores), render (markdown reports) and orchestrate
+(run_orchestration end to end). Each run appends one JSON line — commit, parameters and
+per-scenario timings — to --history (benchmarks/history.jsonl, a local file git ignores), and is
+compared with the latest earlier run that used the same parameters; a scenario whose median time
+grew by more than --threshold is a regression.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.import_budget import PROJECT_DIR, budget_env
+from benchmarks.standins import FakeChatModel, FakeImapServer, FakeSerperServer, SyntheticMailbox
+
+SCENARIOS = ("fetch", "extract", "research", "scoring", "render", "orchestrate")
+DEFAULT_HISTORY = PROJECT_DIR / "benchmarks" / "history.jsonl"
+
+
+def git_commit() -> Dict[str, object]:
+    def git(*args) -> str:
+        result = subprocess.run(["git", *args], cwd=PROJECT_DIR, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else ""
+
+    return {"commit": git("rev-parse", "--short", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "."))}
+
+
+class Bench:
+    """Runs each scenario `repeat` times (after `setup`, untimed) and keeps the timings."""
+
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results: Dict[str, dict] = {}
+
+    async def run(self, name: str, func: Callable, setup: Optional[Callable] = None, **extra) -> object:
+        timings, result, items = [], None, 0
+        for _ in range(self.repeat):
+            if setup:
+                await setup()
+            started = time.perf_counter()
+            result = await func()
+            timings.append(time.perf_counter() - started)
+            items = len(result) if hasattr(result, "__len__") else int(result or 0)
+        median = statistics.median(timings)
+        self.results[name] = {
+            "median_s": round(median, 4),
+            "best_s": round(min(timings), 4),
+            "items": items,
+            "items_per_s": round(items / median, 1) if median else None,
+            **{key: value() if callable(value) else value for key, value in extra.items()},
+        }
+        print(f"{name:<12} {median:9.3f}s median {min(timings):9.3f}s best {items:>8} items "
+              f"{self.results[name]['items_per_s'] or 0:>12.1f}/s")
+        return result
+
+
+async def run_scenarios(args) -> Dict[str, dict]:
+    # Imported here so the environment from main() is in place before Settings is created
+    from app.core.config import settings
+    from app.models.schemas import CompanyResearch
+    from app.services.gmail_service import GmailService
+    from app.services.imap_pool import ImapSessionPool
+    from app.services.mail_sync_state import MailSyncState
+    from app.services.orchestrator import extract_companies, run_orchestration
+    from app.services.report_store import ReportStore
+    from app.services.research_engine import ResearchEngine
+    from app.services.serper_client import close_serper_clients
+    from app.utils.credibility import score_batch
+    from app.utils.extract import get_nlp
+    from app.utils.report_generator import generate_markdown_report
+
+    import numpy as np
+
+    mailbox = SyntheticMailbox(args.emails, args.attachment_ratio, args.attachment_kb, args.html_ratio)
+    bench = Bench(args.repeat)
+    workdir = tempfile.mkdtemp(prefix="bench-pipeline-")
+
+    with FakeImapServer(mailbox, args.imap_latency) as imap_server, FakeSerperServer(args.serper_latency) as serper:
+        settings.imap_host, settings.imap_port, settings.imap_ssl = "127.0.0.1", imap_server.port, False
+        settings.serper_url = serper.url
+        if not args.keep_rate_limits:
+            # Measure the pipeline, not the production request budgets
+            settings.serper_rpm = settings.openai_rpm = 10 ** 6
+            settings.openai_tpm = 10 ** 9
+
+        chat = FakeChatModel(args.llm_latency, args.llm_tokens)
+        run_number = iter(range(10 ** 6))
+
+        def build_engine(store: Optional[ReportStore]) -> ResearchEngine:
+            engine = ResearchEngine(
+                "bench", "bench", settings.model, args.mode, cache=None, store=store,
+                metrics_batch_size=args.metrics_batch_size, metrics_batch_wait=settings.research_metrics_batch_wait,
+            )
+            engine.llm = engine.json_llm = chat
+            engine.structured_llm = chat.with_structured_output(CompanyResearch, include_raw=True)
+            return engine
+
+        async def fresh_mailbox():
+            mailbox.mark_all_unseen()
+
+        async def fresh_search():
+            await close_serper_clients()  # drops the Serper result cache between repeats
+
+        emails: List[dict] = []
+        if "fetch" in args.scenarios or "extract" in args.scenarios:
+            async def fetch():
+                service = GmailService("bench@example.com", "bench")
+                await service.connect()
+                try:
+                    return await service.fetch_unread_emails()
+                finally:
+                    await service.logout()
+
+            if "fetch" in args.scenarios:
+                before = (imap_server.commands, imap_server.bytes_sent)
+                emails = await bench.run(
+                    "fetch", fetch, fresh_mailbox,
+                    imap_commands=lambda: (imap_server.commands - before[0]) // args.repeat,
+                    imap_bytes=lambda: (imap_server.bytes_sent - before[1]) // args.repeat,
+                )
+            else:
+                await fresh_mailbox()
+                emails = await fetch()
+
+        if "extract" in args.scenarios:
+            async def extract():
+                await extract_companies(emails, None, settings.company_similarity_threshold)
+                return emails
+
+            get_nlp()  # model load is a one-off startup cost, not per-batch throughput
+            await bench.run("extract", extract)
+
+        reports = []
+        if "research" in args.scenarios or "render" in args.scenarios:
+            store = ReportStore(os.path.join(workdir, "research.db"))
+
+            async def research():
+                suffix = next(run_number)
+                names = [f"Company {i} run {suffix}" for i in range(args.companies)]
+                results = await build_engine(store).research_companies(
+                    names, concurrency=args.concurrency, timeout=settings.research_timeout
+                )
+                return [report for report in results if report]
+
+            calls_before, serper_before = chat.calls, serper.requests
+            if "research" in args.scenarios:
+                reports = await bench.run(
+                    "research", research, fresh_search,
+                    llm_calls=lambda: (chat.calls - calls_before) // args.repeat,
+                    serper_requests=lambda: (serper.requests - serper_before) // args.repeat,
+                )
+            else:
+                reports = await research()
+
+        if "scoring" in args.scenarios:
+            rng = np.random.default_rng(7)
+            rows = args.scoring_rows
+            columns = {
+                "age_years": rng.integers(0, 60, rows).astype(float),
+                "market_cap": rng.uniform(0, 5e9, rows),
+                "employees": rng.integers(1, 50000, rows).astype(float),
+                "domain_age": rng.integers(0, 30, rows).astype(float),
+                "sentiment_score": rng.uniform(0, 1, rows),
+                "certified": rng.integers(0, 2, rows).astype(float),
+                "funded_by_top_investors": rng.integers(0, 2, rows).astype(float),
+            }
+
+            async def scoring():
+                scores, _ = score_batch(columns)
+                return scores
+
+            await bench.run("scoring", scoring)
+
+        if "render" in args.scenarios:
+            async def render():
+                return [generate_markdown_report(report) for report in reports]
+
+            await bench.run("render", render)
+
+        if "orchestrate" in args.scenarios:
+            pool = ImapSessionPool(settings.imap_pool_size)
+            sync_state = MailSyncState(os.path.join(workdir, "sync.db"))
+            store = ReportStore(os.path.join(workdir, "orchestrate.db"))
+
+            async def orchestrate_setup():
+                await fresh_mailbox()
+                await fresh_search()
+
+            async def orchestrate():
+                return await run_orchestration(
+                    settings, pool, sync_state, build_engine(store),
+                    concurrency=args.concurrency, incremental=False,
+                )
+
+            await bench.run("orchestrate", orchestrate, orchestrate_setup)
+            await pool.close()
+
+        await close_serper_clients()
+    return bench.results
+
+
+def load_history(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(record: dict, history: List[dict], threshold: float) -> List[str]:
+    """Prints the change against the latest earlier run with the same parameters; returns regressions."""
+    previous = next((r for r in reversed(history) if r.get("params") == record["params"]), None)
+    if previous is None:
+        print("No earlier run with these parameters to compare against.")
+        return []
+    print(f"\nCompared with {previous.get('commit')} ({previous.get('timestamp')}):")
+    regressions = []
+    for name, result in record["scenarios"].items():
+        before = previous["scenarios"].get(name)
+        if not before or not before.get("median_s"):
+            continue
+        change = result["median_s"] / before["median_s"] - 1
+        marker = "  REGRESSION" if change > threshold else ""
+        print(f"  {name:<12} {before['median_s']:9.3f}s -> {result['median_s']:9.3f}s  {change:+7.1%}{marker}")
+        if marker:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--emails", type=int, default=1000, help="messages in the synthetic mailbox")
+    parser.add_argument("--attachment-ratio", type=float, default=0.2)
+    parser.add_argument("--attachment-kb", type=int, default=64)
+    parser.add_argument("--html-ratio", type=float, default=0.5)
+    parser.add_argument("--imap-latency", type=float, default=0.0, help="seconds added per IMAP command")
+    parser.add_argument("--companies", type=int, default=100, help="companies per research run")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--mode", choices=("sequential", "parallel", "combined"), default="parallel")
+    parser.add_argument("--metrics-batch-size", type=int, default=1)
+    parser.add_argument("--serper-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-tokens", type=int, default=300, help="completion tokens per fake LLM call")
+    parser.add_argument("--scoring-rows", type=int, default=100000)
+    parser.add_argument("--keep-rate-limits", action="store_true", help="keep the configured Serper/OpenAI budgets")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--no-history", action="store_true", help="do not append this run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="median slowdown that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, value in budget_env(workdir).items():
+            os.environ.setdefault(name, value)
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/bench.db"
+        logging.basicConfig(level=logging.WARNING)
+        scenarios = asyncio.run(run_scenarios(args))
+
+    params = {
+        key: value for key, value in vars(args).items()
+        if key not in ("scenarios", "repeat", "history", "no_history", "threshold", "fail_on_regression")
+    }
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        **git_commit(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        "params": params,
+        "scenarios": scenarios,
+    }
+    history = load_history(args.history)
+    regressions = compare(record, history, args.threshold)
+    if not args.no_history:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"Appended results to {args.history}")
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Startup budget check for CI: cumulative import time of `main` measured with `python -X importtime`,
+and the latency from a fresh process to its first answered request.
+
+    python -m benchmarks.import_budget --import-ms 1000 --first-request-ms 2500
+
+Each measurement is the best of `--repeat` fresh interpreters. Exits non-zero if a budget is
+exceeded or a lazily loaded dependency (LangChain, OpenAI, spaCy) is imported at startup.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Loaded on first research / extraction, never by `import main`
+LAZY_MODULES = ("langchain", "langchain_core", "langchain_openai", "openai", "spacy")
+
+FIRST_REQUEST = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    client.get("/report/", params={"limit": 1}).raise_for_status()
+    answered = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (answered - started) * 1000,
+}))
+"""
+
+
+def budget_env(workdir: str) -> dict:
+    env = dict(os.environ)
+    # Settings requires these; the values are never used to connect anywhere here
+    for name, value in {
+        "EMAIL_ADDRESS": "ci@example.com",
+        "APP_PASSWORD": "ci",
+        "SERPER_API_KEY": "ci",
+        "OPENAI_API_KEY": "ci",
+    }.items():
+        env.setdefault(name, value)
+    env["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/budget.db"
+    return env
+
+
+def measure_imports(env: dict) -> tuple[float, list]:
+    """Returns (cumulative ms for `import main`, lazily loaded modules that were imported anyway)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    main_us = 0
+    eager = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name == "main":
+            main_us = int(cumulative)
+        if name.split(".")[0] in LAZY_MODULES:
+            eager.add(name.split(".")[0])
+    return main_us / 1000, sorted(eager)
+
+
+def measure_first_request(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST], cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--import-ms", type=float, default=1000, help="budget for `import main`")
+    parser.add_argument("--first-request-ms", type=float, default=2500, help="budget from process start to first response")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = budget_env(workdir)
+        imports = [measure_imports(env) for _ in range(args.repeat)]
+        requests = [measure_first_request(env) for _ in range(args.repeat)]
+
+    import_ms = min(ms for ms, _ in imports)
+    eager = sorted({name for _, names in imports for name in names})
+    first = min(requests, key=lambda r: r["first_request_ms"])
+
+    failures = []
+    if import_ms > args.import_ms:
+        failures.append(f"import main took {import_ms:.0f} ms (budget {args.import_ms:.0f} ms)")
+    if first["first_request_ms"] > args.first_request_ms:
+        failures.append(f"first request took {first['first_request_ms']:.0f} ms (budget {args.first_request_ms:.0f} ms)")
+    if eager:
+        failures.append(f"imported at startup but should load lazily: {', '.join(eager)}")
+
+    print(f"{'import main (-X importtime)':<32}{import_ms:>9.0f} ms   budget {args.import_ms:.0f} ms")
+    print(f"{'  import (wall clock)':<32}{first['import_ms']:>9.0f} ms")
+    print(f"{'  lifespan startup':<32}{first['startup_ms']:>9.0f} ms")
+    print(f"{'first request':<32}{first['first_request_ms']:>9.0f} ms   budget {args.first_request_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
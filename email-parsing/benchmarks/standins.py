@@ -0,0 +1,475 @@
+"""
+Local stand-ins for the external services, so the pipeline can be benchmarked without Gmail,
+Serper or OpenAI quota:
+
+- FakeImapServer: a plain-TCP IMAP4rev1 subset (LOGIN, SELECT/EXAMINE, UID SEARCH/FETCH/STORE,
+  STATUS, NOOP, IDLE, LOGOUT) serving a synthetic mailbox, including BODYSTRUCTURE and partial
+  BODY.PEEK[section]<0.n> fetches, so `GmailService` runs its real imaplib code path.
+- FakeSerperServer: an HTTP server answering Serper-shaped search JSON.
+- FakeChatModel: an in-process chat model with configurable latency and token counts that
+  answers the research engine's profile, metrics, batched-metrics and structured prompts.
+"""
+import asyncio
+import json
+import random
+import re
+import select
+import socketserver
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlparse
+
+COMPANIES = ["Acme Inc", "Globex Corporation", "Initech", "Umbrella Corp", "Stark Industries",
+             "Wayne Enterprises", "Hooli", "Pied Piper", "Vandelay Industries", "Soylent Ltd"]
+PEOPLE = ["John Smith", "Maria Garcia", "Wei Zhang", "Aisha Khan", "Jürgen Müller"]
+SUBJECTS = ["Invoice #{n} from {company}", "{company} quarterly partnership update",
+            "Meeting request: {company} x our team", "Your {company} order {n} has shipped",
+            "Re: pricing proposal for {company} – Angebot"]
+
+
+# ---- Synthetic mailbox -----------------------------------------------------------------------
+
+def synthetic_message(n: int, rng: random.Random, attachment_ratio: float, attachment_kb: int, html_ratio: float) -> bytes:
+    """One message: text/plain, multipart/alternative, or either wrapped in multipart/mixed with an attachment."""
+    company = rng.choice(COMPANIES)
+    person = rng.choice(PEOPLE)
+    message = EmailMessage()
+    message["Message-ID"] = f"<bench-{n}@{company.split()[0].lower()}.example>"
+    message["From"] = f"{person} from {company} <{person.split()[0].lower()}@{company.split()[0].lower()}.example>"
+    message["Subject"] = rng.choice(SUBJECTS).format(company=company, n=n)
+    message["Date"] = time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime(1700000000 + n * 60))
+    text = f"Hello,\n\nPlease find the details from {company} below. Grüße, {person}.\n" + "Lorem ipsum dolor. " * 40
+    message.set_content(text)
+    if rng.random() < html_ratio:
+        message.add_alternative(f"<html><body><p>{text}</p></body></html>", subtype="html")
+    if rng.random() < attachment_ratio:
+        payload = rng.randbytes(attachment_kb * 1024)
+        message.add_attachment(payload, maintype="application", subtype="pdf", filename=f"invoice-{n}.pdf")
+    return message.as_bytes(policy=policy.SMTP)
+
+
+def _quote(value: Optional[str]) -> str:
+    if value is None:
+        return "NIL"
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _raw_body(part) -> bytes:
+    payload = part.get_payload(decode=False)
+    return payload.encode("utf-8", "surrogateescape") if isinstance(payload, str) else bytes(payload or b"")
+
+
+def _structure(part, sections: Dict[str, bytes], section: str) -> str:
+    """BODYSTRUCTURE of `part` (RFC 3501 7.4.2), recording each leaf's raw body under its section number."""
+    if part.is_multipart():
+        children = "".join(
+            _structure(child, sections, f"{section}.{index}" if section else str(index))
+            for index, child in enumerate(part.get_payload(), start=1)
+        )
+        return f'({children} {_quote(part.get_content_subtype().upper())} ("BOUNDARY" {_quote(part.get_boundary())}) NIL NIL)'
+
+    body = _raw_body(part)
+    sections[section or "1"] = body
+    params = part.get_params()[1:] if part.get_params() else []
+    params_text = "(" + " ".join(f"{_quote(k.upper())} {_quote(v)}" for k, v in params) + ")" if params else "NIL"
+    encoding = (part.get("Content-Transfer-Encoding") or "7bit").upper()
+    disposition = part.get_content_disposition()
+    filename = part.get_filename()
+    filename_params = f'("FILENAME" {_quote(filename)})' if filename else "NIL"
+    disposition_text = f"({_quote(disposition.upper())} {filename_params})" if disposition else "NIL"
+    fields = (
+        f"{_quote(part.get_content_maintype().upper())} {_quote(part.get_content_subtype().upper())} "
+        f"{params_text} NIL NIL {_quote(encoding)} {len(body)}"
+    )
+    if part.get_content_maintype() == "text":
+        lines = body.count(b"\n")
+        return f"({fields} {lines} NIL {disposition_text} NIL)"
+    return f"({fields} NIL {disposition_text} NIL)"
+
+
+@dataclass
+class MailboxMessage:
+    uid: int
+    raw: bytes
+    headers: Dict[str, List[str]]
+    bodystructure: str
+    sections: Dict[str, bytes]
+    seen: bool = False
+
+
+@dataclass
+class SyntheticMailbox:
+    """A seeded INBOX; `attachment_ratio`/`html_ratio` set the MIME mix, `attachment_kb` each attachment's size."""
+    count: int = 1000
+    attachment_ratio: float = 0.2
+    attachment_kb: int = 64
+    html_ratio: float = 0.5
+    seed: int = 7
+    uidvalidity: int = 1
+    messages: List[MailboxMessage] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self.by_uid: Dict[int, MailboxMessage] = {}
+        self.deliver(self.count)
+
+    def deliver(self, count: int = 1):
+        """Appends `count` new unseen messages; sessions in IDLE are told about them."""
+        for _ in range(count):
+            n = len(self.messages)
+            raw = synthetic_message(n, self._rng, self.attachment_ratio, self.attachment_kb, self.html_ratio)
+            parsed = message_from_bytes(raw, policy=policy.compat32)
+            sections: Dict[str, bytes] = {}
+            structure = _structure(parsed, sections, "")
+            headers: Dict[str, List[str]] = {}
+            for name, value in parsed.items():
+                headers.setdefault(name.upper(), []).append(f"{name}: {value}")
+            message = MailboxMessage(n + 1, raw, headers, structure, sections)
+            self.messages.append(message)
+            self.by_uid[message.uid] = message
+
+    def mark_all_unseen(self):
+        for message in self.messages:
+            message.seen = False
+
+    @property
+    def uidnext(self) -> int:
+        return len(self.messages) + 1
+
+    def raw_messages(self) -> List[bytes]:
+        return [message.raw for message in self.messages]
+
+
+# ---- IMAP server -----------------------------------------------------------------------------
+
+_FETCH_BODY = re.compile(r"BODY(?:\.PEEK)?\[([^\]]*)\](?:<(\d+)\.(\d+)>)?", re.I)
+
+
+def _uid_set(spec: str, uidnext: int) -> List[int]:
+    uids = []
+    for piece in spec.split(","):
+        if ":" in piece:
+            start, end = piece.split(":")
+            low = int(start)
+            high = uidnext - 1 if end == "*" else int(end)
+            uids.extend(range(min(low, high), max(low, high) + 1))
+        else:
+            uids.append(uidnext - 1 if piece == "*" else int(piece))
+    return uids
+
+
+class _ImapHandler(socketserver.StreamRequestHandler):
+    server: "FakeImapServer"
+
+    def send(self, data: bytes):
+        self.wfile.write(data)
+        self.server.bytes_sent += len(data)
+
+    def handle(self):
+        self.send(b"* OK [CAPABILITY IMAP4rev1 IDLE] benchmark IMAP stand-in ready\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = line.decode(errors="replace").rstrip("\r\n").split(" ", 2)
+            if len(parts) < 2:
+                continue
+            tag, command, rest = parts[0], parts[1].upper(), parts[2] if len(parts) > 2 else ""
+            self.server.commands += 1
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            if command == "UID":
+                sub, _, rest = rest.partition(" ")
+                command = f"UID {sub.upper()}"
+            handler = getattr(self, "cmd_" + command.replace(" ", "_"), None)
+            if handler is None:
+                self.send(f"{tag} BAD unsupported command {command}\r\n".encode())
+                continue
+            if handler(tag, rest) is False:
+                return
+
+    def cmd_CAPABILITY(self, tag, rest):
+        self.send(f"* CAPABILITY IMAP4rev1 IDLE\r\n{tag} OK CAPABILITY completed\r\n".encode())
+
+    def cmd_LOGIN(self, tag, rest):
+        user = rest.split(" ", 1)[0].strip('"')
+        if user in self.server.rejected_logins:
+            self.send(f"{tag} NO [AUTHENTICATIONFAILED] Invalid credentials\r\n".encode())
+            return
+        self.send(f"{tag} OK LOGIN completed\r\n".encode())
+
+    def cmd_NOOP(self, tag, rest):
+        self.send(f"{tag} OK NOOP completed\r\n".encode())
+
+    def cmd_LOGOUT(self, tag, rest):
+        self.send(f"* BYE logging out\r\n{tag} OK LOGOUT completed\r\n".encode())
+        return False
+
+    def cmd_IDLE(self, tag, rest):
+        """Reports EXISTS whenever the message count changes until the client sends DONE."""
+        self.send(b"+ idling\r\n")
+        known = len(self.server.mailbox.messages)
+        while True:
+            # clients send nothing but DONE while idling, so nothing is waiting in rfile's buffer
+            readable, _, _ = select.select([self.connection], [], [], 0.05)
+            if readable:
+                line = self.rfile.readline()
+                if not line:
+                    return False
+                if line.strip().upper() == b"DONE":
+                    break
+            count = len(self.server.mailbox.messages)
+            if count != known:
+                known = count
+                self.send(f"* {count} EXISTS\r\n".encode())
+        self.send(f"{tag} OK IDLE terminated\r\n".encode())
+
+    def cmd_SELECT(self, tag, rest, readonly=False):
+        mailbox = self.server.mailbox
+        self.send(
+            f"* {len(mailbox.messages)} EXISTS\r\n* 0 RECENT\r\n"
+            f"* OK [UIDVALIDITY {mailbox.uidvalidity}] UIDs valid\r\n"
+            f"* OK [UIDNEXT {mailbox.uidnext}] Predicted next UID\r\n"
+            f"{tag} OK [{'READ-ONLY' if readonly else 'READ-WRITE'}] SELECT completed\r\n".encode()
+        )
+
+    def cmd_EXAMINE(self, tag, rest):
+        self.cmd_SELECT(tag, rest, readonly=True)
+
+    def cmd_STATUS(self, tag, rest):
+        mailbox_name = rest.split(" ", 1)[0]
+        self.send(f"* STATUS {mailbox_name} (UIDNEXT {self.server.mailbox.uidnext})\r\n{tag} OK STATUS completed\r\n".encode())
+
+    def cmd_UID_SEARCH(self, tag, rest):
+        mailbox = self.server.mailbox
+        criteria = rest.strip().strip("()").upper()
+        if criteria.startswith("UNSEEN"):
+            uids = [m.uid for m in mailbox.messages if not m.seen]
+        elif criteria.startswith("UID "):
+            wanted = set(_uid_set(criteria[4:].strip(), mailbox.uidnext))
+            uids = [m.uid for m in mailbox.messages if m.uid in wanted]
+        else:
+            uids = [m.uid for m in mailbox.messages]
+        self.send(f"* SEARCH {' '.join(map(str, uids))}\r\n{tag} OK SEARCH completed\r\n".encode())
+
+    def cmd_UID_STORE(self, tag, rest):
+        spec, _, flags = rest.partition(" ")
+        if "\\SEEN" in flags.upper():
+            for uid in _uid_set(spec, self.server.mailbox.uidnext):
+                if uid in self.server.mailbox.by_uid:
+                    self.server.mailbox.by_uid[uid].seen = flags.startswith("+")
+        self.send(f"{tag} OK STORE completed\r\n".encode())
+
+    def cmd_UID_FETCH(self, tag, rest):
+        spec, _, items = rest.partition(" ")
+        mailbox = self.server.mailbox
+        for uid in _uid_set(spec, mailbox.uidnext):
+            message = mailbox.by_uid.get(uid)
+            if message is None:
+                continue
+            out = [f"* {uid} FETCH (UID {uid}".encode()]
+            if "BODYSTRUCTURE" in items.upper():
+                out.append(f" BODYSTRUCTURE {message.bodystructure}".encode())
+            for match in _FETCH_BODY.finditer(items):
+                section, start, length = match.group(1), match.group(2), match.group(3)
+                if section.upper().startswith("HEADER.FIELDS"):
+                    names = section[section.index("(") + 1:section.rindex(")")].split()
+                    data = "".join(
+                        f"{line}\r\n" for name in names for line in message.headers.get(name.upper(), [])
+                    ).encode() + b"\r\n"
+                elif section == "":
+                    data = message.raw
+                else:
+                    data = message.sections.get(section, b"")
+                key = f"BODY[{section}]"
+                if start is not None:
+                    data = data[int(start):int(start) + int(length)]
+                    key += f"<{start}>"
+                out.append(f" {key} {{{len(data)}}}\r\n".encode() + data)
+                if "PEEK" not in match.group(0).upper():
+                    message.seen = True
+            out.append(b")\r\n")
+            self.send(b"".join(out))
+        self.send(f"{tag} OK FETCH completed\r\n".encode())
+
+
+class FakeImapServer(socketserver.ThreadingTCPServer):
+    """Serves `mailbox` on 127.0.0.1 (plain TCP); use as a context manager. `latency` is added per command."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128  # socketserver's default backlog of 5 drops concurrent connects
+
+    def __init__(self, mailbox: SyntheticMailbox, latency: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _ImapHandler)
+        self.mailbox = mailbox
+        self.latency = latency
+        self.rejected_logins: Set[str] = set()  # users whose LOGIN fails
+        self.commands = 0
+        self.bytes_sent = 0
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+# ---- Serper ----------------------------------------------------------------------------------
+
+class _SerperHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeSerperServer"
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        q = query.get("q", [""])[0]
+        num = int(query.get("num", ["3"])[0])
+        self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.error_rate and self.server.rng.random() < self.server.error_rate:
+            self.server.errors += 1
+            self._reply(503, {"message": "stand-in failure"}, {"Retry-After": "0"})
+            return
+        organic = [
+            {"title": f"{q} — result {i + 1}", "snippet": f"{q}: founded decades ago, thousands of employees, well reviewed."}
+            for i in range(num)
+        ]
+        self._reply(200, {"organic": organic})
+
+    def _reply(self, status: int, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeSerperServer(ThreadingHTTPServer):
+    """Serper-compatible search endpoint at `url`; `error_rate` of requests answer 503 to exercise retries."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, seed: int = 7):
+        super().__init__(("127.0.0.1", 0), _SerperHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/search"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+# ---- Chat model ------------------------------------------------------------------------------
+
+class FakeMessage:
+    def __init__(self, content: str, usage_metadata: dict):
+        self.content = content
+        self.usage_metadata = usage_metadata
+
+
+def fake_metrics(company_name: str) -> dict:
+    """Deterministic, varied metrics per company so scores differ across the corpus."""
+    h = zlib.crc32(company_name.encode())
+    return {
+        "founded_year": 1950 + h % 70,
+        "market_cap": float((h % 5000) * 1e6),
+        "employees": 10 + h % 20000,
+        "domain_age": 1 + h % 25,
+        "sentiment_score": round((h % 100) / 100, 2),
+        "certified": bool(h & 1),
+        "funded_by_top_investors": bool(h & 2),
+    }
+
+
+class FakeChatModel:
+    """
+    Stands in for ChatOpenAI (and its `bind` / `with_structured_output` runnables). Each call
+    sleeps `latency + completion_tokens * per_token_latency` and reports prompt tokens as
+    len(prompt) / 4 plus `completion_tokens` completion tokens in `usage_metadata`.
+    """
+
+    def __init__(self, latency: float = 0.2, completion_tokens: int = 300, per_token_latency: float = 0.0):
+        self.latency = latency
+        self.completion_tokens = completion_tokens
+        self.per_token_latency = per_token_latency
+        self.calls = 0
+        self.tokens = 0
+
+    def bind(self, **kwargs) -> "FakeChatModel":
+        return self
+
+    def with_structured_output(self, schema, include_raw: bool = False) -> "_StructuredFake":
+        return _StructuredFake(self, schema, include_raw)
+
+    async def _respond(self, prompt: str, content: str) -> FakeMessage:
+        self.calls += 1
+        await asyncio.sleep(self.latency + self.completion_tokens * self.per_token_latency)
+        usage = {
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": self.completion_tokens,
+            "total_tokens": len(prompt) // 4 + self.completion_tokens,
+        }
+        self.tokens += usage["total_tokens"]
+        return FakeMessage(content, usage)
+
+    def _profile(self, company_name: str) -> str:
+        return f"{company_name} is an established company. " + "It operates internationally. " * (self.completion_tokens // 5)
+
+    async def ainvoke(self, prompt: str) -> FakeMessage:
+        if prompt.startswith("Write"):
+            return await self._respond(prompt, self._profile(_company(prompt)))
+        names = re.findall(r"^### (.+)$", prompt, re.M)
+        if names:
+            payload = {"companies": [{"company": name, **fake_metrics(name)} for name in names]}
+            return await self._respond(prompt, json.dumps(payload))
+        return await self._respond(prompt, json.dumps(fake_metrics(_company(prompt))))
+
+
+class _StructuredFake:
+    def __init__(self, model: FakeChatModel, schema, include_raw: bool):
+        self.model = model
+        self.schema = schema
+        self.include_raw = include_raw
+
+    async def ainvoke(self, prompt: str):
+        name = _company(prompt)
+        parsed = self.schema.model_validate({"profile": self.model._profile(name), "metrics": fake_metrics(name)})
+        raw = await self.model._respond(prompt, parsed.model_dump_json())
+        return {"raw": raw, "parsed": parsed, "parsing_error": None} if self.include_raw else parsed
+
+
+def _company(prompt: str) -> str:
+    match = re.search(r"'([^']+)'", prompt)
+    return match.group(1) if match else "Unknown"
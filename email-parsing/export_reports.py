@@ -0,0 +1,68 @@
+"""
+Bulk export of stored research reports, streamed page by page so memory stays constant.
+
+    python export_reports.py csv --since 2025-01-01 --until 2025-01-08 -o vendor-audit.csv
+    python export_reports.py parquet --min-score 60 -o reports.parquet    # needs pyarrow
+    python export_reports.py jsonl | gzip > reports.jsonl.gz
+
+Formats: jsonl (stored report JSON, one per line), csv and parquet (one flat row per report, with
+raw_metrics and score_breakdown as columns) and markdown (the rendered reports, concatenated).
+Parquet is an optional extra that is not in requirements.txt: `pip install pyarrow` to enable it.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+from app.api.deps import get_report_store
+from app.services.report_export import EXPORT_FORMATS, export_reports
+
+
+async def export(args) -> dict:
+    stream = export_reports(
+        get_report_store(),
+        args.format,
+        company_name=args.company,
+        since=args.since,
+        until=args.until,
+        min_score=args.min_score,
+        max_score=args.max_score,
+        page_size=args.page_size,
+    )
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        async for chunk in stream:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+        else:
+            out.flush()
+    return {"format": args.format, "bytes": written, "output": args.output or "-"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("format", choices=EXPORT_FORMATS, help="parquet needs the optional pyarrow package")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="research date lower bound (ISO 8601)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="research date upper bound (ISO 8601)")
+    parser.add_argument("--min-score", type=float)
+    parser.add_argument("--max-score", type=float)
+    parser.add_argument("--company", help="only reports for this company name")
+    parser.add_argument("--page-size", type=int, default=500, help="reports read per query / Parquet row group")
+    args = parser.parse_args()
+
+    try:
+        summary = asyncio.run(export(args))
+    except ImportError as e:
+        parser.exit(1, f"{e}\n")
+    if args.output:
+        print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Ingestion of every configured mailbox (EMAIL_ADDRESS plus MAIL_ACCOUNTS / MAIL_ACCOUNTS_FILE),
+sharded across a process pool, into one deduplicated company research queue.
+
+    python ingest_accounts.py --processes 8 --batch-limit 500
+    python ingest_accounts.py --interval 300     # keep polling every 5 minutes
+
+Each account keeps its own incremental sync state, so runs resume where the last one stopped.
+A failing account is retried a few times and then skipped without affecting the others.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from app.api.deps import get_report_store, get_research_cache, get_sender_index
+from app.core.config import settings
+from app.core.database import sqlite_path
+from app.core.logging_config import setup_logging
+from app.services.account_ingest import AccountIngestScheduler, CompanyResearchQueue
+from app.services.orchestrator import build_engine
+from app.services.serper_client import close_serper_clients
+
+
+async def ingest_once(args) -> dict:
+    sender_index = get_sender_index()
+    await sender_index.load()
+    engine = build_engine(settings, get_research_cache(), get_report_store()) if not args.no_research else None
+    research = CompanyResearchQueue(
+        engine,
+        concurrency=settings.research_concurrency,
+        timeout=settings.research_timeout,
+        similarity_threshold=settings.company_similarity_threshold,
+    )
+    research.start()
+    try:
+        scheduler = AccountIngestScheduler(
+            settings.all_mail_accounts(),
+            sqlite_path(settings.database_url),
+            research,
+            sender_index=sender_index,
+            processes=args.processes if args.processes is not None else settings.ingest_processes,
+            batch_limit=args.batch_limit or settings.ingest_batch_limit,
+            shard_timeout=settings.ingest_shard_timeout,
+            max_failures=settings.ingest_max_failures,
+        )
+        accounts = await scheduler.run()
+    finally:
+        await research.close()
+    return {
+        "accounts": accounts,
+        "companies": len(research.companies),
+        "reports": [report.report_id for report in research.reports.values()],
+    }
+
+
+async def ingest(args):
+    try:
+        while True:
+            print(json.dumps(await ingest_once(args)), flush=True)
+            if not args.interval:
+                return
+            await asyncio.sleep(args.interval)
+    finally:
+        await close_serper_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: INGEST_PROCESSES)")
+    parser.add_argument("--batch-limit", type=int, default=None, help="messages per account per turn")
+    parser.add_argument("--interval", type=float, default=0, help="seconds between passes (default: a single pass)")
+    parser.add_argument("--no-research", action="store_true", help="sync and extract companies only")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    setup_logging()
+    logging.getLogger().setLevel(args.log_level)
+    asyncio.run(ingest(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Historical backfill from a mail archive (an mbox file such as a Google Takeout export, or a
+Maildir directory) through the same extract -> research -> scoring pipeline as live orchestration.
+
+    python ingest_archive.py ~/takeout/All-mail.mbox --checkpoint backfill.json --workers 8
+
+Messages are parsed in a process pool while earlier batches are researched. After each batch the
+checkpoint records where the archive was read up to; running the command again with the same
+--checkpoint continues from there. Message-IDs already processed (by this or an earlier archive)
+are skipped.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from app.api.deps import get_mail_sync_state, get_report_store, get_research_cache, get_sender_index
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.services.mail_archive import ARCHIVE_FORMATS, ArchiveCheckpoint, detect_format, iter_archive
+from app.services.orchestrator import build_engine, confirm_sender_domains, extract_companies, researched_message_ids
+from app.services.serper_client import close_serper_clients
+
+SYNC_ACCOUNT = "archive"  # processed_messages namespace shared by all archive imports
+
+
+async def ingest(args) -> dict:
+    archive_format = args.format or detect_format(args.source)
+    checkpoint = ArchiveCheckpoint(args.checkpoint) if args.checkpoint else None
+    state = checkpoint.load(args.source, archive_format) if checkpoint and not args.restart else None
+    counters = {key: state.get(key, 0) for key in ("messages", "skipped", "companies", "reports")} if state else {
+        "messages": 0, "skipped": 0, "companies": 0, "reports": 0,
+    }
+    if state:
+        logging.info(f"⏩ Resuming {args.source} after {counters['messages']} messages (position {state['position']})")
+
+    sync_state = get_mail_sync_state()
+    sender_index = get_sender_index()
+    await sender_index.load()
+    engine = build_engine(settings, get_research_cache(), get_report_store()) if not args.no_research else None
+    jsonl = open(args.jsonl, "a", encoding="utf-8") if args.jsonl else None
+
+    async def process(emails):
+        with_id = [email["message_id"] for email in emails if email["message_id"]]
+        new = await sync_state.unprocessed(SYNC_ACCOUNT, with_id)
+        fresh = [email for email in emails if not email["message_id"] or email["message_id"] in new]
+        counters["skipped"] += len(emails) - len(fresh)
+        if jsonl:
+            jsonl.writelines(json.dumps(email.to_dict()) + "\n" for email in fresh)
+            jsonl.flush()
+
+        company_names, candidates_per_email = await extract_companies(
+            fresh, sender_index, settings.company_similarity_threshold, n_process=args.ner_processes
+        )
+        counters["companies"] += len(company_names)
+        if engine:
+            results = await engine.research_companies(
+                company_names, concurrency=settings.research_concurrency, timeout=settings.research_timeout
+            )
+            reports = [report for report in results if report]
+            counters["reports"] += len(reports)
+            await confirm_sender_domains(fresh, candidates_per_email, reports, sender_index)
+            # Messages with a failed company stay unprocessed, so a later import (or --restart) retries them
+            researched = {name for name, report in zip(company_names, results) if report}
+            done = researched_message_ids(fresh, candidates_per_email, researched)
+            await sync_state.mark_processed(SYNC_ACCOUNT, done)
+
+    started = time.perf_counter()
+    batch, position = [], state["position"] if state else None
+    try:
+        for position, emails in iter_archive(
+            args.source, archive_format, position, workers=args.workers, chunk_size=args.chunk_size
+        ):
+            batch.extend(emails)
+            counters["messages"] += len(emails)
+            if len(batch) < args.batch_size:
+                continue
+            await process(batch)
+            batch = []
+            if checkpoint:
+                checkpoint.save(args.source, archive_format, position, counters)
+            rate = counters["messages"] / (time.perf_counter() - started)
+            logging.info(f"📦 {counters['messages']} messages, {counters['companies']} companies ({rate:.0f} msg/s)")
+        if batch:
+            await process(batch)
+            if checkpoint:
+                checkpoint.save(args.source, archive_format, position, counters)
+    finally:
+        if jsonl:
+            jsonl.close()
+        await close_serper_clients()
+
+    counters["seconds"] = round(time.perf_counter() - started, 2)
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="mbox file or Maildir directory")
+    parser.add_argument("--format", choices=ARCHIVE_FORMATS, help="default: maildir for directories, else mbox")
+    parser.add_argument("--checkpoint", help="JSON file recording progress; resumed from if it exists")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count, 0 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="messages per parser task")
+    parser.add_argument("--batch-size", type=int, default=5000, help="messages per extract/research batch and checkpoint")
+    parser.add_argument("--ner-processes", type=int, default=1, help="spaCy nlp.pipe processes for extraction")
+    parser.add_argument("--no-research", action="store_true", help="parse and extract companies only")
+    parser.add_argument("--jsonl", help="also append the parsed emails to this file as JSON lines")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    setup_logging()
+    logging.getLogger().setLevel(args.log_level)
+    print(json.dumps(asyncio.run(ingest(args))))
+
+
+if __name__ == "__main__":
+    main()
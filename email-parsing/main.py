@@ -1,10 +1,74 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.api.endpoints import connect, fetch, research, report, orchestrate
+from app.api.endpoints import connect, fetch, research, report, orchestrate, senders, metrics
 from app.core.config import settings
 from app.core.logging_config import setup_logging
+from app.core.metrics import start_trace
+from app.services.imap_executor import shutdown_imap_executor
+from app.services.imap_pool import ImapSessionPool
+from app.services.serper_client import close_serper_clients, get_serper_client
+from app.services.job_queue import JobWorkerPool
+from app.services.mail_watcher import LeaderElection, MailWatcher
+from app.services.orchestrator import build_engine, run_orchestration
+from app.api.deps import (
+    get_job_queue, get_mail_sync_state, get_research_cache, get_report_store, get_sender_index
+)
 
-app = FastAPI(title="Email Orchestrator")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Long-lived clients, created once per process and injected through app.api.deps
+    app.state.imap_pool = ImapSessionPool(max_sessions=settings.imap_pool_size)
+    app.state.research_engine = build_engine(settings, get_research_cache(), get_report_store())
+    get_serper_client(settings.serper_api_key)
+    await get_sender_index().load()
+
+    async def orchestration_job(params: dict) -> dict:
+        trace_id = start_trace() if settings.tracing else None
+        # An unreachable mailbox fails the job (and is retried) instead of completing with no reports
+        reports = await run_orchestration(
+            settings, app.state.imap_pool, get_mail_sync_state(), app.state.research_engine,
+            sender_index=get_sender_index(), raise_on_connection_error=True, **params
+        )
+        result = {"report_ids": [report.report_id for report in reports]}
+        if trace_id:
+            result["trace_id"] = trace_id
+        return result
+
+    job_workers = JobWorkerPool(
+        get_job_queue(),
+        {"orchestrate": orchestration_job},
+        workers=settings.job_workers,
+        poll_interval=settings.job_poll_interval,
+    )
+    job_workers.start()
+
+    # Pre-research new mail as it arrives so /orchestrate is answered from the research cache
+    # Only one process (the holder of the "mail_watcher" lease) watches, whatever the worker count
+    app.state.mail_watcher = None
+    watcher_election = None
+    if settings.watch_inbox:
+        app.state.mail_watcher = MailWatcher(
+            settings, app.state.imap_pool, get_mail_sync_state(), app.state.research_engine,
+            sender_index=get_sender_index()
+        )
+        watcher_election = LeaderElection(
+            get_job_queue(),
+            "mail_watcher",
+            app.state.mail_watcher.start,
+            app.state.mail_watcher.stop,
+            lease_seconds=settings.watch_leader_lease,
+        )
+        watcher_election.start()
+    yield
+    if watcher_election:
+        await watcher_election.stop()
+    await job_workers.stop()
+    await app.state.imap_pool.close()
+    await close_serper_clients()
+    shutdown_imap_executor()
+
+app = FastAPI(title="Email Orchestrator", lifespan=lifespan)
 
 # Include API routers
 app.include_router(connect.router, prefix="/connect", tags=["connect"])
@@ -12,6 +76,8 @@ app.include_router(fetch.router, prefix="/fetch", tags=["fetch"])
 app.include_router(research.router, prefix="/research", tags=["research"])
 app.include_router(report.router, prefix="/report", tags=["report"])
 app.include_router(orchestrate.router, prefix="/orchestrate", tags=["orchestrate"])
+app.include_router(senders.router, prefix="/senders", tags=["senders"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 # Setup custom logging
 setup_logging()
@@ -1,3 +1,4 @@
+import json
 import streamlit as st
 import requests
 
@@ -7,71 +8,107 @@ BASE_URL = "http://localhost:8000"
 
 st.title("📬 Email Company Research & Credibility Dashboard")
 
+
+def credibility_score(report: dict) -> float:
+    score = (report.get("credibility") or {}).get("score")
+    return score if isinstance(score, (int, float)) else 0
+
+
+def render_report(report: dict):
+    with st.expander(f"📧 {report['company_name']}"):
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            st.subheader("🏢 Company Profile")
+            st.markdown(f"**Name:** {report['company_profile']['name']}")
+            st.markdown(f"**Description:** {report['company_profile'].get('description', 'N/A')}")
+            st.markdown(f"**Website:** {report['company_profile'].get('website', 'N/A')}")
+
+            st.subheader("💡 Key Insights")
+            for insight in report.get("key_insights", []):
+                st.markdown(f"- {insight}")
+
+            st.subheader("📌 Recommendations")
+            for reco in report.get("recommendations", []):
+                st.markdown(f"- {reco}")
+
+        with col2:
+            st.subheader("🔎 Credibility Score")
+            score_data = report.get("credibility", {})
+            score = score_data.get("score", "N/A")
+            st.metric("Score", score)
+
+            st.write("### 📈 Metrics")
+            raw_metrics = score_data.get("raw_metrics", {})
+
+            # Display formatted values (no raw scores)
+            for factor, value in raw_metrics.items():
+                if factor == "market_cap" and isinstance(value, (int, float)):
+                    value_str = f"${value / 1e9:.2f}B"
+                elif factor in ["age_years", "domain_age"] and isinstance(value, (int, float)):
+                    value_str = f"{value} years"
+                elif isinstance(value, float):
+                    value_str = f"{value:.2f}"
+                elif value is True:
+                    value_str = "Yes"
+                elif value is False:
+                    value_str = "No"
+                elif value in [None, "N/A"]:
+                    value_str = "Unknown"
+                else:
+                    value_str = str(value)
+
+                label = factor.replace("_", " ").replace("years", "").title().strip()
+                st.markdown(f"- **{label}:** {value_str}")
+
+
 # Run orchestration only on button click
 if st.button("🚀 Start Parsing"):
-    with st.spinner("Fetching and researching unread emails..."):
-        try:
-            response = requests.post(f"{BASE_URL}/orchestrate/orchestrate/")
+    status = st.status("Fetching unread emails...", expanded=False)
+    progress = st.progress(0.0)
+    results = st.empty()
+    reports = []
+    finished = False
+
+    try:
+        with requests.post(f"{BASE_URL}/orchestrate/orchestrate/stream", stream=True) as response:
             response.raise_for_status()
-            data = response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"❌ Failed to fetch data: {e}")
-            st.stop()
+            # Render each report as soon as the server finishes researching it
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                kind = event["event"]
 
-    if not data:
-        st.info("ℹ️ No research reports available.")
+                if kind == "progress":
+                    if event["stage"] == "fetch" and event["status"] == "completed":
+                        status.update(label=f"Fetched {event['count']} emails, extracting companies...")
+                    elif event["stage"] == "extract" and event["status"] == "completed":
+                        status.update(label=f"Researching {event['count']} companies...")
+                elif kind in ("report", "error"):
+                    progress.progress(event["completed"] / max(event["total"], 1))
+                    if kind == "report":
+                        # Keep the list sorted by credibility score (descending) as reports arrive
+                        reports.append(event["report"])
+                        reports.sort(key=credibility_score, reverse=True)
+                        with results.container():
+                            for report in reports:
+                                render_report(report)
+                    else:
+                        st.warning(f"⚠️ Research failed for {event['company_name']}")
+                elif kind == "done":
+                    finished = True
+                    status.update(label=f"Researched {event['total']} companies", state="complete")
+    except requests.exceptions.RequestException as e:
+        status.update(label="Failed", state="error")
+        st.error(f"❌ Failed to fetch data: {e}")
         st.stop()
 
-    # Sort companies by credibility score (descending)
-    sorted_reports = sorted(
-        data,
-        key=lambda r: r.get("credibility", {}).get("score", 0),
-        reverse=True
-    )
-
-    for report in sorted_reports:
-        with st.expander(f"📧 {report['company_name']}"):
-            col1, col2 = st.columns([2, 1])
-
-            with col1:
-                st.subheader("🏢 Company Profile")
-                st.markdown(f"**Name:** {report['company_profile']['name']}")
-                st.markdown(f"**Description:** {report['company_profile'].get('description', 'N/A')}")
-                st.markdown(f"**Website:** {report['company_profile'].get('website', 'N/A')}")
-
-                st.subheader("💡 Key Insights")
-                for insight in report.get("key_insights", []):
-                    st.markdown(f"- {insight}")
-
-                st.subheader("📌 Recommendations")
-                for reco in report.get("recommendations", []):
-                    st.markdown(f"- {reco}")
-
-            with col2:
-                st.subheader("🔎 Credibility Score")
-                score_data = report.get("credibility", {})
-                score = score_data.get("score", "N/A")
-                st.metric("Score", score)
-
-                st.write("### 📈 Metrics")
-                raw_metrics = score_data.get("raw_metrics", {})
-
-                # Display formatted values (no raw scores)
-                for factor, value in raw_metrics.items():
-                    if factor == "market_cap" and isinstance(value, (int, float)):
-                        value_str = f"${value / 1e9:.2f}B"
-                    elif factor in ["age_years", "domain_age"] and isinstance(value, (int, float)):
-                        value_str = f"{value} years"
-                    elif isinstance(value, float):
-                        value_str = f"{value:.2f}"
-                    elif value is True:
-                        value_str = "Yes"
-                    elif value is False:
-                        value_str = "No"
-                    elif value in [None, "N/A"]:
-                        value_str = "Unknown"
-                    else:
-                        value_str = str(value)
+    if not finished:
+        # The server closes the stream after "done"; ending without it means the run was cut short
+        status.update(label="Interrupted", state="error")
+        st.error(f"❌ The connection closed before orchestration finished; showing {len(reports)} partial results.")
+        st.stop()
 
-                    label = factor.replace("_", " ").replace("years", "").title().strip()
-                    st.markdown(f"- **{label}:** {value_str}")
+    if not reports:
+        st.info("ℹ️ No research reports available.")
@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time: give the app dummy credentials and a throwaway database
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_workdir = tempfile.mkdtemp(prefix="email-orchestrator-tests-")
+os.environ.setdefault("EMAIL_ADDRESS", "test@example.com")
+os.environ.setdefault("APP_PASSWORD", "test")
+os.environ.setdefault("SERPER_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_workdir}/test.db"
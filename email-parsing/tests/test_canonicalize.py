@@ -0,0 +1,19 @@
+import pytest
+
+from app.utils.canonicalize import canonical_key, cluster_company_names
+
+
+def test_canonical_key_strips_case_punctuation_and_legal_suffixes():
+    assert canonical_key("Acme, Inc.") == canonical_key("ACME Inc") == canonical_key("Acme Corp.") == "acme"
+
+
+@pytest.mark.parametrize("first, second", [("Metal", "Meta"), ("Striped", "Stripe"), ("Asanas", "Asana")])
+def test_single_word_names_one_letter_apart_stay_separate(first, second):
+    mapping = cluster_company_names([first, second])
+    assert mapping[first] == first
+    assert mapping[second] == second
+
+
+def test_spellings_of_the_same_company_merge():
+    mapping = cluster_company_names(["Acme Widgets", "Acme Widgets Inc.", "ACME WIDGETS", "Acme Widget", "Acme Widgets"])
+    assert set(mapping.values()) == {"Acme Widgets"}
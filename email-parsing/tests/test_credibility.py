@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timezone
+
+import aiosqlite
+import numpy as np
+import pytest
+
+from app.models.schemas import CompanyProfile, ResearchReport
+from app.services.report_store import ReportStore
+from app.utils.credibility import compute_credibility_score, score_batch
+
+RAW_METRICS = [
+    {"age_years": 12, "market_cap": 3e8, "employees": 250, "certified": True, "funded_by_top_investors": False},
+    {"age_years": 40, "employees": "many", "certified": "yes", "funded_by_top_investors": "true"},
+    {"domain_age": 8, "sentiment_score": 0.9, "certified": 1, "funded_by_top_investors": ""},
+    {"market_cap": None, "certified": None, "funded_by_top_investors": ["Sequoia"]},
+    {"sentiment_score": "positive", "certified": 0, "funded_by_top_investors": {}},
+]
+
+
+def report(index: int, raw_metrics: dict) -> ResearchReport:
+    return ResearchReport(
+        report_id=f"r{index}",
+        company_name=f"Company {index}",
+        research_date=datetime.now(timezone.utc),
+        overall_status="completed",
+        completion_percentage=100.0,
+        company_profile=CompanyProfile(name=f"Company {index}", description=None, website=None),
+        products_services=None,
+        market_analysis=None,
+        financial_metrics=None,
+        key_insights=None,
+        recommendations=None,
+        credibility={"score": 50.0, "raw_metrics": raw_metrics, "score_breakdown": {}},
+    )
+
+
+def scalar_scores():
+    return [compute_credibility_score(**raw)[0] for raw in RAW_METRICS]
+
+
+def test_flags_count_by_truthiness():
+    scores = scalar_scores()
+    assert compute_credibility_score(certified="yes")[0] == compute_credibility_score(certified=True)[0]
+    assert compute_credibility_score(funded_by_top_investors="")[0] == compute_credibility_score()[0]
+    assert scores[1] == compute_credibility_score(age_years=40, certified=True, funded_by_top_investors=True)[0]
+
+
+@pytest.mark.parametrize("backfill", [False, True], ids=["stored", "backfilled"])
+def test_batch_rescoring_matches_scalar_scores(tmp_path, backfill):
+    store = ReportStore(str(tmp_path / "reports.db"))
+
+    async def scenario():
+        for index, raw in enumerate(RAW_METRICS):
+            await store.save(report(index, raw))
+        if backfill:
+            # Reports saved before report_metrics existed are read back from their JSON
+            async with aiosqlite.connect(store.db_path) as db:
+                await db.execute("DELETE FROM report_metrics")
+                await db.commit()
+        return await store.load_score_inputs()
+
+    report_ids, _, columns = asyncio.run(scenario())
+    scores, _ = score_batch(columns)
+    by_id = dict(zip(report_ids, scores.tolist()))
+    assert [by_id[f"r{index}"] for index in range(len(RAW_METRICS))] == scalar_scores()
+
+
+def test_list_and_array_columns_agree():
+    lists = {metric: [raw.get(metric) for raw in RAW_METRICS] for metric in ("age_years", "certified")}
+    arrays = {
+        "age_years": np.array([12, 40, np.nan, np.nan, np.nan]),
+        "certified": np.array([1, 1, 1, 0, 0], dtype=np.float64),
+    }
+    assert score_batch(lists)[0].tolist() == score_batch(arrays)[0].tolist()
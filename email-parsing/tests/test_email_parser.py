@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.records import EmailRecord
+from app.services.email_parser import EmailParser
+
+
+def test_parses_date_header():
+    record = EmailRecord("1", subject="Hi", sender="Ann <ann@acme.example>", date="Mon, 3 Mar 2025 09:15:00 +0100")
+    (email,) = EmailParser.parse_emails([record])
+    assert email.sender == "ann@acme.example"
+    assert email.date.astimezone(timezone.utc) == datetime(2025, 3, 3, 8, 15, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("date", [None, "", "sometime last week"])
+def test_missing_or_bad_date_is_none_and_reproducible(date):
+    record = EmailRecord("1", subject="Hi", sender="ann@acme.example", date=date)
+    first, second = EmailParser.parse_emails([record]), EmailParser.parse_emails([record])
+    assert first[0].date is None
+    assert first[0].model_dump_json() == second[0].model_dump_json()
@@ -0,0 +1,31 @@
+import pytest
+
+from app.services.mail_archive import iter_mbox_spans, parse_mbox_chunk
+
+MESSAGE = (
+    "{separator}\n"
+    "From: Acme Billing <billing@acme.com>\n"
+    "Subject: Invoice {n}\n"
+    "Message-ID: <{n}@acme.com>\n"
+    "\n"
+    "Hello,\n"
+    "From 10:30 we start the call.\n"
+    "\n"
+)
+
+
+@pytest.mark.parametrize(
+    "separator",
+    [
+        "From sender@example.com Mon Jan  1 00:00:00 2024",  # classic asctime
+        "From 1614431373436541441@xxx Thu Oct 20 19:35:25 +0000 2018",  # Google Takeout
+    ],
+)
+def test_mbox_split_on_from_lines_only(tmp_path, separator):
+    path = tmp_path / "archive.mbox"
+    path.write_bytes("".join(MESSAGE.format(separator=separator, n=n) for n in range(2)).encode())
+
+    spans = list(iter_mbox_spans(str(path)))
+    assert len(spans) == 2
+    emails = parse_mbox_chunk(str(path), spans)
+    assert [email["subject"] for email in emails] == ["Invoice 0", "Invoice 1"]
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.schemas import CompanyProfile, ResearchReport
+from app.services.orchestrator import confirm_sender_domains
+from app.services.research_engine import FALLBACK_METRICS
+from app.services.sender_index import SenderDomainIndex
+
+REAL_METRICS = {"age_years": 12, "market_cap": 3e8, "employees": 250}
+
+
+def report(company_name: str, raw_metrics: dict) -> ResearchReport:
+    return ResearchReport(
+        report_id=company_name,
+        company_name=company_name,
+        research_date=datetime.now(timezone.utc),
+        overall_status="completed",
+        completion_percentage=100.0,
+        company_profile=CompanyProfile(name=company_name, description=None, website=None),
+        products_services=None,
+        market_analysis=None,
+        financial_metrics=None,
+        key_insights=None,
+        recommendations=None,
+        credibility={"score": 50.0, "raw_metrics": raw_metrics, "score_breakdown": {}},
+    )
+
+
+def confirm(tmp_path, name: str, source: str, raw_metrics: dict) -> SenderDomainIndex:
+    index = SenderDomainIndex(str(tmp_path / "senders.db"))
+
+    async def scenario():
+        await index.load()
+        emails = [{"from": f"Someone <someone@{source.lower()}.example>"}]
+        await confirm_sender_domains(emails, [[(name, source)]], [report(name, raw_metrics)], index)
+
+    asyncio.run(scenario())
+    return index
+
+
+@pytest.mark.parametrize("name, source", [("John Smith", "PERSON"), ("Billing Team", "heuristic"), ("Berlin", "GPE")])
+def test_lone_non_org_candidate_is_not_pinned(tmp_path, name, source):
+    index = confirm(tmp_path, name, source, REAL_METRICS)
+    assert index.entries() == []
+
+
+def test_org_with_fallback_metrics_is_not_pinned(tmp_path):
+    index = confirm(tmp_path, "Acme", "ORG", dict(FALLBACK_METRICS))
+    assert index.entries() == []
+
+
+def test_org_with_real_metrics_is_confirmed(tmp_path):
+    index = confirm(tmp_path, "Acme", "ORG", REAL_METRICS)
+    assert index.entries() == [{"domain": "org.example", "company_name": "Acme", "source": "research"}]